@@ -20,7 +20,10 @@ from PIL import Image
 
 from telescope.tasks import AVAILABLE_TASKS
 from telescope.metrics.result import MultipleMetricResults
+from telescope.metrics.rouge_scores import shared_rouge_scores
 from telescope.testset import MultipleTestset
+from telescope.filters import FilterPipeline
+from telescope.filters.length import LENGTH_UNITS
 from telescope.bias_evaluation.gender_bias_evaluation import GenderBiasEvaluation
 from telescope.multiple_plotting import system_level_scores_table, analysis_metrics_stacked_bar_plot, download_data_zip
 from telescope.universal_metrics import WeightedMean, WeightedSum
@@ -122,6 +125,7 @@ filters = st.sidebar.multiselect(
 )
 
 length_interval = ()
+length_unit = LENGTH_UNITS[0]
 if "length" in filters:
     st.sidebar.subheader("Segment length constraints:")
     length_interval = st.sidebar.slider(
@@ -137,6 +141,9 @@ if "length" in filters:
         ),
         on_change=stop_nlp
     )
+    length_unit = st.sidebar.radio(
+        "Length in:", LENGTH_UNITS, horizontal=True, on_change=stop_nlp
+    )
     if length_interval != (0, 100) and "length" not in filters:
         filters = (
             filters
@@ -149,6 +156,21 @@ if "length" in filters:
             ]
         ) 
 
+duplicates_threshold = 1.0
+if "remove-duplicates" in filters:
+    duplicates_threshold = st.sidebar.slider(
+        "Similarity threshold for near-duplicates:",
+        0.5,
+        1.0,
+        step=0.05,
+        value=1.0,
+        help=(
+            "Segments whose character n-grams are at least this similar (estimated with MinHash) "
+            "to a previous segment are also removed. With 1.0 only exact duplicates are removed."
+        ),
+        on_change=stop_nlp
+    )
+
 #---------- |Bootstrap resampling| ------------    
 
 if available_tasks[task].bootstrap:
@@ -203,21 +225,28 @@ cache_max_entries = 200  # 10 hour cache time for each object
     max_entries=cache_max_entries,
 )
 def apply_filters(testset, filters, ref_name, source_language, target_language):
+    filters_args = []
     for filter in filters:
-        with st.spinner(f"Applying {filter} filter for reference {ref_name}..." ):
-            if filter == "length":
-                testset.apply_filter(available_filters[filter](testset, *length_interval))
-            elif filter == "named-entities":
-                testset.apply_filter(available_filters[filter](testset, source_language,target_language))
-            else:
-                testset.apply_filter(available_filters[filter](testset))
+        if filter == "length":
+            filters_args.append((available_filters[filter], tuple(length_interval) + (length_unit,)))
+        elif filter == "named-entities":
+            filters_args.append((available_filters[filter], (source_language, target_language)))
+        elif filter == "remove-duplicates":
+            filters_args.append((available_filters[filter], (duplicates_threshold,)))
+        else:
+            filters_args.append((available_filters[filter], ()))
+    # the mask of each filter is cached, changing one filter does not recompute the others
+    with st.spinner(f"Applying {' '.join(filters)} filters for reference {ref_name}..." ):
+        testset.apply_filter(FilterPipeline(testset, filters_args))
 
     # HACK
     # I'll add a new prefix to all testset filenames to "fool" streamlit cache
     if "length" in filters:
-        filter_prefix = " ".join([f for f in filters]) + str(length_interval)
+        filter_prefix = " ".join([f for f in filters]) + str(length_interval) + length_unit
     else:
         filter_prefix = " ".join([f for f in filters])
+    if "remove-duplicates" in filters:
+        filter_prefix += str(duplicates_threshold)
     testset.filenames = [filter_prefix + f for f in testset.filenames]
     return testset
 
@@ -265,16 +294,17 @@ def run_all_metrics(collection, metrics, filters):
 
     if any(len(collection_testsets.testsets[ref_name]) == 0 for ref_name in refs_names):
         return {}
-    return {
-        ref_name: {metric: run_metric(
-                            collection_testsets.testsets[ref_name], 
-                            metric, 
-                            ref_name,
-                            target_language,
-                            labels) 
-        for metric in metrics}
-        for ref_name in refs_names
-        }
+    with shared_rouge_scores():
+        return {
+            ref_name: {metric: run_metric(
+                                collection_testsets.testsets[ref_name], 
+                                metric, 
+                                ref_name,
+                                target_language,
+                                labels) 
+            for metric in metrics}
+            for ref_name in refs_names
+            }
 
 
 # --------| Universal Metric |--------
@@ -1,14 +1,24 @@
 import nltk
-import spacy
 import time
 
-from typing import Tuple, List, Dict
+from functools import lru_cache
+from typing import Callable, Hashable, Iterable, Tuple, List, Dict, Union
 from nltk.tokenize import word_tokenize
 from spacy.tokens import Token,Doc
 from telescope.bias_evaluation.bias_result import BiasResult, MultipleBiasResults
 from telescope.bias_evaluation.bias_evaluation import BiasEvaluation
+from telescope.bias_evaluation.gender_lexicon import GenderLexicon
+from telescope.bias_evaluation.term_index import TermIndex
 from telescope.testset import MultipleTestset
 from telescope.metrics.metric import Metric
+from telescope.parse_cache import load_model, parse_texts
+
+@lru_cache(maxsize=None)
+def download_punkt() -> None:
+    try:
+        nltk.data.find("tokenizers/punkt")
+    except LookupError:
+        nltk.download("punkt")
 
 
 class GenderBiasEvaluation(BiasEvaluation):
@@ -21,9 +31,15 @@ class GenderBiasEvaluation(BiasEvaluation):
     models = {"en":"en_core_web_lg","pt":"pt_core_news_lg"}
     groups_nlp = {"Neut": "neutral", "Fem" : "female", "Masc":"male"}
     options_bias_evaluation = ["dictionary-based approach","linguistic approach","hybrid approach"]
+    # approaches that read the spaCy parse of the segments
+    options_with_parsing = ["linguistic approach","hybrid approach"]
 
-    def __init__(self, language: str):
+    def __init__(self, language: str, cache: bool = True):
+        """
+        :param cache: Reads and stores the parsed segments in the persistent parse cache.
+        """
         super().__init__(language)
+        self.cache = cache
         self.options_bias_evaluation_funs = {"dictionary-based approach": self.evaluation_with_dataset, 
                                              "linguistic approach": self.evaluation_with_library, 
                                              "hybrid approach": self.evaluation_with_combination
@@ -36,10 +52,12 @@ class GenderBiasEvaluation(BiasEvaluation):
         self.gender_sets_of_dets = self.open_and_read_identify_terms(self.directory + 'determiners.json')
         self.gender_sets_of_prep = self.open_and_read_identify_terms(self.directory + 'prepositions.json')
         self.gender_sets_of_suffixes = self.open_and_read_identify_terms(self.directory + 'suffixes.json') 
+        self.lexicon = GenderLexicon(self.gender_sets_of_occupations + self.gender_sets_of_gender_terms, self.gender_sets_of_prons,
+                                     self.gender_sets_of_suffixes, self.gender_sets_of_dets + self.gender_sets_of_prep)
         
-        self.nlp = spacy.load(self.models[self.language])
+        self.nlp = load_model(self.models[self.language])
         self.nltk_language = self.nltk_languages[self.language]
-        nltk.download('punkt')
+        download_punkt()
     
     def dep_language(self, token:Token):
         if self.language == "pt":
@@ -61,9 +79,18 @@ class GenderBiasEvaluation(BiasEvaluation):
                     return (ner_e == "ORG" or ner_e == "LOC")
                 
 
+    def parse(self, segments:List[str]) -> Dict[str,Doc]:
+        """ spaCy Doc of each distinct lowercased segment, parsed in batches with nlp.pipe. """
+        return parse_texts(self.nlp, [segment.lower() for segment in segments], self.cache)
+
     def find_extract_genders_match_identify_terms(self, output_per_sys:Dict[str,List[str]], ref:List[str], option_bias_evaluation:str):
         self.i = 0
         num_segs = len(ref)
+        if option_bias_evaluation in self.options_with_parsing:
+            # the reference and all the outputs are parsed at once, the approaches read the Docs
+            docs = self.parse(ref + [seg for sys_output in output_per_sys.values() for seg in sys_output])
+            ref = [docs[seg.lower()] for seg in ref]
+            output_per_sys = {sys_id: [docs[seg.lower()] for seg in sys_output] for sys_id, sys_output in output_per_sys.items()}
         sys_ids = list(output_per_sys.keys())
         genders_ref_per_seg = {}
         identity_terms_ref_per_seg = {}
@@ -88,6 +115,24 @@ class GenderBiasEvaluation(BiasEvaluation):
         return genders_ref_per_seg,genders_per_sys_per_seg,identity_terms_ref_per_seg, identity_terms_per_sys_per_seg
     
 
+    def match_identify_terms(self, seg_terms_ref:List[dict], seg_terms_per_sys:Dict[str,List[dict]], genders_ref:List[str], 
+                             genders_per_sys:Dict[str,List[str]], keys_of:Callable[[dict],Iterable[Hashable]]):
+        """ 
+        Keeps the reference terms matched by a term of every system, each system term being matched once.
+        Two terms match when they share a key of keys_of, so each reference term is resolved with one 
+        index lookup per key and system.
+        """
+        indexes = {sys_id: TermIndex(seg_terms_sys, keys_of) for sys_id, seg_terms_sys in seg_terms_per_sys.items()}
+        for term_ref in seg_terms_ref:
+            keys = list(keys_of(term_ref))
+            found = {sys_id: index.first(keys) for sys_id, index in indexes.items()}
+            if all(i is not None for i in found.values()):
+                for sys_id, i in found.items():
+                    term_sys = indexes[sys_id].take(i)
+                    genders_per_sys[sys_id].append({"term":term_sys["term"], "gender":term_sys["gender"]})
+                genders_ref.append({"term":term_ref["term"], "gender":term_ref["gender"]})
+        return genders_ref, genders_per_sys
+
     def score_with_metrics(self, ref:str, sys_output:str, genders_ref:List[str], genders_ref_per_seg:Dict[int,List[str]], text_genders_ref_per_seg:dict, 
                            text_genders_sys_per_seg:dict, identity_terms_per_sys_per_sys:dict, init_metrics:List[Metric]) -> BiasResult:
         genders_sys_per_seg = {seg_i: [token_gen["gender"] for token_gen in text_genders] for seg_i, text_genders in text_genders_sys_per_seg.items()}
@@ -100,11 +145,16 @@ class GenderBiasEvaluation(BiasEvaluation):
     def evaluation(self, testset: MultipleTestset, option_bias_evaluation:str) -> MultipleBiasResults:
         """ Gender Bias Evaluation."""
         start = time.time()
+        genders_and_terms = self.find_extract_genders_match_identify_terms(testset.systems_output,testset.ref,option_bias_evaluation)
+        return self.bias_results(testset, genders_and_terms, start)
+
+    def bias_results(self, testset: MultipleTestset, genders_and_terms:tuple, start:float) -> MultipleBiasResults:
+        """ Scores the systems from the output of find_extract_genders_match_identify_terms. """
         ref = testset.ref
         output_per_sys = testset.systems_output
 
         [text_genders_ref_per_seg, text_genders_per_sys_per_seg,identity_terms_ref_per_seg, 
-         identity_terms_per_sys_per_seg] = self.find_extract_genders_match_identify_terms(output_per_sys,ref,option_bias_evaluation)
+         identity_terms_per_sys_per_seg] = genders_and_terms
         
         genders_ref_per_seg = {seg_i: [token_gen["gender"] for token_gen in text_genders] for seg_i, text_genders in text_genders_ref_per_seg.items()}
         genders_ref = [gender for genders in list(genders_ref_per_seg.values()) for gender in genders]
@@ -129,88 +179,7 @@ class GenderBiasEvaluation(BiasEvaluation):
         return False
 
     def find_gender_from_dictionaries(self, segemnet_words:List[str], word_k:int):
-        
-        def find_gender_from_gender_set(word:str,gender_set:dict):
-         # gender_set:{"they":"neutral", "she":"female", "he":"male"}
-            if word in gender_set:
-                gender = gender_set.get(word)
-            else:
-                gender = ""
-            return gender
-
-        def find_next_word(segemnet_words:List[str], word_k:int):
-            if word_k + 1 < len(segemnet_words): 
-                return segemnet_words[word_k + 1]
-            else:
-                return ""
-
-        def find_pre_word(segemnet_words:List[str], word_k:int):
-            if word_k != 0: 
-                return segemnet_words[word_k - 1]
-            else:
-                return ""
-        
-        def is_word_in_set(word:str, next_word:str, gender_set:Dict[str,str]):
-            if word in gender_set:
-                return word, find_gender_from_gender_set(word,gender_set)
-            elif word + " " + next_word in gender_set:
-                return word + " " + next_word, find_gender_from_gender_set(word + " " + next_word,gender_set)
-            return word, ""
-    
-        # Exemple: suffixes --> woman and man
-        def find_suffix(word: str, suffixes: Tuple[str]) -> str:
-            bigger_suffix = ""
-            for suffix in suffixes:
-                if word.endswith(suffix) and len(bigger_suffix) < len(suffix):
-                    bigger_suffix = suffix
-            return bigger_suffix
-
-        def how_many_gender(gender_set):
-            genders = []
-            for gender in list(gender_set.values()):
-                if gender not in genders:
-                    genders.append(gender)
-            return len(genders)
-        
-        gender_sets_of_terms = self.gender_sets_of_occupations + self.gender_sets_of_gender_terms
-        dets_prep = self.gender_sets_of_dets + self.gender_sets_of_prep
-        word = segemnet_words[word_k]
-        next_word = find_next_word(segemnet_words, word_k)
-        pre_word = find_pre_word(segemnet_words, word_k)
-
-        # gender_sets_of_terms
-        for gender_set in gender_sets_of_terms:
-            word, gender = is_word_in_set(word, next_word, gender_set) 
-            if gender:
-                if how_many_gender(gender_set) < 3:
-                #gender_sets_deter_prep
-                    for gender_det_set in dets_prep:
-                        _, gender_det = is_word_in_set(pre_word, "", gender_det_set) 
-                        if gender_det:   
-                            return word, gender_det, gender_set
-                return word, gender, gender_set
-        
-        for gender_set in self.gender_sets_of_prons:
-            word, gender = is_word_in_set(word, next_word, gender_set) 
-            if gender:
-                return word, gender, gender_set
-        
-        # gender_sets_of_suffixes
-        for gender_set in self.gender_sets_of_suffixes:
-            suffixes = tuple(gender_set.keys())
-            if word.endswith(suffixes):
-                suffix = find_suffix(word,suffixes)
-                gender = find_gender_from_gender_set(suffix,gender_set)
-                if gender:   
-                    return word, gender, gender_set
-        
-        #gender_sets_deter_prep
-        for gender_set in dets_prep:
-            _, gender = is_word_in_set(pre_word, "", gender_set) 
-            if gender:   
-                return word, gender, gender_set
-        return word, "", {}
-        
+        return self.lexicon.find_gender(segemnet_words, word_k)
 
     def find_identify_terms_and_extract_gender_with_dataset(self, segment:str):
         segment_words = word_tokenize(segment.lower(), language=self.nltk_language)
@@ -232,19 +201,13 @@ class GenderBiasEvaluation(BiasEvaluation):
         if term_ref["gender"] != "":
             return self.intersection_gender_set(term_ref["gender_set"],term_sys["gender_set"])
 
+    def keys_with_dataset(self, term:dict):
+        # terms match when their gender sets share a term with the same gender
+        return term["gender_set"].items()
+
     def match_identify_terms_with_dataset(self, seg_terms_ref:List[dict], seg_terms_per_sys:Dict[str,List[dict]], genders_ref:List[str], 
                                           genders_per_sys:Dict[str,List[str]]):
-        for term_ref in seg_terms_ref:
-            if self.has_match_with_dataset(term_ref, seg_terms_per_sys):
-                for sys_id in list(seg_terms_per_sys.keys()):
-                    for term_sys in seg_terms_per_sys[sys_id]:
-                        if self.is_match_with_dataset(term_ref,term_sys):
-                            genders_per_sys[sys_id].append({"term":term_sys["term"], "gender":term_sys["gender"]})
-                            seg_terms_per_sys[sys_id].remove(term_sys)
-                            break
-                genders_ref.append({"term":term_ref["term"], "gender":term_ref["gender"]})
-        return genders_ref, genders_per_sys
-
+        return self.match_identify_terms(seg_terms_ref, seg_terms_per_sys, genders_ref, genders_per_sys, self.keys_with_dataset)
     
     def evaluation_with_dataset(self, ref_seg:str, seg_per_sys:Dict[str,str], genders_ref:List[str], genders_per_sys: Dict[str,List[str]]):     
         seg_terms_ref = self.find_identify_terms_and_extract_gender_with_dataset(ref_seg)
@@ -285,8 +248,8 @@ class GenderBiasEvaluation(BiasEvaluation):
         return gender
 
     
-    def find_identify_terms_and_extract_gender_with_library(self, segment:str):
-        doc = self.nlp(segment.lower())  
+    def find_identify_terms_and_extract_gender_with_library(self, segment:Union[str,Doc]):
+        doc = segment if isinstance(segment, Doc) else self.nlp(segment.lower())
         n_segs = len(doc)
         term = []
         ents = [(ent.text, ent.label_) for ent in doc.ents]
@@ -318,23 +281,21 @@ class GenderBiasEvaluation(BiasEvaluation):
                 and token_ref.dep_ == token_sys.dep_)
 
         return lemma or pron
+
+    def keys_with_library(self, term:dict):
+        # same lemma or both pronouns, with the same morphology, tag and dependency
+        token = term["token"]
+        signature = (tuple(self.find_prontype_definite_person_case_from_morph(token)), token.tag_, token.dep_)
+        keys = [("lemma", token.lemma_) + signature]
+        if token.pos_ == "PRON":
+            keys.append(("pron",) + signature)
+        return keys
     
     def match_identify_terms_with_library(self, seg_terms_ref:List[dict], seg_terms_per_sys:Dict[str,List[dict]], genders_ref:List[str], 
                                           genders_per_sys:Dict[str,List[str]]):
-        
-        for term_ref in seg_terms_ref:
-            if self.has_match_with_library(term_ref, seg_terms_per_sys):
-                for sys_id in list(seg_terms_per_sys.keys()):
-                    for term_sys in seg_terms_per_sys[sys_id]:
-                        if self.is_match_with_library(term_ref,term_sys):
-                            genders_per_sys[sys_id].append({"term":term_sys["term"], "gender":term_sys["gender"]})
-                            seg_terms_per_sys[sys_id].remove(term_sys)
-                            break
-                genders_ref.append({"term":term_ref["term"], "gender":term_ref["gender"]})
-        return genders_ref, genders_per_sys
-
+        return self.match_identify_terms(seg_terms_ref, seg_terms_per_sys, genders_ref, genders_per_sys, self.keys_with_library)
     
-    def evaluation_with_library(self, ref_seg:str, seg_per_sys:Dict[str,str], genders_ref:List[str], genders_per_sys: Dict[str,List[str]]):     
+    def evaluation_with_library(self, ref_seg:Union[str,Doc], seg_per_sys:Dict[str,Union[str,Doc]], genders_ref:List[str], genders_per_sys: Dict[str,List[str]]):     
         seg_terms_ref = self.find_identify_terms_and_extract_gender_with_library(ref_seg)
         seg_terms_per_sys = {sys_id:self.find_identify_terms_and_extract_gender_with_library(seg_per_sys[sys_id]) for sys_id in list(genders_per_sys.keys())}
 
@@ -345,8 +306,8 @@ class GenderBiasEvaluation(BiasEvaluation):
         return genders_ref, genders_per_sys, identity_terms_found_ref, identity_terms_found_per_sys
     
 #------------------------- Evaluation with library and datasets ---------------------------------
-    def find_identify_terms_and_extract_gender_with_combination(self, segment:str):
-        doc = self.nlp(segment.lower())        
+    def find_identify_terms_and_extract_gender_with_combination(self, segment:Union[str,Doc]):
+        doc = segment if isinstance(segment, Doc) else self.nlp(segment.lower())
         num_tokens = len(doc)
         segment_words = [token.text for token in doc]
         terms = []
@@ -374,20 +335,19 @@ class GenderBiasEvaluation(BiasEvaluation):
                  (self.is_match_with_library(term_ref,term_sys) and not term_ref["gender_set"] and not term_sys["gender_set"])))
     
 
+    def keys_with_combination(self, term:dict):
+        # same dependency and part of speech, and a dataset match between terms with gender sets 
+        # or a library match between terms without them
+        token = term["token"]
+        if term["gender_set"]:
+            return [("set", token.dep_, token.pos_) + item for item in term["gender_set"].items()]
+        return [key[:1] + (token.pos_,) + key[1:] for key in self.keys_with_library(term)]
+
     def match_identify_terms_with_combination(self, seg_terms_ref:List[dict], seg_terms_per_sys:Dict[str,List[dict]], genders_ref:List[str], 
                                           genders_per_sys:Dict[str,List[str]]):
-        for term_ref in seg_terms_ref:
-            if self.has_match_with_combination(term_ref,seg_terms_per_sys):
-                for sys_id in list(seg_terms_per_sys.keys()):
-                    for term_sys in seg_terms_per_sys[sys_id]:
-                        if self.is_match_with_combination(term_ref, term_sys):
-                            genders_per_sys[sys_id].append({"term":term_sys["term"], "gender":term_sys["gender"]})
-                            seg_terms_per_sys[sys_id].remove(term_sys)
-                            break
-                genders_ref.append({"term":term_ref["term"], "gender":term_ref["gender"]})
-        return genders_ref, genders_per_sys
+        return self.match_identify_terms(seg_terms_ref, seg_terms_per_sys, genders_ref, genders_per_sys, self.keys_with_combination)
     
-    def evaluation_with_combination(self, ref_seg:str, seg_per_sys:Dict[str,str], genders_ref:List[str], genders_per_sys: Dict[str,List[str]]):     
+    def evaluation_with_combination(self, ref_seg:Union[str,Doc], seg_per_sys:Dict[str,Union[str,Doc]], genders_ref:List[str], genders_per_sys: Dict[str,List[str]]):     
         seg_terms_ref = self.find_identify_terms_and_extract_gender_with_combination(ref_seg)
         seg_terms_per_sys = {sys_id:self.find_identify_terms_and_extract_gender_with_combination(seg_per_sys[sys_id]) for sys_id in list(genders_per_sys.keys())}
         
@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional, Tuple
+
+
+def first_sets(gender_sets: List[Dict[str, str]]) -> Dict[str, int]:
+    """ Index of the first gender set that has each term. """
+    index = {}
+    for i, gender_set in enumerate(gender_sets):
+        for term in gender_set:
+            index.setdefault(term, i)
+    return index
+
+
+class SuffixTrie:
+    """ Trie of the reversed suffixes of a list of gender sets of suffixes. """
+
+    def __init__(self, gender_sets: List[Dict[str, str]]) -> None:
+        self.root = {}
+        for i, gender_set in enumerate(gender_sets):
+            for suffix in gender_set:
+                node = self.root
+                for char in reversed(suffix):
+                    node = node.setdefault(char, {})
+                # the None key holds the gender sets with a suffix ending in this node
+                node.setdefault(None, []).append(i)
+
+    def longest_suffixes(self, word: str) -> Dict[int, int]:
+        """ Length of the longest suffix of the word in each gender set with one. """
+        node = self.root
+        found = {i: 0 for i in node.get(None, [])}
+        for length, char in enumerate(reversed(word), 1):
+            node = node.get(char)
+            if node is None:
+                break
+            for i in node.get(None, []):
+                found[i] = length
+        return found
+
+
+class GenderLexicon:
+    """
+    Gender sets of terms, pronouns, suffixes and determiners/prepositions compiled into
+    lookup tables: each term points to the first gender set that has it and the suffixes
+    are kept in a reversed-suffix trie, so that the gender of a word is found without
+    going through every gender set.
+    """
+
+    def __init__(
+        self,
+        terms: List[Dict[str, str]],
+        prons: List[Dict[str, str]],
+        suffixes: List[Dict[str, str]],
+        dets_prep: List[Dict[str, str]],
+    ) -> None:
+        self.terms = terms
+        self.prons = prons
+        self.suffixes = suffixes
+        self.dets_prep = dets_prep
+        self.terms_index = first_sets(terms)
+        self.prons_index = first_sets(prons)
+        self.dets_prep_index = first_sets(dets_prep)
+        self.suffix_trie = SuffixTrie(suffixes)
+        # terms of sets with less than three genders take the gender of the previous determiner
+        self.takes_det_gender = [len(set(gender_set.values())) < 3 for gender_set in terms]
+
+    @staticmethod
+    def lookup(index: Dict[str, int], word: str, next_word: str) -> Tuple[str, Optional[int]]:
+        """ Word, or word and next word, found in the first gender set, and the index of that set. """
+        word_set = index.get(word)
+        bigram = word + " " + next_word
+        bigram_set = index.get(bigram)
+        if bigram_set is not None and (word_set is None or bigram_set < word_set):
+            return bigram, bigram_set
+        return word, word_set
+
+    def find_gender(self, segment_words: List[str], word_k: int) -> Tuple[str, str, Dict[str, str]]:
+        """ Term at word_k, its gender and its gender set ("" and {} when it has no gender). """
+        word = segment_words[word_k]
+        next_word = segment_words[word_k + 1] if word_k + 1 < len(segment_words) else ""
+        pre_word = segment_words[word_k - 1] if word_k != 0 else ""
+
+        term, i = self.lookup(self.terms_index, word, next_word)
+        if i is not None:
+            if self.takes_det_gender[i]:
+                det, j = self.lookup(self.dets_prep_index, pre_word, "")
+                if j is not None:
+                    return term, self.dets_prep[j][det], self.terms[i]
+            return term, self.terms[i][term], self.terms[i]
+
+        term, i = self.lookup(self.prons_index, word, next_word)
+        if i is not None:
+            return term, self.prons[i][term], self.prons[i]
+
+        found = self.suffix_trie.longest_suffixes(word)
+        if found:
+            i = min(found)
+            return word, self.suffixes[i][word[len(word) - found[i]:]], self.suffixes[i]
+
+        det, j = self.lookup(self.dets_prep_index, pre_word, "")
+        if j is not None:
+            return word, self.dets_prep[j][det], self.dets_prep[j]
+        return word, "", {}
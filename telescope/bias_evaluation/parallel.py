@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from telescope.bias_evaluation.bias_result import MultipleBiasResults
+from telescope.bias_evaluation.gender_bias_evaluation import GenderBiasEvaluation
+from telescope.testset import MultipleTestset
+
+# number of segments of each unit of work sent to the workers
+SHARD_SIZE = 200
+
+# bias evaluation of the worker process, set once when the worker starts
+_evaluation = None
+
+
+def _init_worker(evaluation: GenderBiasEvaluation) -> None:
+    global _evaluation
+    _evaluation = evaluation
+
+
+def _evaluate_shard(shard: Tuple[List[str], Dict[str, List[str]], str]) -> tuple:
+    ref, output_per_sys, option_bias_evaluation = shard
+    return _evaluation.find_extract_genders_match_identify_terms(output_per_sys, ref, option_bias_evaluation)
+
+
+def merge_shards(shards: List[Tuple[int, tuple]], systems: List[str]) -> tuple:
+    """ Joins the per-segment results of consecutive shards, renumbering the segments. """
+    text_genders_ref, text_genders_per_sys, terms_ref, terms_per_sys = {}, {s: {} for s in systems}, {}, {s: {} for s in systems}
+    for offset, (shard_genders_ref, shard_genders_per_sys, shard_terms_ref, shard_terms_per_sys) in shards:
+        text_genders_ref.update({offset + i: v for i, v in shard_genders_ref.items()})
+        terms_ref.update({offset + i: v for i, v in shard_terms_ref.items()})
+        for sys_id in systems:
+            text_genders_per_sys[sys_id].update({offset + i: v for i, v in shard_genders_per_sys[sys_id].items()})
+            terms_per_sys[sys_id].update({offset + i: v for i, v in shard_terms_per_sys[sys_id].items()})
+    return text_genders_ref, text_genders_per_sys, terms_ref, terms_per_sys
+
+
+def parallel_bias_evaluation(
+    evaluation: GenderBiasEvaluation,
+    testsets: Dict[str, MultipleTestset],
+    option_bias_evaluation: str,
+    workers: int,
+) -> Dict[str, MultipleBiasResults]:
+    """
+    Runs a bias evaluation over the testset of every reference with a single evaluation
+    (one spaCy model and one set of lexicons). The segments of all references are split
+    into shards processed by a pool of workers, which share the evaluation copy-on-write
+    when processes are forked.
+
+    :param evaluation: Bias evaluation, loaded once.
+    :param testsets: Testset of each reference.
+    :param workers: Number of worker processes. With 1 the references are evaluated in this process.
+    :return: Results of each reference.
+    """
+    if workers <= 1:
+        return {ref_name: evaluation.evaluation(testset, option_bias_evaluation) for ref_name, testset in testsets.items()}
+
+    start = time.time()
+    units = [
+        (ref_name, offset)
+        for ref_name, testset in testsets.items()
+        for offset in range(0, len(testset.ref), SHARD_SIZE)
+    ]
+    shards = [
+        (
+            testsets[ref_name].ref[offset : offset + SHARD_SIZE],
+            {sys_id: output[offset : offset + SHARD_SIZE] for sys_id, output in testsets[ref_name].systems_output.items()},
+            option_bias_evaluation,
+        )
+        for ref_name, offset in units
+    ]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(evaluation,)
+    ) as executor:
+        outputs = list(executor.map(_evaluate_shard, shards))
+
+    results = {}
+    for ref_name, testset in testsets.items():
+        ref_shards = [(offset, output) for (name, offset), output in zip(units, outputs) if name == ref_name]
+        genders_and_terms = merge_shards(ref_shards, list(testset.systems_output))
+        results[ref_name] = evaluation.bias_results(testset, genders_and_terms, start)
+    return results
@@ -0,0 +1,36 @@
+from collections import deque
+from typing import Callable, Hashable, Iterable, List, Optional
+
+
+class TermIndex:
+    """
+    Identity terms of a system output in a segment, indexed by their match keys.
+    Two terms match when they share a key. Each key keeps the positions of its terms in
+    order, so the first unmatched term that matches a reference term is found without
+    going through the other terms of the segment.
+    """
+
+    def __init__(self, terms: List[dict], keys_of: Callable[[dict], Iterable[Hashable]]) -> None:
+        self.terms = terms
+        self.matched = [False] * len(terms)
+        self.positions = {}
+        for i, term in enumerate(terms):
+            for key in set(keys_of(term)):
+                self.positions.setdefault(key, deque()).append(i)
+
+    def first(self, keys: Iterable[Hashable]) -> Optional[int]:
+        """ Position of the first unmatched term with any of the keys. """
+        best = None
+        for key in keys:
+            positions = self.positions.get(key)
+            if not positions:
+                continue
+            while positions and self.matched[positions[0]]:
+                positions.popleft()
+            if positions and (best is None or positions[0] < best):
+                best = positions[0]
+        return best
+
+    def take(self, i: int) -> dict:
+        self.matched[i] = True
+        return self.terms[i]
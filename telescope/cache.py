@@ -0,0 +1,72 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Any, Dict, Iterable
+
+from telescope.utils import telescope_cache_folder
+
+CACHE_FILENAME = "cache.db"
+
+# SQLite limits the number of parameters per query
+QUERY_CHUNK = 500
+
+
+def cache_path() -> str:
+    return telescope_cache_folder() + CACHE_FILENAME
+
+
+class SQLiteStore:
+    """
+    Persistent key/value store in one table of the cache database, keyed by (namespace, key).
+    The namespace tells apart the entries of different models or versions (e.g. the metric
+    and model of a segment score), and the values are stored as given (text, integer or bytes),
+    so each cache encodes and decodes its own values.
+
+    Entries are never evicted: the whole cache is removed with `telescope clear-cache`.
+    """
+
+    def __init__(self, table: str, path: str = None) -> None:
+        self.table = table
+        self.path = cache_path() if path is None else path
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS {} ("
+                "namespace TEXT, key TEXT, value BLOB, "
+                "PRIMARY KEY (namespace, key))".format(self.table)
+            )
+
+    def get(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = {}
+        with closing(sqlite3.connect(self.path)) as conn:
+            for i in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[i : i + QUERY_CHUNK]
+                rows = conn.execute(
+                    "SELECT key, value FROM {} WHERE namespace = ? AND key IN ({})".format(
+                        self.table, ",".join("?" * len(chunk))
+                    ),
+                    [namespace] + chunk,
+                )
+                found.update(rows)
+        return found
+
+    def put(self, namespace: str, values: Dict[str, Any]) -> None:
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO {} VALUES (?, ?, ?)".format(self.table),
+                [(namespace, key, value) for key, value in values.items()],
+            )
+
+
+def clear_cache(path: str = None) -> bool:
+    """
+    Removes the cache database, with the segment scores of the neural metrics, the
+    named-entity annotations and the spaCy parses of every model.
+
+    :return: Whether there was a cache to remove.
+    """
+    path = cache_path() if path is None else path
+    if not os.path.exists(path):
+        return False
+    os.remove(path)
+    return True
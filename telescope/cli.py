@@ -27,13 +27,23 @@ from typing import List, Union, Tuple
 
 from telescope.utils import FILENAME_SYSTEM_LEVEL_SCORES
 from telescope.bias_evaluation.gender_bias_evaluation import GenderBiasEvaluation
+from telescope.bias_evaluation.parallel import parallel_bias_evaluation
 from telescope.tasks.classification import Classification
-from telescope.metrics.result import MultipleMetricResults
+from telescope.cache import cache_path, clear_cache
+from telescope.metrics.result import MultipleMetricResults, MultipleBootstrapResult
+from telescope.metrics.bootstrap import bootstrap_ids
+from telescope.metrics.batching import MAX_TOKENS, MAX_BATCH_SIZE
+from telescope.metrics.parallel import parallel_multiple_comparison
+from telescope.metrics.rouge_scores import shared_rouge_scores
+from telescope.metrics.streaming import streaming_multiple_comparison
+from telescope.collection_testsets import NLGTestsets, MTTestsets, SummTestsets, DialogueTestsets
+from telescope.columnar import pack_testset
 from telescope.testset import PairwiseTestset
 from telescope.multiple_plotting import (
     system_level_scores_table, 
     analysis_metrics_stacked_bar_plot,
-    save_bootstrap_table
+    save_bootstrap_table,
+    save_multiple_bootstrap_tables
 )
 from telescope.plotting import (
     plot_segment_comparison,
@@ -54,7 +64,9 @@ from telescope.filters import (
     AVAILABLE_CLASSIFICATION_FILTERS, 
     AVAILABLE_MT_FILTERS, 
     AVAILABLE_SUMMARIZATION_FILTERS, 
-    AVAILABLE_DIALOGUE_FILTERS)
+    AVAILABLE_DIALOGUE_FILTERS,
+    FilterPipeline)
+from telescope.filters.length import LENGTH_UNITS
 from telescope.tasks import (
     AVAILABLE_NLG_TASKS, 
     AVAILABLE_CLASSIFICATION_TASKS,
@@ -204,6 +216,20 @@ def telescope():
     default=0.0,
     help="Max interval value for length filtering.",
 )
+@click.option(
+    "--length_unit",
+    type=click.Choice(LENGTH_UNITS),
+    required=False,
+    default="characters",
+    help="Unit of the segment lengths used for length filtering.",
+)
+@click.option(
+    "--duplicates_threshold",
+    type=click.FloatRange(0, 1),
+    required=False,
+    default=1.0,
+    help="Similarity of the character n-grams (MinHash) from which remove-duplicates also removes near-duplicates. With 1.0 only exact duplicates are removed.",
+)
 @click.option(
     "--seg_metric",
     type=click.Choice([m.name for m in available_mt_metrics.values() if m.segment_level]),
@@ -245,6 +271,8 @@ def compare(
     filter: Union[Tuple[str], str],
     length_min_val: float,
     length_max_val: float,
+    length_unit: str,
+    duplicates_threshold: float,
     seg_metric: str,
     output_folder: str,
     bootstrap: bool,
@@ -261,16 +289,8 @@ def compare(
     )
     corpus_size = len(testset)
     if filter:
-        filters = [available_filters[f](testset) for f in filter if (f != "length" and f!= "named-entities")]
-        if "length" in filter:
-            filters.append(available_filters["length"](testset, int(length_min_val*100), int(length_max_val*100)))
-        elif "named-entities":
-            filters.append(available_filters["named-entities"](testset, testset.source_language,
-                                                            testset.target_language)) 
-
-
-        for filter in filters:
-            testset.apply_filter(filter)
+        filters = [(available_filters[f], filter_args(f, length_min_val, length_max_val, testset, length_unit=length_unit, duplicates_threshold=duplicates_threshold)) for f in filter]
+        testset.apply_filter(FilterPipeline(testset, filters))
 
         if (1 - (len(testset) / corpus_size)) * 100 == 100:
             click.secho("The current filters reduce the Corpus on 100%!", fg="ref")
@@ -404,6 +424,74 @@ def streamlit(ctx):
     os.system("streamlit run " + script_path)
 
 
+@telescope.command()
+@click.option(
+    "--source",
+    "-s",
+    required=True,
+    help="Source segments.",
+    type=click.File(),
+)
+@click.option(
+    "--system_output",
+    "-c",
+    required=True,
+    help="System candidate. This option can be multiple.",
+    type=click.File(),
+    multiple=True,
+)
+@click.option(
+    "--reference",
+    "-r",
+    required=True,
+    help="Reference segments. This option can be multiple.",
+    type=click.File(),
+    multiple=True,
+)
+@click.option(
+    "--systems_names",
+    "-n",
+    required=False,
+    type=click.File(),
+    help="File that contains the names of the systems per line.",
+)
+@click.option(
+    "--output_folder",
+    "-o",
+    required=True,
+    type=str,
+    help="Folder in which the packed testset is written.",
+)
+def pack(
+    source: click.File,
+    system_output: Tuple[click.File],
+    reference: Tuple[click.File],
+    systems_names: click.File,
+    output_folder: str,
+):
+    """ Converts plain-text inputs into the memory-mapped columnar format read by n-compare-nlg --packed. """
+    systems_ids, names, files = NLGTestsets.systems_files_cli(systems_names, system_output)
+    references = {}
+    for ref in reference:
+        if ref.name not in references:
+            references[ref.name] = ref
+    try:
+        num_lines = pack_testset(output_folder, (source.name, source), references, 
+                                 {sys_id: (file.name, file) for sys_id, file in files.items()}, names)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.secho("Packed {} segments into {}".format(num_lines, output_folder), fg="green")
+
+
+@telescope.command("clear-cache")
+def clear_cache_command():
+    """ Removes the cached segment scores, named-entity annotations and spaCy parses. """
+    if clear_cache():
+        click.secho("Removed {}".format(cache_path()), fg="green")
+    else:
+        click.secho("There is no cache at {}".format(cache_path()), fg="yellow")
+
+
 ###################################################
 ############|Commands for N systems|################
 ###################################################
@@ -427,21 +515,25 @@ def seg_metric_in_metrics(seg_metric, metrics):
         )
     return metrics
 
-def apply_filter(collection,filter,length_min_val,length_max_val,task):
+def filter_args(f,length_min_val,length_max_val,data,workers=1,length_unit="characters",duplicates_threshold=1.0,cache=True) -> tuple:
+    """ Arguments given to a filter after the testset. data is the testset or collection with the languages. """
+    if f == "length":
+        return (int(length_min_val*100), int(length_max_val*100), length_unit)
+    elif f == "named-entities":
+        return (data.source_language, data.target_language, workers, cache)
+    elif f == "remove-duplicates":
+        return (duplicates_threshold,)
+    return ()
+
+def apply_filter(collection,filter,length_min_val,length_max_val,task,workers=1,length_unit="characters",duplicates_threshold=1.0,cache=True):
+    task_filters = [fi.name for fi in available_tasks[task].filters]
+    filters = [(available_filters[f], filter_args(f, length_min_val, length_max_val, collection, workers, length_unit, duplicates_threshold, cache)) 
+               for f in filter if f in task_filters]
     for ref_name in collection.refs_names:
         corpus_size = len(collection.testsets[ref_name])
         
-        for f in filter:
-            if f in f in [fi.name for fi in available_tasks[task].filters]:
-                if f == "length":
-                    fil = available_filters[f](collection.testsets[ref_name], int(length_min_val*100), 
-                                    int(length_max_val*100))
-                elif f == "named-entities":
-                    fil = available_filters[f](collection.testsets[ref_name], collection.source_language, 
-                                                                            collection.target_language)
-                else:
-                    fil = available_filters[f](collection.testsets[ref_name])
-                collection.testsets[ref_name].apply_filter(fil)
+        testset = collection.testsets[ref_name]
+        testset.apply_filter(FilterPipeline(testset, filters))
 
         if (1 - (len(collection.testsets[ref_name]) / corpus_size)) * 100 == 100:
             click.secho("For reference " + ref_name + ", the current filters reduce the Corpus on 100%!", fg="green")
@@ -461,17 +553,45 @@ def display_table(systems_names, results):
             click.secho("\t" + str(sys_name) + ": " + str(sys_score), fg="yellow")
     return pd.DataFrame.from_dict(results_dicts)
 
+def streaming_comparison(source,systems_names_file,system_output,reference,task,language,metric,output_folder,chunk_size):
+    testset, systems_ids, systems_names = NLGTestsets.streaming_data_cli(source,systems_names_file,system_output,reference,chunk_size)
+    click.secho("Systems:\n" + "".join("--> " + filename + " : " + systems_names[sys_id] + " \n" 
+                                       for filename, sys_id in systems_ids.items()), fg="bright_blue")
+
+    task_metrics = [m for m in metric if m in [me.name for me in available_nlg_tasks[task].metrics]]
+    chunk_metrics = {m: available_metrics[m](language=language) for m in task_metrics if available_metrics[m].sufficient_statistics}
+    skipped = [m for m in task_metrics if m not in chunk_metrics]
+    if skipped:
+        click.secho("Metrics not available with --chunk_size: " + ", ".join(skipped), fg="red")
+    if not chunk_metrics:
+        return
+
+    try:
+        testset.check_lengths()
+        results = streaming_multiple_comparison(testset, chunk_metrics)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for ref_filename, ref_results in results.items():
+        click.secho('\n\nReference: ' + ref_filename, fg="yellow")
+        click.secho('\nNLP Evaluation', fg="yellow") 
+        results_df = display_table(systems_names,ref_results)
+        if output_folder != "":
+            if not output_folder.endswith("/"):
+                output_folder += "/"
+            metrics_results_dir = output_folder + ref_filename.replace("/","_") + "/metrics_results/"
+            system_level_scores_table(results_df, metrics_results_dir)
+
 def bootstrap_result(collection,ref_filename,results,metric,system_x,system_y,num_splits,sample_ratio):
 
     testset = collection.testsets[ref_filename]
-    bootstrap_results = []
-
-    for m in metric:
-        bootstrap_results.append(
-            available_metrics[m]
-            .multiple_bootstrap_resampling(testset, num_splits, sample_ratio, system_x,
-                                    system_y, collection.target_language, results[m])
-            .stats)
+    # The same partitions are shared by every system and metric
+    samples_ids = bootstrap_ids(len(testset), num_splits, sample_ratio)
+    multiple_bootstrap_results = [
+        available_metrics[m].multiple_systems_bootstrap_resampling(
+            testset, samples_ids, collection.target_language, results[m])
+        for m in metric
+    ]
+    bootstrap_results = [m_res.bootstrap_result(system_x, system_y).stats for m_res in multiple_bootstrap_results]
             
     bootstrap_results = {k: [dic[k] for dic in bootstrap_results] for k in bootstrap_results[0]}      
     bootstrap_df = pd.DataFrame.from_dict(bootstrap_results)
@@ -480,30 +600,35 @@ def bootstrap_result(collection,ref_filename,results,metric,system_x,system_y,nu
     click.secho("\nBootstrap resampling results:", fg="yellow")
     click.secho(str(bootstrap_df), fg="yellow")
 
-    return bootstrap_df
+    significance_df = MultipleBootstrapResult.results_to_dataframe(multiple_bootstrap_results, collection.systems_names)
+    intervals_df = MultipleBootstrapResult.results_to_dataframe(multiple_bootstrap_results, collection.systems_names, pairwise=False)
+    click.secho("\nBootstrap resampling results (all pairs):", fg="yellow")
+    click.secho(str(significance_df), fg="yellow")
+
+    return bootstrap_df, significance_df, intervals_df
 
 
 @telescope.command()
 @click.option(
     "--source",
     "-s",
-    required=True,
-    help="Source segments.",
+    required=False,
+    help="Source segments. Required without --packed.",
     type=click.File(),
 )
 @click.option(
     "--system_output",
     "-c",
-    required=True,
-    help="System candidate. This option can be multiple.",
+    required=False,
+    help="System candidate. This option can be multiple. Required without --packed.",
     type=click.File(),
     multiple=True,
 )
 @click.option(
     "--reference",
     "-r",
-    required=True,
-    help="Reference segments. This option can be multiple.",
+    required=False,
+    help="Reference segments. This option can be multiple. Required without --packed.",
     type=click.File(),
     multiple=True,
 )
@@ -551,6 +676,20 @@ def bootstrap_result(collection,ref_filename,results,metric,system_x,system_y,nu
     default=0.0,
     help="Max interval value for length filtering.",
 )
+@click.option(
+    "--length_unit",
+    type=click.Choice(LENGTH_UNITS),
+    required=False,
+    default="characters",
+    help="Unit of the segment lengths used for length filtering.",
+)
+@click.option(
+    "--duplicates_threshold",
+    type=click.FloatRange(0, 1),
+    required=False,
+    default=1.0,
+    help="Similarity of the character n-grams (MinHash) from which remove-duplicates also removes near-duplicates. With 1.0 only exact duplicates are removed.",
+)
 @click.option(
     "--seg_metric",
     type=click.Choice([m.name for m in available_metrics.values() if m.segment_level]),
@@ -627,6 +766,47 @@ def bootstrap_result(collection,ref_filename,results,metric,system_x,system_y,nu
     multiple=False,
     help="Models Rankings from Universal Metric." + help_universal_metrics,
 )
+@click.option(
+    "--no_cache",
+    is_flag=True,
+    help="Do not read or store segment-level scores of neural metrics, named-entity annotations and the spaCy parses of bias evaluations in the cache folder."
+)
+@click.option(
+    "--max_tokens",
+    required=False,
+    default=MAX_TOKENS,
+    type=int,
+    help="Token budget of each length-sorted batch of COMET and BERTScore.",
+)
+@click.option(
+    "--max_batch_size",
+    required=False,
+    default=MAX_BATCH_SIZE,
+    type=int,
+    help="Maximum number of segments in each batch of COMET and BERTScore.",
+)
+@click.option(
+    "--workers",
+    required=False,
+    default=1,
+    type=int,
+    help="Number of processes used to score the CPU-only metrics, to run the named-entities filter and the bias evaluations.",
+)
+@click.option(
+    "--packed",
+    required=False,
+    type=click.Path(exists=True, file_okay=False),
+    help="Folder written by `telescope pack`, used instead of --source, --system_output, --reference and --systems_names.",
+)
+@click.option(
+    "--chunk_size",
+    required=False,
+    default=None,
+    type=int,
+    help="Reads the files lazily, this number of lines at a time, for corpora that do not fit in memory. "
+    "Only the metrics with sufficient statistics (BLEU, chrF and TER) are computed and only at system level. "
+    "Can not be used with --filter, --bootstrap, --bias_evaluations, --seg_metric or --universal_metric.",
+)
 def n_compare_nlg(
     source: click.File,
     system_output: Tuple[click.File],
@@ -637,6 +817,8 @@ def n_compare_nlg(
     filter: Union[Tuple[str], str],
     length_min_val: float,
     length_max_val: float,
+    length_unit: str,
+    duplicates_threshold: float,
     seg_metric: str,
     output_folder: str,
     bootstrap: bool,
@@ -647,9 +829,36 @@ def n_compare_nlg(
     systems_names: click.File,
     bias_evaluations: Union[Tuple[str], str],
     option_gender_bias_evaluation: str,
-    universal_metric: str
+    universal_metric: str,
+    no_cache: bool,
+    max_tokens: int,
+    max_batch_size: int,
+    workers: int,
+    packed: str,
+    chunk_size: int
 ):  
-    collection = available_nlg_tasks[task].input_cli_interface(source,systems_names,system_output,reference,language)
+    if not packed and not (source and system_output and reference):
+        raise click.UsageError("--source, --system_output and --reference are required without --packed.")
+    if packed and chunk_size:
+        raise click.UsageError("--packed and --chunk_size can not be used together.")
+    if chunk_size:
+        context = click.get_current_context()
+        given = {"filter": filter, "bootstrap": bootstrap, "bias_evaluations": bias_evaluations, 
+                 "universal_metric": universal_metric,
+                 "seg_metric": context.get_parameter_source("seg_metric") != click.core.ParameterSource.DEFAULT}
+        unsupported = ["--" + option for option, value in given.items() if value]
+        if unsupported:
+            raise click.UsageError(", ".join(unsupported) + " can not be used with --chunk_size.")
+
+    if chunk_size:
+        streaming_comparison(source,systems_names,system_output,reference,task,language,metric,output_folder,chunk_size)
+        return
+
+    if packed:
+        packed_collections = {c.task: c for c in [MTTestsets, SummTestsets, DialogueTestsets]}
+        collection = packed_collections[task].read_packed_cli(packed, "X-" + language)
+    else:
+        collection = available_nlg_tasks[task].input_cli_interface(source,systems_names,system_output,reference,language)
     
     systems_ids = collection.systems_ids
     systems_names =  collection.systems_names
@@ -671,33 +880,42 @@ def n_compare_nlg(
     click.secho("Systems:\n" + collection.display_systems(), fg="bright_blue")
 
     if bias_evaluations and available_nlg_tasks[task].bias_evaluations:
-        bias_evalutaions_results = {bias_eval: { 
-            ref_name: available_bias_evaluation[bias_eval](language).evaluation(collection.testsets[ref_name], option_gender_bias_evaluation)
-                for ref_name in collection.refs_names
-                }
+        # each bias evaluation loads its model once for all the references
+        bias_evalutaions_results = {
+            bias_eval: parallel_bias_evaluation(available_bias_evaluation[bias_eval](language, cache=not no_cache), collection.testsets,
+                                                option_gender_bias_evaluation, workers)
             for bias_eval in bias_evaluations
         }
 
     if filter:
-        apply_filter(collection,filter,length_min_val,length_max_val,task)   
+        apply_filter(collection,filter,length_min_val,length_max_val,task,workers,length_unit,duplicates_threshold,not no_cache)   
     
     if seg_metric not in [me.name for me in available_nlg_tasks[task].metrics]:
         seg_metric = "BERTScore"
 
     metric = seg_metric_in_metrics(seg_metric,metric)
+    task_metrics = [m for m in metric if m in [me.name for me in available_nlg_tasks[task].metrics]]
+    batching = {"max_tokens": max_tokens, "max_batch_size": max_batch_size}
+
+    parallel_metrics = {m: (available_metrics[m], {"language": language}) for m in task_metrics if available_metrics[m].parallel}
+    parallel_results = {}
+    if workers > 1 and parallel_metrics:
+        parallel_results = parallel_multiple_comparison(collection.testsets, parallel_metrics, workers)
 
     for ref_filename in collection.refs_names:
         testset = collection.testsets[ref_filename]
-        results = {
-            m: available_metrics[m](language=language).multiple_comparison(testset) 
-            for m in metric if m in [me.name for me in available_nlg_tasks[task].metrics]}
+        with shared_rouge_scores():
+            results = {
+                m: parallel_results[ref_filename][m] if m in parallel_results.get(ref_filename, {}) 
+                else available_metrics[m](language=language, **(batching if available_metrics[m].dynamic_batching else {})).multiple_comparison(testset, cache=not no_cache) 
+                for m in task_metrics}
 
         click.secho('\n\nReference: ' + ref_filename, fg="yellow")
 
         click.secho('\nNLP Evaluation', fg="yellow") 
         results_df = display_table(systems_names,results)
         if bootstrap and num_systems > 1 and available_nlg_tasks[task].bootstrap:
-            bootstrap_df = bootstrap_result(collection,ref_filename,results,metric,x_id,y_id,num_splits,sample_ratio)
+            bootstrap_df, significance_df, intervals_df = bootstrap_result(collection,ref_filename,results,metric,x_id,y_id,num_splits,sample_ratio)
         
         if universal_metric and num_systems > 1 and available_nlg_tasks[task].universal_metrics and universal_metric in available_nlg_tasks[task].universal_metrics: 
             if universal_metric == "pairwise-comparison":
@@ -738,6 +956,7 @@ def n_compare_nlg(
                 x_name = systems_names[x_id]
                 y_name = systems_names[y_id]
                 save_bootstrap_table(bootstrap_df,x_name,y_name,saving_dir)
+                save_multiple_bootstrap_tables(significance_df,intervals_df,saving_dir)
             available_nlg_tasks[task].plots_cli_interface(seg_metric, results, collection, ref_filename, metrics_results_dir, x_id, y_id)
 
             if bias_evaluations and available_nlg_tasks[task].bias_evaluations:
@@ -854,6 +1073,13 @@ def n_compare_nlg(
     help="System Y outputs for pairwise-comparison.",
     type=click.File(),
 )
+@click.option(
+    "--workers",
+    required=False,
+    default=1,
+    type=int,
+    help="Number of processes used to score the CPU-only metrics.",
+)
 def n_compare_classification(
     source: click.File,
     system_output: Tuple[click.File],
@@ -867,7 +1093,8 @@ def n_compare_classification(
     systems_names: click.File,
     universal_metric: str,
     system_x: click.File,
-    system_y: click.File
+    system_y: click.File,
+    workers: int
 ):  
     collection = Classification.input_cli_interface(source,systems_names,system_output,reference,language, labels)
 
@@ -895,10 +1122,16 @@ def n_compare_classification(
             y_id = collection.indexes_of_systems()[1]
 
     labels = collection.labels
+    parallel_metrics = {m: (available_metrics[m], {"labels": labels}) for m in metric if available_metrics[m].parallel}
+    parallel_results = {}
+    if workers > 1 and parallel_metrics:
+        parallel_results = parallel_multiple_comparison(collection.testsets, parallel_metrics, workers)
+
     for ref_filename in collection.refs_names:
         testset = collection.testsets[ref_filename]
         results = {
-            m: available_metrics[m](labels=labels).multiple_comparison(testset) 
+            m: parallel_results[ref_filename][m] if m in parallel_results.get(ref_filename, {}) 
+            else available_metrics[m](labels=labels).multiple_comparison(testset) 
             for m in metric 
         }
 
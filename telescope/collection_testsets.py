@@ -1,10 +1,12 @@
 from typing import List, Tuple, Dict
-from telescope.testset import Testset, MultipleTestset
+from telescope.testset import Testset, MultipleTestset, MappedMultipleTestset, StreamingTestset
+from telescope.columnar import MappedColumn, read_manifest
 from telescope.utils import read_lines, sys_ids_sort, ref_ids_sort
 
 import streamlit as st
 import click
 import abc
+import os
 
 def stop_nlp():
     st.session_state["show_results"] = False
@@ -231,39 +233,69 @@ class CollectionTestsets:
     def read_data(cls):
         return NotImplementedError
 
-    @classmethod
-    def read_data_cli(cls, source:click.File, system_names_file:click.File, systems_output:Tuple[click.File], reference:Tuple[click.File], 
-                      language, labels_file:click.File=None): 
-    
-        systems_ids, systems_names, outputs = {}, {}, {}
-        
+    @staticmethod
+    def systems_files_cli(system_names_file:click.File, systems_output:Tuple[click.File]) -> Tuple[Dict[str,str], Dict[str,str], Dict[str,click.File]]:
+        """ Id and name of each distinct system file. Returns {filename: sys_id}, {sys_id: name} and {sys_id: file}. """
+        systems_ids, systems_names, files = {}, {}, {}
+
         if system_names_file:
             sys_names = [l.replace("\n", "") for l in system_names_file.readlines()]
 
             if len(sys_names) < len(systems_output):
                 for i in range(len(systems_output)-len(sys_names)):
                     sys_names.append("Sys " + str(i+1))
-            
-            id = 1
-            for sys_file,sys_name in zip(systems_output,sys_names):
-                if sys_file.name not in systems_ids:
-                    data = [l.strip() for l in sys_file.readlines()]
-                    sys_id = "Sys " + str(id)
-                    id += 1
-                    systems_ids[sys_file.name] = sys_id
-                    systems_names[sys_id] = sys_name
-                    outputs[sys_id] = data
-            
         else:
-            id = 1
-            for sys_file in systems_output:
-                if sys_file.name not in systems_ids:
-                    data = [l.strip() for l in sys_file.readlines()]
-                    sys_id = "Sys " + str(id)
-                    id += 1
-                    systems_ids[sys_file.name] = sys_id
-                    systems_names[sys_id] = sys_id
-                    outputs[sys_id] = data
+            sys_names = [None for _ in systems_output]
+
+        id = 1
+        for sys_file,sys_name in zip(systems_output,sys_names):
+            if sys_file.name not in systems_ids:
+                sys_id = "Sys " + str(id)
+                id += 1
+                systems_ids[sys_file.name] = sys_id
+                systems_names[sys_id] = sys_name if sys_name is not None else sys_id
+                files[sys_id] = sys_file
+        return systems_ids, systems_names, files
+
+    @classmethod
+    def streaming_data_cli(cls, source:click.File, system_names_file:click.File, systems_output:Tuple[click.File], reference:Tuple[click.File],
+                           chunk_size:int) -> Tuple[StreamingTestset, Dict[str,str], Dict[str,str]]:
+        """ Same inputs as read_data_cli but the files are only read chunk by chunk while the testset is scored.
+        Returns the streaming testset, {filename: sys_id} and {sys_id: name}. """
+        systems_ids, systems_names, files = cls.systems_files_cli(system_names_file, systems_output)
+        references = {}
+        for ref in reference:
+            if ref.name not in references:
+                references[ref.name] = ref
+        return StreamingTestset(source, references, files, chunk_size), systems_ids, systems_names
+
+    @classmethod
+    def read_packed_cli(cls, folder:str, language:str):
+        """ Collection whose testsets are memory-mapped from a folder written by `telescope pack`. """
+        manifest = read_manifest(folder)
+        column = lambda entry: MappedColumn.load(os.path.join(folder, entry["column"]))
+
+        src = column(manifest["source"])
+        outputs = {entry["id"]: column(entry) for entry in manifest["systems"]}
+        systems_ids = {entry["filename"]: entry["id"] for entry in manifest["systems"]}
+        systems_names = {entry["id"]: entry["name"] for entry in manifest["systems"]}
+
+        testsets, refs_ids = {}, {}
+        for i, entry in enumerate(manifest["references"]):
+            ref_filename = entry["filename"]
+            refs_ids[ref_filename] = "Ref " + str(i + 1)
+            filenames = [manifest["source"]["filename"], ref_filename] + list(systems_ids.keys())
+            testsets[ref_filename] = MappedMultipleTestset(src, column(entry), refs_ids[ref_filename], outputs, cls.task, filenames)
+
+        return cls(manifest["source"]["filename"], refs_ids.keys(), refs_ids, systems_ids, systems_names,
+                   [manifest["source"]["filename"]] + list(refs_ids.keys()) + list(systems_ids.values()), testsets, language)
+
+    @classmethod
+    def read_data_cli(cls, source:click.File, system_names_file:click.File, systems_output:Tuple[click.File], reference:Tuple[click.File], 
+                      language, labels_file:click.File=None): 
+    
+        systems_ids, systems_names, files = cls.systems_files_cli(system_names_file, systems_output)
+        outputs = {sys_id: [l.strip() for l in sys_file.readlines()] for sys_id, sys_file in files.items()}
         
         id = 1
         references,refs_ids = {},{}
@@ -0,0 +1,173 @@
+import json
+import os
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+MANIFEST_FILENAME = "manifest.json"
+BLOB_SUFFIX = ".bin"
+OFFSETS_SUFFIX = ".offsets.npy"
+
+
+def pack_column(lines: Iterable[str], path: str) -> int:
+    """
+    Writes a column of segments as a UTF-8 blob and the array of its offsets.
+    The lines are read one at a time, so the column is never fully loaded in memory.
+
+    :param lines: Segments (surrounding whitespace is stripped like in read_data_cli).
+    :param path: Path of the column without suffix.
+    :return: Number of segments.
+    """
+    offsets, position = [0], 0
+    with open(path + BLOB_SUFFIX, "wb") as blob:
+        for line in lines:
+            data = line.strip().encode("utf-8")
+            blob.write(data)
+            position += len(data)
+            offsets.append(position)
+    np.save(path + OFFSETS_SUFFIX, np.array(offsets, dtype=np.int64))
+    return len(offsets) - 1
+
+
+class MappedColumn(Sequence):
+    """
+    Read-only sequence of the segments of a packed column, memory-mapped from disk.
+    An optional index array selects (and orders) the visible segments, so that filtered
+    or resampled views are built with integer operations only and share the same mapping.
+
+    It is not a list: besides the Sequence protocol (len, indexing, iteration, in, index
+    and count) it supports slicing and take, which return views, and equality, + and *,
+    which compare with or return plain lists. Callers that need other list operations
+    should materialize the column with list(). Views of a loaded column are pickled as
+    the path of the column and their index, not as the mapped data.
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray, index: np.ndarray = None, path: str = None) -> None:
+        self.offsets = offsets
+        self.blob = blob
+        self.index = index
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str, index: np.ndarray = None) -> "MappedColumn":
+        return cls(*_mapped_arrays(path), index=index, path=path)
+
+    def __reduce__(self):
+        if self.path is None:
+            return MappedColumn, (np.asarray(self.offsets), np.asarray(self.blob), self.index)
+        return MappedColumn.load, (self.path, self.index)
+
+    def positions(self) -> np.ndarray:
+        """ Position in the packed column of each visible segment. """
+        if self.index is None:
+            return np.arange(len(self.offsets) - 1)
+        return self.index
+
+    def take(self, ids: Iterable[int]) -> "MappedColumn":
+        """ View with the segments at the given positions of this view. """
+        return MappedColumn(self.offsets, self.blob, self.positions()[np.asarray(ids, dtype=np.int64)], self.path)
+
+    def _decode(self, position: int) -> str:
+        return self.blob[self.offsets[position] : self.offsets[position + 1]].tobytes().decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1 if self.index is None else len(self.index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(np.arange(len(self))[i])
+        if self.index is None:
+            return self._decode(range(len(self))[i])
+        return self._decode(int(self.index[i]))
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._decode, self.positions().tolist())
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, MappedColumn) and self.blob is other.blob:
+            return np.array_equal(self.positions(), other.positions())
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return False
+
+    __hash__ = None
+
+    def __add__(self, other) -> List[str]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[str]:
+        return list(other) + list(self)
+
+    def __mul__(self, n: int) -> List[str]:
+        return list(self) * n
+
+    __rmul__ = __mul__
+
+
+def _mapped_arrays(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """ Offsets and blob of a packed column, mapped once per process (and again if the column is rewritten). """
+    stat = os.stat(path + BLOB_SUFFIX)
+    return _map_column(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def _map_column(path: str, mtime: int, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.load(path + OFFSETS_SUFFIX, mmap_mode="r")
+    if size == 0:
+        blob = np.empty(0, dtype=np.uint8)  # np.memmap does not map empty files
+    else:
+        blob = np.memmap(path + BLOB_SUFFIX, dtype=np.uint8, mode="r")
+    return offsets, blob
+
+
+def pack_testset(
+    folder: str,
+    source: Tuple[str, Iterable[str]],
+    references: Dict[str, Iterable[str]],
+    systems_output: Dict[str, Tuple[str, Iterable[str]]],
+    systems_names: Dict[str, str],
+) -> int:
+    """
+    Packs a source, its references and the systems outputs into a folder.
+
+    :param folder: Output folder, created if needed.
+    :param source: (filename, lines) of the source.
+    :param references: {filename: lines} of each reference.
+    :param systems_output: {sys_id: (filename, lines)} of each system, keyed by sys_id.
+    :param systems_names: Name of each sys_id.
+    :return: Number of segments.
+    """
+    os.makedirs(folder, exist_ok=True)
+    manifest = {"source": {"filename": source[0], "column": "src"}, "references": [], "systems": []}
+    lengths = {source[0]: pack_column(source[1], os.path.join(folder, "src"))}
+    for i, (filename, lines) in enumerate(references.items()):
+        column = "ref-" + str(i + 1)
+        lengths[filename] = pack_column(lines, os.path.join(folder, column))
+        manifest["references"].append({"filename": filename, "column": column})
+    for i, (sys_id, (filename, lines)) in enumerate(systems_output.items()):
+        column = "sys-" + str(i + 1)
+        lengths[filename] = pack_column(lines, os.path.join(folder, column))
+        manifest["systems"].append(
+            {"filename": filename, "id": sys_id, "name": systems_names[sys_id], "column": column}
+        )
+
+    num_lines = lengths[source[0]]
+    mismatched = [filename for filename, length in lengths.items() if length != num_lines]
+    if mismatched:
+        raise ValueError("mismatch between the number of lines of {} and the source ({})".format(
+            ", ".join(mismatched), num_lines))
+    manifest["num_lines"] = num_lines
+
+    with open(os.path.join(folder, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return num_lines
+
+
+def read_manifest(folder: str) -> dict:
+    with open(os.path.join(folder, MANIFEST_FILENAME)) as f:
+        return json.load(f)
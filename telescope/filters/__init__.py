@@ -2,6 +2,7 @@ import sys
 from .ner import NERFilter
 from .length import LengthFilter
 from .duplicates import DuplicatesFilter
+from .pipeline import FilterPipeline
 
 from telescope.utils import read_yaml_file
 
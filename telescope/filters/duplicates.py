@@ -12,36 +12,99 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from collections import Counter
-from typing import List
+import hashlib
+import zlib
+from itertools import islice
+from typing import Dict, Iterable, List
 
+import numpy as np
 from telescope.filters.filter import Filter
 from telescope.testset import Testset
 
+# number of hash functions of the MinHash signatures, split into bands of ROWS values
+NUM_PERM = 64
+ROWS = 4
+
+# character n-grams compared by the near-duplicate detection
+SHINGLE_SIZE = 5
+
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+PERM_B = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+
+
+def segment_hashes(segments: Iterable[str]) -> np.ndarray:
+    """ 64-bit digest of each segment, read one segment at a time. """
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in segments),
+        dtype=np.uint64,
+    )
+
+
+def first_occurrences(hashes: np.ndarray) -> np.ndarray:
+    """ Sorted positions of the first occurrence of each distinct hash. """
+    return np.sort(np.unique(hashes, return_index=True)[1])
+
+
+def minhash(segment: str) -> np.ndarray:
+    """ MinHash signature of the set of character n-grams of a segment. """
+    text = " ".join(segment.lower().split())
+    shingles = {text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    values = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+    # multiply-shift hashing: high 32 bits of (a * x + b) mod 2^64, with a odd
+    permuted = (values[:, None] * PERM_A[None, :] + PERM_B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0)
+
+
+def near_duplicates(segments: Iterable[str], positions: Iterable[int], threshold: float) -> List[int]:
+    """
+    Positions of the segments that are not near-duplicates of a previous kept segment.
+    Candidates share at least one band of their MinHash signatures (LSH) and are dropped when
+    the estimated Jaccard similarity of their n-grams is at least the threshold.
+
+    :param segments: Segments at the given positions, read one at a time.
+    :param positions: Position of each segment.
+    """
+    buckets: Dict[tuple, List[int]] = {}
+    signatures = np.empty((0, NUM_PERM), dtype=np.uint64)
+    kept = []
+    for position, segment in zip(positions, segments):
+        signature = minhash(segment)
+        bands = [(b, signature[b * ROWS : (b + 1) * ROWS].tobytes()) for b in range(NUM_PERM // ROWS)]
+        candidates = list({c for band in bands for c in buckets.get(band, [])})
+        if candidates and (signatures[candidates] == signature).mean(axis=1).max() >= threshold:
+            continue
+        if len(kept) == len(signatures):  # grows the signatures by doubling
+            signatures = np.concatenate([signatures, np.empty_like(signatures, shape=(max(1, len(kept)), NUM_PERM))])
+        for band in bands:
+            buckets.setdefault(band, []).append(len(kept))
+        signatures[len(kept)] = signature
+        kept.append(position)
+    return kept
+
 
 class DuplicatesFilter(Filter):
+    """
+    Keeps the first occurrence of each segment. With a threshold below 1, segments whose
+    character n-grams are similar to the ones of a previous segment are also removed.
+    """
+
     name = "remove-duplicates"
 
-    def __init__(self, testset: Testset, *args):
+    def __init__(self, testset: Testset, threshold: float = 1.0, *args):
+        """
+        :param threshold: Jaccard similarity from which two segments are near-duplicates.
+        """
         self.testset = testset
+        self.threshold = threshold
 
     def apply_filter(self) -> List[int]:
         if len(self.testset.ref) == len(self.testset.src) and self.testset.task != "summarization" and self.testset.task != "dialogue-system":
-            counter = Counter(self.testset.src)
-            file_item = 0
+            segments = self.testset.src
         else:
-            counter = Counter(self.testset.ref)
-            file_item = 1
-
-        segments = []
-
-        for i, item in enumerate(self.testset):
-            seg = item[file_item]
-            if counter[seg] == 0:
-                continue
-            # if counter > 1 we set it to 0 to skip the next time it appears
-            if counter[seg] > 1:
-                counter[seg] = 0
+            segments = self.testset.ref
 
-            segments.append(i)
-        return segments
+        keep = first_occurrences(segment_hashes(islice(segments, len(self.testset))))
+        if self.threshold < 1.0:
+            return near_duplicates((segments[i] for i in keep.tolist()), keep.tolist(), self.threshold)
+        return keep.tolist()
@@ -12,51 +12,86 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import OrderedDict
 from typing import List
 
-import pandas as pd
+import numpy as np
 from telescope.filters.filter import Filter
+from telescope.filters.pipeline import testset_key
 from telescope.testset import Testset
 
+LENGTH_UNITS = ["characters", "tokens"]
+
+# width of the percentile buckets of the length distribution
+BUCKET_WIDTH = 5
+
+# number of (testset, unit) length distributions kept in memory
+CACHE_SIZE = 64
+
+_buckets = OrderedDict()
+
+
+def segment_lengths(segments: List[str], unit: str = "characters") -> np.ndarray:
+    """ Length of each segment in characters or in whitespace-separated tokens. """
+    if unit == "tokens":
+        return np.fromiter((len(s.split()) for s in segments), dtype=np.int64, count=len(segments))
+    return np.fromiter(map(len, segments), dtype=np.int64, count=len(segments))
+
+
+def length_buckets(lengths: np.ndarray) -> np.ndarray:
+    """
+    Percentile bucket (0, 5, ..., 95) of each segment in the length distribution.
+    Segments are ranked by length (ties in order of appearance) and the ranks are split
+    into 20 buckets with the same number of segments.
+    """
+    if len(lengths) == 1:
+        # a single segment is ranked against an empty one, as in the original qcut implementation
+        return length_buckets(np.append(lengths, 0))[:1]
+    n = len(lengths)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[np.argsort(lengths, kind="stable")] = np.arange(1, n + 1)
+    edges = np.quantile(np.arange(1, n + 1), np.linspace(0, 1, 100 // BUCKET_WIDTH + 1))
+    # buckets are closed on the right and the first one also holds the lowest rank
+    buckets = np.maximum(np.searchsorted(edges, ranks, side="left") - 1, 0)
+    return buckets * BUCKET_WIDTH
+
 
 class LengthFilter(Filter):
+    """
+    Keeps the segments whose length percentile bucket is in [min_value, max_value).
+    The buckets of each testset are cached, so moving the interval does not recompute them.
+    """
+
     name = "length"
 
-    def __init__(self, testset: Testset, min_value: float, max_value: float, *args):
+    def __init__(self, testset: Testset, min_value: float, max_value: float, unit: str = "characters", *args):
+        """
+        :param unit: Length in "characters" or in "tokens".
+        """
         super().__init__(testset)
         self.min_value = min_value
         self.max_value = max_value
+        self.unit = unit
         assert self.min_value < self.max_value, f"Length Filter min value can't be smaller than max value ({min_value} > {max_value})."
+        assert self.unit in LENGTH_UNITS, f"Length Filter unit must be one of {', '.join(LENGTH_UNITS)}."
+
+    def buckets(self) -> np.ndarray:
+        key = (testset_key(self.testset), self.unit)
+        if key in _buckets:
+            _buckets.move_to_end(key)
+            return _buckets[key]
+        text = self.testset.src if self.testset.task == "classification" else self.testset.ref
+        buckets = length_buckets(segment_lengths(text, self.unit))
+        _buckets[key] = buckets
+        if len(_buckets) > CACHE_SIZE:
+            _buckets.popitem(last=False)
+        return buckets
+
+    def mask(self) -> np.ndarray:
+        buckets = self.buckets()[: len(self.testset)]
+        return (buckets >= self.min_value) & (buckets < self.max_value)
 
     def apply_filter(self) -> List[int]:
-        dataframe = pd.DataFrame()
-
-        if self.testset.task == "classification":
-            text = self.testset.src
-        else:
-            text = self.testset.ref
-
-        if len(text) != 1:
-            dataframe["text"] = text
-        else:
-            dataframe["text"] = text + [""]
-
-        dataframe["lengths"] = [len(text) for text in list(dataframe["text"])]
-        dataframe["bins"], retbins = pd.qcut(
-            dataframe["lengths"].rank(method="first"),
-            len(range(0, 100, 5)),
-            labels=range(0, 100, 5),
-            retbins=True,
-        )
-        if len(text) != 1:
-            length_buckets = list(dataframe["bins"])
-        else:
-            length_buckets = [list(dataframe["bins"])[0]]
-        return [
-            i
-            for i in range(len(self.testset))
-            if (
-                length_buckets[i] >= self.min_value
-                and length_buckets[i] < self.max_value
-            )
-        ]
+        return np.flatnonzero(self.mask()).tolist()
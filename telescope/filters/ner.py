@@ -12,23 +12,98 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List
 
 import stanza
+from stanza.resources.common import DEFAULT_MODEL_DIR
+from telescope.cache import SQLiteStore
 from telescope.filters.filter import Filter
+from telescope.metrics.cache import segment_hash
 from telescope.testset import Testset
 
 STANZA_NER_LANGS = ["ar", "zh", "nl", "en", "fr", "de", "ru", "uk"]
 
+# number of segments given to the Stanza pipeline at once
+BATCH_SIZE = 64
+
+# Stanza pipeline of the worker process, built once when the worker starts
+_engine = None
+
+
+def model_available(language: str) -> bool:
+    """ Whether the tokenize and NER models of the language are already downloaded. """
+    return os.path.isfile(os.path.join(DEFAULT_MODEL_DIR, "resources.json")) and all(
+        os.path.isdir(os.path.join(DEFAULT_MODEL_DIR, language, processor))
+        for processor in ["tokenize", "ner"]
+    )
+
+
+def download_model(language: str) -> None:
+    if not model_available(language):
+        stanza.download(language)
+
+
+def load_engine(language: str) -> stanza.Pipeline:
+    """ Stanza NER pipeline, downloading the models only when they are missing. """
+    download_model(language)
+    return stanza.Pipeline(lang=language, processors="tokenize,ner", download_method=None)
+
+
+def has_entities(engine: stanza.Pipeline, segments: List[str]) -> List[bool]:
+    """ Whether each segment has named entities, processing the segments in batches of documents. """
+    flags = []
+    for i in range(0, len(segments), BATCH_SIZE):
+        docs = engine.bulk_process(segments[i : i + BATCH_SIZE])
+        flags.extend(bool(doc.ents) for doc in docs)
+    return flags
+
+
+def _init_worker(language: str) -> None:
+    global _engine
+    _engine = load_engine(language)
+
+
+def _annotate(segments: List[str]) -> List[bool]:
+    return has_entities(_engine, segments)
+
+
+class EntityCache:
+    """
+    Persistent store of whether each segment has named entities, keyed by (language,
+    Stanza version, segment hash), so that a Stanza upgrade annotates the segments again.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.store = SQLiteStore("entities", path)
+
+    def get(self, language: str, keys: Iterable[str]) -> Dict[str, bool]:
+        found = self.store.get("{}/{}".format(language, stanza.__version__), keys)
+        return {key: bool(value) for key, value in found.items()}
+
+    def put(self, language: str, flags: Dict[str, bool]) -> None:
+        self.store.put("{}/{}".format(language, stanza.__version__), {key: int(flag) for key, flag in flags.items()})
+
 
 class NERFilter(Filter):
+    """
+    Keeps the segments with named entities. Whether a segment has entities is stored in the
+    EntityCache, so only new segments go through Stanza.
+    """
+
     name = "named-entities"
 
-    def __init__(self, testset: Testset, source_language: str, target_language:str, *args):
+    def __init__(self, testset: Testset, source_language: str, target_language:str, workers: int = 1, cache: bool = True, *args):
+        """
+        :param workers: Number of processes running Stanza, each with its own pipeline.
+        :param cache: Whether to read and store the annotations in the EntityCache.
+        """
         super().__init__(testset)
         self.set_language(source_language, target_language)
-        stanza.download(self.language)
-        self.engine = stanza.Pipeline(lang=self.language, processors="tokenize,ner")
+        self.workers = workers
+        self.cache = cache
+        self.engine = None
 
     def set_language(self, source_language: str, target_language:str) -> None:
         if (source_language in STANZA_NER_LANGS) and (len(self.testset.ref) == len(self.testset.src)) and self.testset.task != "summarization" and self.testset.task != "dialogue-system":
@@ -42,11 +117,32 @@ class NERFilter(Filter):
                 "{} is not supperted by Stanza NER.".format(source_language + "-" + target_language)
             )
 
+    def annotate(self, segments: List[str]) -> List[bool]:
+        """ Runs Stanza over the segments, in this process or in a pool of workers. """
+        if self.workers > 1 and len(segments) > BATCH_SIZE:
+            download_model(self.language)  # once, before the workers load the pipeline
+            batches = [segments[i : i + BATCH_SIZE] for i in range(0, len(segments), BATCH_SIZE)]
+            with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.language,)
+            ) as executor:
+                return [flag for flags in executor.map(_annotate, batches) for flag in flags]
+        if self.engine is None:
+            self.engine = load_engine(self.language)
+        return has_entities(self.engine, segments)
+
     def apply_filter(self) -> List[int]:
-        segments_with_ne = []
-        for i, segment in enumerate(self.segments):
-            doc = self.engine(segment)
-            if doc.ents:
-                segments_with_ne.append(i)
+        keys = [segment_hash(segment, "", "") for segment in self.segments]
+        cache = EntityCache() if self.cache else None
+        found = cache.get(self.language, set(keys)) if cache else {}
+
+        missing = {}
+        for key, segment in zip(keys, self.segments):
+            if key not in found and key not in missing:
+                missing[key] = segment
+        if missing:
+            flags = dict(zip(missing, self.annotate(list(missing.values()))))
+            if cache:
+                cache.put(self.language, flags)
+            found.update(flags)
 
-        return segments_with_ne
+        return [i for i, key in enumerate(keys) if found[key]]
@@ -0,0 +1,81 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, Tuple, Type
+
+import numpy as np
+from telescope.filters.filter import Filter
+from telescope.testset import Testset
+
+# number of filter masks kept in memory
+MASK_CACHE_SIZE = 64
+
+_masks = OrderedDict()
+
+
+def testset_columns(testset: Testset) -> list:
+    """ Columns of segments of a testset: source, references/outputs and systems outputs. """
+    columns = [getattr(testset, name) for name in ["src", "ref", "output", "system_x", "system_y"] if hasattr(testset, name)]
+    return columns + list(getattr(testset, "systems_output", {}).values())
+
+
+def content_digest(testset: Testset) -> str:
+    """ blake2b of the segments of every column, computed again only when a column is replaced. """
+    columns = testset_columns(testset)
+    cached = getattr(testset, "_content_digest", None)
+    if cached is not None and len(cached[0]) == len(columns) and all(a is b for a, b in zip(cached[0], columns)):
+        return cached[1]
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        digest.update(str(len(column)).encode("utf-8"))
+        for segment in column:
+            digest.update(b"\n" + segment.encode("utf-8"))
+        digest.update(b"\0")
+    testset._content_digest = (columns, digest.hexdigest())
+    return testset._content_digest[1]
+
+
+def testset_key(testset: Testset) -> tuple:
+    """ Identifies a testset (and its current content) in the masks cache. """
+    hash_func = getattr(testset, "hash_func", None)
+    name = hash_func(testset) if hash_func is not None else str(id(testset))
+    return type(testset).__name__, name, len(testset), content_digest(testset)
+
+
+class FilterPipeline(Filter):
+    """
+    Filters evaluated independently over the indices of the original testset.
+    The boolean mask of each filter is cached per (filter, params, testset), the masks are
+    intersected and the testset is materialized only once, with the segments kept by every filter.
+    """
+
+    name = "pipeline"
+
+    def __init__(self, testset: Testset, filters: List[Tuple[Type[Filter], tuple]]):
+        """
+        :param testset: Testset to filter.
+        :param filters: Filter class and the arguments given to it after the testset.
+        """
+        super().__init__(testset)
+        self.filters = filters
+
+    def filter_mask(self, filter_cls: Type[Filter], args: tuple) -> np.ndarray:
+        """ Segments kept by one filter. The filter is only built when its mask is not cached. """
+        key = (filter_cls.name, tuple(args), testset_key(self.testset))
+        if key in _masks:
+            _masks.move_to_end(key)
+            return _masks[key]
+        mask = np.zeros(len(self.testset), dtype=bool)
+        mask[np.asarray(filter_cls(self.testset, *args).apply_filter(), dtype=np.int64)] = True
+        _masks[key] = mask
+        if len(_masks) > MASK_CACHE_SIZE:
+            _masks.popitem(last=False)
+        return mask
+
+    def mask(self) -> np.ndarray:
+        mask = np.ones(len(self.testset), dtype=bool)
+        for filter_cls, args in self.filters:
+            mask &= self.filter_mask(filter_cls, args)
+        return mask
+
+    def apply_filter(self) -> List[int]:
+        return np.flatnonzero(self.mask()).tolist()
@@ -30,7 +30,7 @@ from .fn_rate import FNRate
 from .np_value import NPValue
 from .tn_rate import TNRate
 
-from .result import MetricResult, PairwiseResult, BootstrapResult
+from .result import MetricResult, PairwiseResult, BootstrapResult, MultipleBootstrapResult
 
 from telescope.utils import read_yaml_file
 
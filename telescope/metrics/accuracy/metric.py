@@ -1,33 +1,16 @@
-from typing import List
+from typing import List, Optional, Tuple
 
-from telescope.metrics.metric import Metric
-from telescope.metrics.result import MetricResult
+from telescope.metrics.confusion import ConfusionMatrix, ConfusionMetric, ratio
 
-from sklearn.metrics import accuracy_score, multilabel_confusion_matrix
 
-
-class Accuracy(Metric):
+class Accuracy(ConfusionMetric):
 
     name = "Accuracy"
     segment_level = True
+    parallel = True
 
-    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
-        if ref == []:
-            score = 0
-        else:
-            score = accuracy_score(ref, cand)
-        labels = self.labels
-        number_of_labels = len(labels)
-        label_scores = []
-
-        matrix = multilabel_confusion_matrix(ref, cand, labels=labels)
-
-        for i in range(number_of_labels):
-            tn,fp,fn,tp = list(list(matrix[i][0]) + list(matrix[i][1]))
-            sum = tn+fp+fn+tp
-            if sum == 0:
-                label_scores.append(sum)
-            else:
-                label_scores.append((tp+tn)/(sum))
-
-        return MetricResult(score,label_scores, src, cand, ref, self.name)
+    def confusion_scores(self, confusion: ConfusionMatrix) -> Tuple[Optional[float], List[float]]:
+        tn, fp, fn, tp = confusion.counts(self.labels)
+        score = float(ratio(confusion.tp.sum(), confusion.total))
+        label_scores = ratio(tp + tn, tn + fp + fn + tp)
+        return score, label_scores.tolist()
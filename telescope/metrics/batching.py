@@ -0,0 +1,46 @@
+from typing import List, Sequence
+
+import numpy as np
+
+# Default number of (padded) tokens per batch of the neural metrics
+MAX_TOKENS = 2048
+MAX_BATCH_SIZE = 64
+
+
+def token_budget_batches(
+    lengths: Sequence[int], max_tokens: int = MAX_TOKENS, max_batch_size: int = MAX_BATCH_SIZE
+) -> List[np.ndarray]:
+    """
+    Groups segments of similar length so that each padded batch holds at most max_tokens tokens.
+
+    :param lengths: Number of tokens of each segment.
+    :param max_tokens: Token budget of a batch (batch size x longest segment in the batch).
+    :param max_batch_size: Maximum number of segments in a batch.
+    :return: List of batches, each one an array with the original indices of its segments.
+    """
+    lengths = np.asarray(lengths)
+    order = np.argsort(lengths, kind="stable")
+    batches, start = [], 0
+    for end in range(1, len(order) + 1):
+        longest = max(int(lengths[order[end - 1]]), 1)
+        if end - start > 1 and ((end - start) * longest > max_tokens or end - start > max_batch_size):
+            batches.append(order[start : end - 1])
+            start = end - 1
+    if start < len(order):
+        batches.append(order[start:])
+    return batches
+
+
+def restore_order(batches: List[np.ndarray], values: Sequence) -> list:
+    """
+    Puts back in the original order the values computed batch after batch.
+
+    :param batches: Batches returned by token_budget_batches.
+    :param values: Values of all segments, concatenated in batch order.
+    """
+    if not batches:
+        return []
+    restored = [None] * len(values)
+    for i, value in zip(np.concatenate(batches), values):
+        restored[i] = value
+    return restored
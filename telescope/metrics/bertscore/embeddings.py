@@ -0,0 +1,110 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import bert_score
+import torch
+from bert_score.utils import get_bert_embedding, get_idf_dict, greedy_cos_idf, sent_encode
+from telescope.metrics.batching import token_budget_batches
+from torch.nn.utils.rnn import pad_sequence
+
+
+def idf_weights(scorer: bert_score.BERTScorer, sentences: List[str] = None) -> Dict[int, float]:
+    """
+    IDF weight of each word piece, computed from the given sentences.
+    Without sentences every word piece weighs 1 (except [CLS] and [SEP]), as in BERTScore without idf.
+    """
+    if sentences is not None:
+        return get_idf_dict(sentences, scorer._tokenizer, nthreads=scorer.nthreads)
+    idf_dict = defaultdict(lambda: 1.0)
+    idf_dict[scorer._tokenizer.sep_token_id] = 0
+    idf_dict[scorer._tokenizer.cls_token_id] = 0
+    return idf_dict
+
+
+class TokenEmbeddings:
+    """
+    Token embeddings and IDF weights of sentences, each sentence encoded only once.
+    A store built from the references of a testset is kept while the systems are scored
+    and every system adds its candidates to a child store that is discarded afterwards.
+    """
+
+    def __init__(
+        self,
+        scorer: bert_score.BERTScorer,
+        idf_dict: Dict[int, float],
+        max_tokens: int,
+        max_batch_size: int,
+        parent: "TokenEmbeddings" = None,
+    ) -> None:
+        self.scorer = scorer
+        self.idf_dict = idf_dict
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.parent = parent
+        self.stats = {}
+
+    def __contains__(self, sentence: str) -> bool:
+        return sentence in self.stats or (self.parent is not None and sentence in self.parent)
+
+    def __getitem__(self, sentence: str) -> Tuple[torch.Tensor, torch.Tensor]:
+        if sentence in self.stats:
+            return self.stats[sentence]
+        return self.parent[sentence]
+
+    def child(self) -> "TokenEmbeddings":
+        return TokenEmbeddings(
+            self.scorer, self.idf_dict, self.max_tokens, self.max_batch_size, parent=self
+        )
+
+    def add(self, sentences: List[str]) -> None:
+        """ Encodes the sentences that are not stored yet, in length-sorted batches. """
+        tokenizer = self.scorer._tokenizer
+        new = [sentence for sentence in dict.fromkeys(sentences) if sentence not in self]
+        lengths = [len(sent_encode(tokenizer, sentence)) for sentence in new]
+        for batch in token_budget_batches(lengths, self.max_tokens, self.max_batch_size):
+            sen_batch = [new[i] for i in batch]
+            embs, masks, padded_idf = get_bert_embedding(
+                sen_batch,
+                self.scorer._model,
+                tokenizer,
+                self.idf_dict,
+                device=self.scorer.device,
+                all_layers=self.scorer.all_layers,
+            )
+            embs, masks, padded_idf = embs.cpu(), masks.cpu(), padded_idf.cpu()
+            for i, sentence in enumerate(sen_batch):
+                sequence_len = masks[i].sum().item()
+                self.stats[sentence] = (embs[i, :sequence_len], padded_idf[i, :sequence_len])
+
+    def length(self, sentence: str) -> int:
+        return self[sentence][0].size(0)
+
+    def padded(self, sentences: List[str]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """ Padded embeddings, mask and IDF weights of a batch of stored sentences. """
+        device = self.scorer.device
+        emb, idf = zip(*(self[sentence] for sentence in sentences))
+        lens = torch.tensor([e.size(0) for e in emb], dtype=torch.long)
+        emb_pad = pad_sequence([e.to(device) for e in emb], batch_first=True, padding_value=2.0)
+        idf_pad = pad_sequence([i.to(device) for i in idf], batch_first=True)
+        pad_mask = torch.arange(int(lens.max())).expand(len(lens), -1) < lens.unsqueeze(1)
+        return emb_pad, pad_mask.to(device), idf_pad
+
+
+def greedy_matching(
+    cand: List[str], ref: List[str], embeddings: TokenEmbeddings
+) -> Tuple[List[float], List[float], List[float]]:
+    """
+    BERTScore precision, recall and F1 of each candidate against its reference.
+    Both sides must already be in the embeddings store.
+    """
+    lengths = [max(embeddings.length(c), embeddings.length(r)) for c, r in zip(cand, ref)]
+    batches = token_budget_batches(lengths, embeddings.max_tokens, embeddings.max_batch_size)
+    precision, recall, f1 = [0.0] * len(cand), [0.0] * len(cand), [0.0] * len(cand)
+    with torch.no_grad():
+        for batch in batches:
+            ref_stats = embeddings.padded([ref[i] for i in batch])
+            hyp_stats = embeddings.padded([cand[i] for i in batch])
+            P, R, F1 = greedy_cos_idf(*ref_stats, *hyp_stats, embeddings.scorer.all_layers)
+            for i, p, r, f in zip(batch, P.tolist(), R.tolist(), F1.tolist()):
+                precision[i], recall[i], f1[i] = p, r, f
+    return precision, recall, f1
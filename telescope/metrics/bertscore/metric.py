@@ -15,32 +15,99 @@
 from typing import List
 
 import bert_score
+from bert_score.utils import lang2model
+from telescope.metrics.batching import MAX_BATCH_SIZE, MAX_TOKENS
+from telescope.metrics.bertscore.embeddings import TokenEmbeddings, greedy_matching, idf_weights
 from telescope.metrics.bertscore.result import BERTScoreResult
 from telescope.metrics.metric import Metric
+from telescope.metrics.models import load_model
+from telescope.metrics.result import MultipleMetricResults
+from telescope.testset import MultipleTestset
 
 
 class BERTScore(Metric):
 
     name = "BERTScore"
     segment_level = True
+    cacheable = True
+    dynamic_batching = True
 
-    def score(self, src: List[str], cand: List[str], ref: List[str]) -> BERTScoreResult:
-        precision, recall, f1 = bert_score.score(
-            cands=cand,
-            refs=ref,
-            idf=False,
-            batch_size=3,
-            lang=self.language,
-            rescale_with_baseline=False,
-            verbose=True,
+    def __init__(
+        self,
+        language: str = "X",
+        labels: List[str] = [" "],
+        max_tokens: int = MAX_TOKENS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        idf: bool = False,
+    ):
+        super().__init__(language, labels)
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.idf = idf
+        # idf weights depend on the whole set of references, not only on each segment
+        self.cacheable = not idf
+
+    @property
+    def scorer(self) -> bert_score.BERTScorer:
+        """ BERTScore model, loaded once per process and shared by every instance. """
+        return load_model(
+            (self.name, lang2model[self.language]),
+            lambda: bert_score.BERTScorer(
+                lang=self.language,
+                idf=False,
+                batch_size=3,
+                rescale_with_baseline=False,
+            ),
         )
+
+    def reference_embeddings(self, ref: List[str]) -> TokenEmbeddings:
+        """ Encodes the references once, to be reused by every system scored against them. """
+        scorer = self.scorer
+        idf_dict = idf_weights(scorer, ref if self.idf else None)
+        embeddings = TokenEmbeddings(scorer, idf_dict, self.max_tokens, self.max_batch_size)
+        embeddings.add(ref)
+        return embeddings
+
+    def score(self, src: List[str], cand: List[str], ref: List[str]) -> BERTScoreResult:
+        return self.score_with_embeddings(src, cand, ref, self.reference_embeddings(ref))
+
+    def score_with_embeddings(
+        self, src: List[str], cand: List[str], ref: List[str], embeddings: TokenEmbeddings
+    ) -> BERTScoreResult:
+        candidates = embeddings.child()
+        candidates.add(cand)
+        precision, recall, f1 = greedy_matching(cand, ref, candidates)
         return BERTScoreResult(
-            sum(f1.tolist()) / len(f1.tolist()),
-            f1.tolist(),
+            sum(f1) / len(f1),
+            f1,
             src,
             cand,
             ref,
             self.name,
-            precision.tolist(),
-            recall.tolist(),
+            precision,
+            recall,
+        )
+
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Encodes the references once and only the candidates of each system. """
+        src, ref = testset.src, testset.ref
+        if cache and self.cacheable and len(src) == len(ref):
+            return super().multiple_comparison(testset, cache)
+        embeddings = self.reference_embeddings(ref)
+        systems_metric_results = {
+            sys_id: self.score_with_embeddings(src, output, ref, embeddings)
+            for sys_id, output in testset.systems_output.items()
+        }
+        return MultipleMetricResults(systems_metric_results)
+
+    def model_name(self) -> str:
+        return lang2model[self.language]
+
+    def cache_values(self, result: BERTScoreResult) -> List[List[float]]:
+        return [list(values) for values in zip(result.precision, result.recall, result.f1)]
+
+    def result_from_cache(self, src: List[str], cand: List[str], ref: List[str], values: List[List[float]]) -> BERTScoreResult:
+        precision, recall, f1 = (list(scores) for scores in zip(*values))
+        return BERTScoreResult(
+            sum(f1) / len(f1), f1, src, cand, ref, self.name, precision, recall,
         )
@@ -16,6 +16,7 @@ import os
 
 from telescope.metrics.bleurt.result import BLEURTResult
 from telescope.metrics.metric import Metric
+from telescope.metrics.models import load_model
 from telescope.utils import telescope_cache_folder
 from torchnlp.download import download_file_maybe_extract
 
@@ -26,6 +27,7 @@ class BLEURT(Metric):
 
     name = "BLEURT"
     segment_level = True
+    cacheable = True
 
     def __init__(self, language, model: str = "bleurt-base-128"):
         super().__init__(language)
@@ -53,7 +55,9 @@ class BLEURT(Metric):
                 url=f"https://storage.googleapis.com/bleurt-oss/{model}.zip",
                 directory=telescope_cache_folder(),
             )
-        self.scorer = score.BleurtScorer(telescope_cache_folder() + model)
+        self.scorer = load_model(
+            (self.name, model), lambda: score.BleurtScorer(telescope_cache_folder() + model)
+        )
         self.system_only = False
 
     @classmethod
@@ -65,3 +69,12 @@ class BLEURT(Metric):
         return BLEURTResult(
             sum(scores) / len(scores), scores, src, cand, ref, self.name, self.model
         )
+
+    def model_name(self) -> str:
+        return self.model
+
+    def result_from_cache(self, src, cand, ref, values):
+        scores = [value[0] for value in values]
+        return BLEURTResult(
+            sum(scores) / len(scores), scores, src, cand, ref, self.name, self.model
+        )
@@ -0,0 +1,72 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+def bootstrap_ids(n: int, num_samples: int, sample_ratio: float) -> np.ndarray:
+    """
+    Draws all bootstrap partitions at once (with replacement).
+
+    :param n: Number of segments in the testset.
+    :param num_samples: Number of testset splits.
+    :param sample_ratio: % of the testset to be used in each partition.
+    :return: Matrix of segment indices with shape (num_samples, sample_size).
+    """
+    sample_size = max(int(n * sample_ratio), 1)
+    return np.random.randint(0, n, size=(num_samples, sample_size))
+
+
+def sample_counts(reduced_ids: np.ndarray, n: int) -> np.ndarray:
+    """
+    Converts a matrix of resampled indices into the number of times each segment
+    was drawn in each partition.
+
+    :param reduced_ids: Matrix of segment indices with shape (num_samples, sample_size).
+    :param n: Number of segments in the testset.
+    :return: Count matrix with shape (num_samples, n).
+    """
+    num_samples = reduced_ids.shape[0]
+    offsets = (np.arange(num_samples) * n)[:, None]
+    counts = np.bincount((reduced_ids + offsets).ravel(), minlength=num_samples * n)
+    return counts.reshape(num_samples, n)
+
+
+def bootstrap_means(seg_scores: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Averages the segment-level scores of every system over every partition.
+
+    :param seg_scores: Segment-level scores with shape (n_systems, n).
+    :param counts: Count matrix returned by sample_counts.
+    :return: Resampled system-level scores with shape (n_systems, num_samples).
+    """
+    seg_scores = np.asarray(seg_scores, dtype=np.float64)
+    return (seg_scores @ counts.T) / counts[0].sum()
+
+
+def bootstrap_sums(seg_stats: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Sums per-segment sufficient statistics (e.g. n-gram matches) over every partition.
+
+    :param seg_stats: Sufficient statistics with shape (n, n_stats).
+    :param counts: Count matrix returned by sample_counts.
+    :return: Resampled corpus statistics with shape (num_samples, n_stats).
+    """
+    return counts @ seg_stats
+
+
+def win_counts(
+    x_scores: np.ndarray, y_scores: np.ndarray, lower_is_better: bool = False
+) -> List[int]:
+    """
+    Counts the partitions won by system x, won by system y and tied.
+
+    :return: [x_wins, y_wins, ties]
+    """
+    x_scores, y_scores = np.asarray(x_scores), np.asarray(y_scores)
+    if lower_is_better:
+        x_scores, y_scores = y_scores, x_scores
+    return [
+        int(np.sum(x_scores > y_scores)),
+        int(np.sum(y_scores > x_scores)),
+        int(np.sum(x_scores == y_scores)),
+    ]
@@ -0,0 +1,30 @@
+import hashlib
+import json
+from typing import Dict, Iterable, List
+
+from telescope.cache import SQLiteStore
+
+
+def segment_hash(src: str, cand: str, ref: str) -> str:
+    """ Content hash of a (source, candidate, reference) triple. Each field is prefixed
+    with its length, so that segments with newlines cannot collide with other triples. """
+    triple = "".join("{}:{}".format(len(field), field) for field in [src, cand, ref]).encode("utf-8")
+    return hashlib.blake2b(triple, digest_size=16).hexdigest()
+
+
+class SegmentScoreCache:
+    """
+    Persistent store of segment-level scores keyed by (metric, model, segment hash).
+    Each entry keeps the list of values a metric needs to rebuild its result
+    (e.g. the COMET score or the BERTScore precision, recall and F1).
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.store = SQLiteStore("scores", path)
+
+    def get(self, metric: str, model: str, keys: Iterable[str]) -> Dict[str, List[float]]:
+        found = self.store.get("{}/{}".format(metric, model), keys)
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def put(self, metric: str, model: str, values: Dict[str, List[float]]) -> None:
+        self.store.put("{}/{}".format(metric, model), {key: json.dumps(value) for key, value in values.items()})
@@ -14,7 +14,9 @@
 # limitations under the License.
 from typing import List
 
+import numpy as np
 import sacrebleu
+from sacrebleu.metrics import CHRF
 from telescope.metrics.chrf.result import chrFResult
 from telescope.metrics.metric import Metric
 
@@ -23,7 +25,19 @@ class chrF(Metric):
 
     name = "chrF"
     segment_level = False
+    sufficient_statistics = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> chrFResult:
         chrf = sacrebleu.corpus_chrf(cand, [ref])
         return chrFResult(chrf.score/100, [], src, cand, ref, self.name)
+
+    def segment_statistics(self, cand: List[str], ref: List[str]) -> np.ndarray:
+        # [hyp, ref, match] character and word n-gram counts per segment
+        return np.array(CHRF()._extract_corpus_statistics(cand, [ref]), dtype=np.int64)
+
+    def score_from_statistics(self, stats: np.ndarray) -> np.ndarray:
+        chrf = CHRF()
+        return np.array(
+            [chrf._compute_score_from_stats(s.tolist()).score / 100 for s in stats]
+        )
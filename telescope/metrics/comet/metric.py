@@ -13,15 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
-from typing import List
+from typing import Dict, List
 
+import numpy as np
 import torch
-from pytorch_lightning.trainer.trainer import Trainer
+from telescope.metrics.batching import (
+    MAX_BATCH_SIZE,
+    MAX_TOKENS,
+    restore_order,
+    token_budget_batches,
+)
 from telescope.metrics.comet.result import COMETResult
 from telescope.metrics.metric import Metric
-from torch.utils.data import DataLoader
+from telescope.metrics.models import load_model
+from telescope.metrics.result import MultipleMetricResults
+from telescope.testset import MultipleTestset
 
 from comet import download_model, load_from_checkpoint
+from comet.models import RegressionMetric
 
 if "COMET_MODEL" in os.environ:
     MODELNAME = os.environ["COMET_MODEL"]
@@ -33,26 +42,139 @@ class COMET(Metric):
 
     name = "COMET"
     system_only = False
+    cacheable = True
+    dynamic_batching = True
 
-    def __init__(self, language=None, modelname: str = MODELNAME, **kwargs):
+    def __init__(
+        self,
+        language=None,
+        modelname: str = MODELNAME,
+        max_tokens: int = MAX_TOKENS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        **kwargs
+    ):
         self.modelname = modelname
-        self.model = load_from_checkpoint(download_model(modelname))
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+
+    @property
+    def model(self):
+        """ COMET checkpoint, loaded once per process and shared by every instance. """
+        return load_model(
+            (self.name, self.modelname),
+            lambda: load_from_checkpoint(download_model(self.modelname)),
+        )
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> COMETResult:
-        data = {"src": src, "mt": cand, "ref": ref}
-        data = [dict(zip(data, t)) for t in zip(*data.values())]
-        dataloader = DataLoader(
-            dataset=data,
-            batch_size=16,
-            collate_fn=lambda x: self.model.prepare_sample(x, inference=True),
-            num_workers=4,
+        scores = self.segment_scores(src, cand, ref)
+        return COMETResult(
+            sum(scores) / len(scores), scores, src, cand, ref, self.name, self.modelname
         )
-        cuda = 1 if torch.cuda.is_available() else 0
-        trainer = Trainer(gpus=cuda, deterministic=True, logger=False)
-        predictions = trainer.predict(
-            self.model, dataloaders=dataloader, return_predictions=True
+
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Scores every system in a single batched pass: the source and reference
+        are encoded once and all system hypotheses go through the same estimator. """
+        src, ref = testset.src, testset.ref
+        if cache and len(src) == len(ref):
+            # the cache scores the missing segments of all systems in one call to score
+            return super().multiple_comparison(testset, cache)
+
+        systems_output = testset.systems_output
+        n = len(ref)
+        scores = self.segment_scores(
+            src * len(systems_output),
+            [seg for output in systems_output.values() for seg in output],
+            ref * len(systems_output),
         )
-        scores = torch.cat(predictions, dim=0).tolist()
+        systems_metric_results = {}
+        for i, (sys_id, output) in enumerate(systems_output.items()):
+            sys_scores = scores[i * n : (i + 1) * n]
+            systems_metric_results[sys_id] = COMETResult(
+                sum(sys_scores) / len(sys_scores),
+                sys_scores, src, output, ref, self.name, self.modelname,
+            )
+        return MultipleMetricResults(systems_metric_results)
+
+    def segment_scores(self, src: List[str], cand: List[str], ref: List[str]) -> List[float]:
+        model = self.model
+        if type(model) is not RegressionMetric or model.mc_dropout:
+            return self.predict(src, cand, ref)
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+        model.eval()
+        with torch.no_grad():
+            src_embs = self.sentence_embeddings(model, src, device)
+            mt_embs = self.sentence_embeddings(model, cand, device)
+            ref_embs = self.sentence_embeddings(model, ref, device)
+            scores = []
+            for i in range(0, len(cand), self.max_batch_size):
+                batch = slice(i, i + self.max_batch_size)
+                scores.append(
+                    model.estimate(src_embs[batch], mt_embs[batch], ref_embs[batch])["score"].view(-1)
+                )
+        return torch.cat(scores, dim=0).tolist()
+
+    def token_lengths(self, model, sentences: List[str]) -> List[int]:
+        tokens = model.encoder.tokenizer(
+            sentences, truncation=True, max_length=model.encoder.max_positions - 2
+        )["input_ids"]
+        return [len(ids) for ids in tokens]
+
+    def sentence_embeddings(self, model: RegressionMetric, sentences: List[str], device: str) -> torch.Tensor:
+        """ Encodes each distinct sentence once, in length-sorted batches that fit the token
+        budget, and returns one embedding per input sentence. """
+        unique: Dict[str, int] = {}
+        ids = [unique.setdefault(sentence, len(unique)) for sentence in sentences]
+        unique_sentences = list(unique)
+        batches = token_budget_batches(
+            self.token_lengths(model, unique_sentences), self.max_tokens, self.max_batch_size
+        )
+        embeddings = []
+        for batch in batches:
+            inputs = model.encoder.prepare_sample([unique_sentences[i] for i in batch])
+            embeddings.append(
+                model.get_sentence_embedding(
+                    inputs["input_ids"].to(device), inputs["attention_mask"].to(device)
+                )
+            )
+        # row of each distinct sentence inside the length-sorted embeddings
+        rows = np.empty(len(unique_sentences), dtype=np.int64)
+        rows[np.concatenate(batches)] = np.arange(len(unique_sentences))
+        return torch.cat(embeddings, dim=0)[torch.from_numpy(rows[ids]).to(device)]
+
+    def predict(self, src: List[str], cand: List[str], ref: List[str]) -> List[float]:
+        """ Scores the segments with the model predict step (ranking, referenceless and MC dropout
+        models), in length-sorted batches that fit the token budget. """
+        model = self.model
+        data = {"src": src, "mt": cand, "ref": ref}
+        data = [dict(zip(data, t)) for t in zip(*data.values())]
+        lengths = [
+            max(lengths)
+            for lengths in zip(*(self.token_lengths(model, segs) for segs in (src, cand, ref)))
+        ]
+        batches = token_budget_batches(lengths, self.max_tokens, self.max_batch_size)
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+        model.on_predict_start()  # train mode with MC dropout, eval mode otherwise
+        predictions = []
+        with torch.no_grad():
+            for batch_idx, batch in enumerate(batches):
+                inputs = model.prepare_sample([data[i] for i in batch], inference=True)
+                prediction = model.predict_step(
+                    {k: v.to(device) for k, v in inputs.items()}, batch_idx
+                )
+                if isinstance(prediction, tuple):
+                    prediction = prediction[0]  # MC dropout returns the mean and std of the scores
+                predictions.append(prediction.view(-1))
+        return restore_order(batches, torch.cat(predictions, dim=0).tolist())
+
+    def model_name(self) -> str:
+        return self.modelname
+
+    def result_from_cache(self, src: List[str], cand: List[str], ref: List[str], values: List[List[float]]) -> COMETResult:
+        scores = [value[0] for value in values]
         return COMETResult(
             sum(scores) / len(scores), scores, src, cand, ref, self.name, self.modelname
         )
@@ -0,0 +1,126 @@
+import abc
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from telescope.metrics.metric import Metric
+from telescope.metrics.result import MetricResult, MultipleMetricResults
+from telescope.testset import MultipleTestset
+from telescope.utils import intern_strings
+
+
+def ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """ Element-wise num / den, with 0 where den is 0 (zero_division=0 in sklearn). """
+    num, den = np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+
+def sorted_ids(ids: np.ndarray, uniques: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Renumbers interned ids so that the ids follow the order of the sorted strings. """
+    order = np.argsort(uniques, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[ids], uniques[order]
+
+
+class ConfusionMatrix:
+    """
+    Confusion matrix of the predictions of a system, with one row per true label and one
+    column per predicted label (both in sorted order). Every classification metric, macro
+    and per label, is derived from its tp, fp, fn and tn counts.
+    """
+
+    def __init__(self, matrix: np.ndarray, names: np.ndarray) -> None:
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.total = int(matrix.sum())
+        self.tp = np.diag(matrix).astype(np.int64)
+        self.true_sum = matrix.sum(axis=1).astype(np.int64)
+        self.pred_sum = matrix.sum(axis=0).astype(np.int64)
+        self.fp = self.pred_sum - self.tp
+        self.fn = self.true_sum - self.tp
+        self.tn = self.total - self.tp - self.fp - self.fn
+        # labels seen in the reference or in the predictions, the ones of the macro average
+        self.present = (self.true_sum + self.pred_sum) > 0
+
+    @classmethod
+    def from_outputs(cls, cand: List[str], ref: List[str]) -> "ConfusionMatrix":
+        if not ref:
+            return cls(np.zeros((0, 0), dtype=np.int64), np.empty(0, dtype=object))
+        ids, uniques = intern_strings([ref, cand])
+        ids, names = sorted_ids(ids, uniques)
+        return cls(confusion_tensor(ids[0], ids[1:], len(names))[0], names)
+
+    def counts(self, labels: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """ tn, fp, fn and tp of each given label. Labels that were never seen are all true negatives. """
+        idx = np.array([self.index.get(label, -1) for label in labels], dtype=np.int64)
+        seen = idx >= 0
+
+        def select(values: np.ndarray, default: int) -> np.ndarray:
+            selected = np.full(len(labels), default, dtype=np.int64)
+            selected[seen] = values[idx[seen]]
+            return selected
+
+        return select(self.tn, self.total), select(self.fp, 0), select(self.fn, 0), select(self.tp, 0)
+
+    def macro(self, label_scores: np.ndarray) -> float:
+        """ Unweighted mean of the scores of the present labels (sklearn average='macro'). """
+        scores = label_scores[self.present]
+        return float(np.mean(scores)) if len(scores) else 0.0
+
+
+def confusion_tensor(ref_ids: np.ndarray, systems_ids: np.ndarray, num_labels: int) -> np.ndarray:
+    """
+    Confusion matrices of several systems in a single np.bincount.
+
+    :param ref_ids: Label ids of the reference with shape (n,).
+    :param systems_ids: Label ids predicted by each system with shape (n_systems, n).
+    :return: Tensor with shape (n_systems, num_labels, num_labels).
+    """
+    num_systems = len(systems_ids)
+    cells = num_labels * num_labels
+    keys = np.arange(num_systems)[:, None] * cells + ref_ids[None, :] * num_labels + systems_ids
+    return np.bincount(keys.reshape(-1), minlength=num_systems * cells).reshape(
+        num_systems, num_labels, num_labels
+    )
+
+
+def systems_confusion(testset: MultipleTestset) -> Dict[str, ConfusionMatrix]:
+    """ Confusion matrix of every system of a testset, built from its interned labels. """
+    ref_ids, systems_ids = testset.interned()
+    cached = getattr(testset, "_confusion", None)
+    if cached is not None and cached[0] is systems_ids.base:
+        return cached[1]
+    ids, names = sorted_ids(np.vstack([ref_ids, systems_ids]), testset.distinct_strings())
+    tensor = confusion_tensor(ids[0], ids[1:], len(names))
+    matrices = {
+        sys_id: ConfusionMatrix(tensor[i], names)
+        for i, sys_id in enumerate(testset.systems_output)
+    }
+    testset._confusion = (systems_ids.base, matrices)
+    return matrices
+
+
+class ConfusionMetric(Metric):
+    """ Classification metric derived from the confusion matrix of each system. """
+
+    @abc.abstractmethod
+    def confusion_scores(self, confusion: ConfusionMatrix) -> Tuple[Optional[float], List[float]]:
+        """ System score and score of each label in self.labels. """
+        pass
+
+    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
+        score, label_scores = self.confusion_scores(ConfusionMatrix.from_outputs(cand, ref))
+        return MetricResult(score, label_scores, src, cand, ref, self.name)
+
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Scores all systems from the confusion matrices of the testset, built at once. """
+        if not testset.ref:
+            return super().multiple_comparison(testset, cache)
+        systems_metric_results = {
+            sys_id: MetricResult(
+                *self.confusion_scores(confusion), testset.src,
+                testset.systems_output[sys_id], testset.ref, self.name,
+            )
+            for sys_id, confusion in systems_confusion(testset).items()
+        }
+        return MultipleMetricResults(systems_metric_results)
@@ -1,8 +1,10 @@
 from typing import List
 
+import numpy as np
 from telescope.metrics.metric import Metric
-from telescope.metrics.result import MetricResult
-from fairlearn.metrics import demographic_parity_difference
+from telescope.metrics.result import MetricResult, MultipleMetricResults
+from telescope.testset import MultipleTestset
+from telescope.utils import intern_strings
 
 
 
@@ -10,23 +12,37 @@ class DemographicParity(Metric):
 
     name = "Demographic-Parity"
     segment_level = False
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
-
         if cand and ref:
-            num_instances = len(ref)
-            get_group_right_true = []
-            get_group_right_pred = []
-
-            for i in range(num_instances):
-                get_group_right_true.append(1)
-                if ref[i] == cand[i]:
-                    get_group_right_pred.append(1)
-                else:
-                    get_group_right_pred.append(0)
-        
-            score = demographic_parity_difference(get_group_right_true,get_group_right_pred, sensitive_features=ref)
+            ids, _ = intern_strings([ref, cand])
+            score = self.parity_difference(ids[0], ids[1] == ids[0])
         else:
             score = 0.0
 
         return MetricResult(score, [], src, cand, ref, self.name)
+
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Compares the outputs of all systems with the reference at once. """
+        if not testset.ref:
+            return super().multiple_comparison(testset, cache)
+        ref_ids, systems_ids = testset.interned()
+        matches = systems_ids == ref_ids
+        systems_metric_results = {
+            sys_id: MetricResult(
+                self.parity_difference(ref_ids, matches[i]) if output else 0.0,
+                [], testset.src, output, testset.ref, self.name,
+            )
+            for i, (sys_id, output) in enumerate(testset.systems_output.items())
+        }
+        return MultipleMetricResults(systems_metric_results)
+
+    @staticmethod
+    def parity_difference(groups: np.ndarray, matches: np.ndarray) -> float:
+        """ Difference between the highest and lowest rate of correct predictions among
+        the groups given by the reference labels (fairlearn demographic_parity_difference
+        with every true label set to 1). """
+        counts = np.bincount(groups)
+        rates = np.bincount(groups, weights=matches)[counts > 0] / counts[counts > 0]
+        return float(rates.max() - rates.min())
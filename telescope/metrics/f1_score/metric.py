@@ -1,21 +1,16 @@
-from typing import List
+from typing import List, Optional, Tuple
 
-from telescope.metrics.metric import Metric
-from telescope.metrics.result import MetricResult
+from telescope.metrics.confusion import ConfusionMatrix, ConfusionMetric, ratio
 
-from sklearn.metrics import f1_score
 
-
-class F1Score(Metric):
+class F1Score(ConfusionMetric):
 
     name = "F1-score"
     segment_level = True
+    parallel = True
 
-    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
-        if ref == []:
-            score = 0
-            label_scores = [0 for _ in self.labels]
-        else:
-            score = f1_score(ref, cand, average='macro', zero_division=0)
-            label_scores = f1_score(ref, cand, labels=self.labels, average=None, zero_division=0)
-        return MetricResult(score, label_scores, src, cand, ref, self.name)
+    def confusion_scores(self, confusion: ConfusionMatrix) -> Tuple[Optional[float], List[float]]:
+        tn, fp, fn, tp = confusion.counts(self.labels)
+        score = confusion.macro(ratio(2 * confusion.tp, confusion.true_sum + confusion.pred_sum))
+        label_scores = ratio(2 * tp, 2 * tp + fp + fn)
+        return score, label_scores.tolist()
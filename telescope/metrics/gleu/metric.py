@@ -17,14 +17,17 @@ from itertools import chain
 from typing import List
 
 from sacrebleu.metrics.bleu import _get_tokenizer
+from telescope.metrics.gleu.ngrams import ReferenceNgrams
 from telescope.metrics.metric import Metric
-from telescope.metrics.result import MetricResult
+from telescope.metrics.result import MetricResult, MultipleMetricResults
+from telescope.testset import MultipleTestset
 
 
 class GLEU(Metric):
 
     name = "GLEU"
     segment_level = True
+    parallel = True
 
     def __init__(self, language: str, lowercase: bool = False, tokenize: bool = True):
         super().__init__(language)
@@ -38,28 +41,37 @@ class GLEU(Metric):
         self.lowercase = lowercase
         self.tokenize = tokenize
 
-    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
-        org_cand = cand
-        org_ref = ref
+    def tokenize_segments(self, segments: List[str]) -> list:
         if self.tokenize:
-            cand = [self.tokenizer(c.strip("\n")) for c in cand]
-            ref = [self.tokenizer(r.strip("\n")) for r in ref]
+            segments = [self.tokenizer(s.strip("\n")) for s in segments]
         else:
-            cand = [c.strip("\n").split(" ") for c in cand]
-            ref = [r.strip("\n").split(" ") for r in ref]
+            segments = [s.strip("\n").split(" ") for s in segments]
 
         if self.lowercase:
-            cand = [c.lower() for c in cand]
-            ref = [r.lower() for r in ref]
+            segments = [s.lower() for s in segments]
+        return segments
+
+    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
+        return self.score_with_references(src, cand, ref, ReferenceNgrams(self.tokenize_segments(ref)))
 
-        segment_gleu = [self.sentence_gleu(r, h) for r, h in zip(ref, cand)]
+    def score_with_references(
+        self, src: List[str], cand: List[str], ref: List[str], references: ReferenceNgrams
+    ) -> MetricResult:
+        segment_gleu = references.sentence_gleu(self.tokenize_segments(cand)).tolist()
         corpus_gleu = sum(segment_gleu) / len(segment_gleu)
-        cand = [" ".join(seg) for seg in cand]
-        ref = [" ".join(seg) for seg in ref]
         return MetricResult(
-            corpus_gleu, segment_gleu, src, org_cand, org_ref, self.name
+            corpus_gleu, segment_gleu, src, cand, ref, self.name
         )
 
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Extracts the reference n-grams once and scores every system against them. """
+        references = ReferenceNgrams(self.tokenize_segments(testset.ref))
+        systems_metric_results = {
+            sys_id: self.score_with_references(testset.src, output, testset.ref, references)
+            for sys_id, output in testset.systems_output.items()
+        }
+        return MultipleMetricResults(systems_metric_results)
+
     def sentence_gleu(self, reference, hypothesis, min_len=1, max_len=4):
         references = [
             reference,
@@ -0,0 +1,135 @@
+from itertools import chain, repeat
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def token_ids(
+    segments: Sequence[Sequence[str]], vocab: Dict[str, int], grow: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flattens tokenized segments into an array of integer token ids.
+
+    :param segments: Tokenized segments.
+    :param vocab: Mapping from token to id.
+    :param grow: If True unknown tokens are added to the vocab, otherwise they get id -1.
+    :return: Token ids and the segment index of each token.
+    """
+    tokens = list(chain.from_iterable(segments))
+    if grow:
+        for token in dict.fromkeys(tokens):
+            vocab.setdefault(token, len(vocab))
+    ids = np.fromiter(map(vocab.get, tokens, repeat(-1)), dtype=np.int64, count=len(tokens))
+    lengths = np.fromiter(map(len, segments), dtype=np.int64, count=len(segments))
+    seg_ids = np.repeat(np.arange(len(segments)), lengths)
+    return ids, seg_ids
+
+
+def ngram_count(lengths: np.ndarray, min_len: int, max_len: int) -> np.ndarray:
+    """ Number of n-grams of order min_len to max_len of segments with the given lengths. """
+    return sum(np.maximum(lengths - n + 1, 0) for n in range(min_len, max_len + 1))
+
+
+class ReferenceNgrams:
+    """
+    N-gram counts of a set of references, extracted once and reused for every
+    hypothesis scored against them.
+
+    Each n-gram is identified by an integer: an n-gram of order n is the pair
+    (id of its (n-1)-gram prefix, id of its last token), and the sorted array of
+    known pairs gives the id of every n-gram of that order.
+    """
+
+    def __init__(self, references: Sequence[Sequence[str]], min_len: int = 1, max_len: int = 4) -> None:
+        self.min_len = min_len
+        self.max_len = max_len
+        self.num_segments = len(references)
+        self.vocab = {}
+        tokens, seg_ids = token_ids(references, self.vocab, grow=True)
+
+        self.pairs = []  # sorted (prefix, token) keys of each order > 1
+        self.offsets = []  # first global id of each order
+        ngram_ids, total = [], 0
+        ids, starts = tokens, np.arange(len(tokens))
+        for n in range(1, max_len + 1):
+            if n == 1:
+                num_ids = len(self.vocab)
+            else:
+                keys, starts = self._pair_keys(ids, starts, tokens, seg_ids, n)
+                known, ids = np.unique(keys, return_inverse=True)
+                self.pairs.append(known)
+                num_ids = len(known)
+            self.offsets.append(total)
+            if n >= min_len:
+                ngram_ids.append((ids.reshape(-1) + total, seg_ids[starts]))
+            total += num_ids
+        self.num_ids = max(total, 1)
+
+        self.keys, self.counts = self._count(ngram_ids)
+        self.tpfn = ngram_count(np.bincount(seg_ids, minlength=self.num_segments), min_len, max_len)
+
+    @staticmethod
+    def _pair_keys(prefix, starts, tokens, seg_ids, n) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (prefix, last token) keys of the n-grams that do not cross a segment boundary.
+
+        :param prefix: Ids of the (n-1)-grams.
+        :param starts: Position of the first token of each (n-1)-gram.
+        :return: Keys of the n-grams and the position of their first token.
+        """
+        last = starts + n - 1
+        valid = last < len(tokens)
+        valid[valid] = seg_ids[last[valid]] == seg_ids[starts[valid]]
+        prefix, last_tokens = prefix[valid], tokens[last[valid]]
+        keys = (prefix << 32) | np.maximum(last_tokens, 0)
+        # n-grams with an unknown prefix or token can not be matched
+        keys[(prefix < 0) | (last_tokens < 0)] = -1
+        return keys, starts[valid]
+
+    def _count(self, ngram_ids: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """ Sorted (segment, n-gram) keys and their counts. """
+        if not ngram_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        ids = np.concatenate([ids for ids, _ in ngram_ids])
+        segs = np.concatenate([segs for _, segs in ngram_ids])
+        keys = segs[ids >= 0] * self.num_ids + ids[ids >= 0]
+        return np.unique(keys, return_counts=True)
+
+    def hypothesis_ngrams(self, hypotheses: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: Sorted (segment, n-gram) keys of the hypotheses n-grams seen in the
+            references, their counts and the number of n-grams of each hypothesis.
+        """
+        tokens, seg_ids = token_ids(hypotheses, self.vocab)
+        ngram_ids = []
+        ids, starts = tokens, np.arange(len(tokens))
+        for n in range(1, self.max_len + 1):
+            if n > 1:
+                keys, starts = self._pair_keys(ids, starts, tokens, seg_ids, n)
+                known = self.pairs[n - 2]
+                pos = np.searchsorted(known, keys).clip(max=max(len(known) - 1, 0))
+                ids = np.full(len(keys), -1, dtype=np.int64)
+                if len(known):
+                    found = (keys >= 0) & (known[pos] == keys)
+                    ids[found] = pos[found]
+            if n >= self.min_len:
+                ngram_ids.append((np.where(ids >= 0, ids + self.offsets[n - 1], -1), seg_ids[starts]))
+
+        keys, counts = self._count(ngram_ids)
+        lengths = np.bincount(seg_ids, minlength=len(hypotheses))
+        return keys, counts, ngram_count(lengths, self.min_len, self.max_len)
+
+    def sentence_gleu(self, hypotheses: Sequence[Sequence[str]]) -> np.ndarray:
+        """ GLEU of each hypothesis against the reference of the same segment. """
+        assert len(hypotheses) == self.num_segments, \
+            "The number of hypotheses and their reference(s) should be the same"
+        keys, counts, tpfp = self.hypothesis_ngrams(hypotheses)
+        pos = np.searchsorted(self.keys, keys).clip(max=max(len(self.keys) - 1, 0))
+        tp = np.zeros(self.num_segments, dtype=np.int64)
+        if len(self.keys):
+            matched = self.keys[pos] == keys
+            overlap = np.minimum(counts[matched], self.counts[pos[matched]])
+            tp = np.bincount(keys[matched] // self.num_ids, weights=overlap, minlength=self.num_segments)
+        # gleu = min(precision, recall) == tp / max(tpfp, tpfn)
+        n_all = np.maximum(tpfp, self.tpfn)
+        return np.where(n_all > 0, tp / np.maximum(n_all, 1), 0.0)
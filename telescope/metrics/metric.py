@@ -17,7 +17,21 @@ from typing import List, Tuple, Dict
 from itertools import combinations
 
 import numpy as np
-from telescope.metrics.result import BootstrapResult, MetricResult, PairwiseResult, MultipleMetricResults
+from telescope.metrics.result import (
+    BootstrapResult,
+    MetricResult,
+    PairwiseResult,
+    MultipleMetricResults,
+    MultipleBootstrapResult,
+)
+from telescope.metrics.bootstrap import (
+    bootstrap_ids,
+    sample_counts,
+    bootstrap_means,
+    bootstrap_sums,
+    win_counts,
+)
+from telescope.metrics.cache import SegmentScoreCache, segment_hash
 from telescope.testset import PairwiseTestset, MultipleTestset
 
 
@@ -27,6 +41,10 @@ class Metric(metaclass=abc.ABCMeta):
 
     name = None
     segment_level = True
+    sufficient_statistics = False
+    cacheable = False
+    dynamic_batching = False
+    parallel = False  # pure CPU metric that can be scored in worker processes
 
     def __init__(self, language: str = "X", labels: List[str] = [" "]):
         if not self.language_support(language):
@@ -44,19 +62,80 @@ class Metric(metaclass=abc.ABCMeta):
     def language_support(cls, language: str):
         return True
 
+    def segment_statistics(self, cand: List[str], ref: List[str]) -> np.ndarray:
+        """ Per-segment sufficient statistics of a corpus-level metric with shape (n, n_stats). 
+        Only available when sufficient_statistics is True. """
+        raise NotImplementedError(f"{self.name} does not provide sufficient statistics.")
+
+    def score_from_statistics(self, stats: np.ndarray) -> np.ndarray:
+        """ System-level scores computed from summed statistics with shape (num_samples, n_stats). """
+        raise NotImplementedError(f"{self.name} does not provide sufficient statistics.")
+
+    def resampled_sys_scores(self, cand: List[str], ref: List[str], counts: np.ndarray) -> np.ndarray:
+        """ System-level scores of each bootstrap partition given by the count matrix. """
+        stats = self.segment_statistics(cand, ref)
+        return self.score_from_statistics(bootstrap_sums(stats, counts))
+
     def pairwise_comparison(self, testset: PairwiseTestset):
         """ Function that scores the two candidate systems inside a paired testset. """
         x_result = self.score(testset.src, testset.system_x, testset.ref)
         y_result = self.score(testset.src, testset.system_y, testset.ref)
         return PairwiseResult(x_result, y_result)
 
-    def multiple_comparison(self, testset: MultipleTestset):
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
         """ Function that scores the multiple candidate systems inside a testset. """
         ref = testset.ref
         src = testset.src
+        if cache and self.cacheable and len(src) == len(ref):
+            return self.cached_multiple_comparison(testset)
         systems_metric_results = {sys_id: self.score(src,output,ref) for sys_id,output in testset.systems_output.items()}
         return MultipleMetricResults(systems_metric_results)
 
+    def model_name(self) -> str:
+        """ Name of the underlying model. Part of the segment-level scores cache key. """
+        return ""
+
+    def cache_values(self, result: MetricResult) -> List[List[float]]:
+        """ Values stored in the segment-level scores cache for each segment of a result. """
+        return [[float(score)] for score in result.seg_scores]
+
+    def result_from_cache(self, src: List[str], cand: List[str], ref: List[str], values: List[List[float]]) -> MetricResult:
+        """ Rebuilds a result from the cached values of each segment. Only needed when cacheable is True. """
+        raise NotImplementedError(f"{self.name} does not support the segment-level scores cache.")
+
+    def cached_multiple_comparison(self, testset: MultipleTestset):
+        """ Scores only the segments that are not yet in the persistent segment-level scores cache. 
+        Segments shared by several systems (or by previous runs) are scored once. """
+        ref = testset.ref
+        src = testset.src
+        model = self.model_name()
+        store = SegmentScoreCache()
+
+        systems_keys = {
+            sys_id: [segment_hash(s, c, r) for s, c, r in zip(src, output, ref)]
+            for sys_id, output in testset.systems_output.items()
+        }
+        cached = store.get(self.name, model, {key for keys in systems_keys.values() for key in keys})
+
+        missing = {}
+        for sys_id, output in testset.systems_output.items():
+            for i, key in enumerate(systems_keys[sys_id]):
+                if key not in cached and key not in missing:
+                    missing[key] = (src[i], output[i], ref[i])
+
+        if missing:
+            missing_src, missing_cand, missing_ref = (list(segs) for segs in zip(*missing.values()))
+            result = self.score(missing_src, missing_cand, missing_ref)
+            new_values = dict(zip(missing.keys(), self.cache_values(result)))
+            store.put(self.name, model, new_values)
+            cached.update(new_values)
+
+        systems_metric_results = {
+            sys_id: self.result_from_cache(src, output, ref, [cached[key] for key in systems_keys[sys_id]])
+            for sys_id, output in testset.systems_output.items()
+        }
+        return MultipleMetricResults(systems_metric_results)
+
     @classmethod
     def bootstrap_resampling(
         cls,
@@ -68,7 +147,8 @@ class Metric(metaclass=abc.ABCMeta):
 
         """
         Bootstrap resampling for system-level metrics such as BLEU that have to recompute
-        the system-level score for each partition
+        the system-level score for each partition. For segment-level metrics the
+        precomputed segment scores are averaged over all partitions at once.
 
         :param testset: Testset
         :param num_samples: Number of testset splits.
@@ -86,48 +166,49 @@ class Metric(metaclass=abc.ABCMeta):
                 wins[2] += 1
             return wins
 
-        def recompute_sys_scores(pairwise_result: PairwiseResult) -> (float, float):
-            if cls.segment_level and pairwise_result is not None:
-                reduces_x_scr = [
-                    pairwise_result.x_result.seg_scores[i] for i in reduced_ids
-                ]
-                reduces_y_scr = [
-                    pairwise_result.y_result.seg_scores[i] for i in reduced_ids
-                ]
-                return (
-                    sum(reduces_x_scr) / len(reduces_x_scr),
-                    sum(reduces_y_scr) / len(reduces_y_scr),
+        def recompute_sys_scores() -> (float, float):
+            result = cls(testset.target_language).pairwise_comparison(
+                PairwiseTestset(
+                    reduced_src,
+                    reduced_x,
+                    reduced_y,
+                    reduced_ref,
+                    language_pair=testset.language_pair,
+                    filenames=testset.filenames,
                 )
-            else:
-                result = cls(testset.target_language).pairwise_comparison(
-                    PairwiseTestset(
-                        reduced_src,
-                        reduced_x,
-                        reduced_y,
-                        reduced_ref,
-                        language_pair=testset.language_pair,
-                        filenames=testset.filenames,
-                    )
-                )
-                return (result.x_result.sys_score, result.y_result.sys_score)
+            )
+            return (result.x_result.sys_score, result.y_result.sys_score)
 
         n = len(testset)
-        ids = list(range(n))
-        sample_size = max(int(n * sample_ratio), 1)
+        samples_ids = bootstrap_ids(n, num_samples, sample_ratio)
+
+        if cls.segment_level and pairwise_result is not None:
+            seg_scores = np.array(
+                [pairwise_result.x_result.seg_scores, pairwise_result.y_result.seg_scores],
+                dtype=np.float64,
+            )
+            x_scores, y_scores = bootstrap_means(seg_scores, sample_counts(samples_ids, n))
+            wins = win_counts(x_scores, y_scores)
+            return BootstrapResult(x_scores.tolist(), y_scores.tolist(), wins, cls.name)
+
+        if cls.sufficient_statistics:
+            metric = cls(testset.target_language)
+            counts = sample_counts(samples_ids, n)
+            x_scores = metric.resampled_sys_scores(testset.system_x, testset.ref, counts)
+            y_scores = metric.resampled_sys_scores(testset.system_y, testset.ref, counts)
+            wins = win_counts(x_scores, y_scores)
+            return BootstrapResult(x_scores.tolist(), y_scores.tolist(), wins, cls.name)
 
         x_scores, y_scores = [], []
         wins = [0, 0, 0]
-        for _ in range(num_samples):
-            # Subsample the gold and system outputs (with replacement)
-            reduced_ids = np.random.choice(ids, size=sample_size, replace=True)
-
+        for reduced_ids in samples_ids:
             # Calculate accuracy on the reduced sample and save stats
             reduced_src = [testset[i][0] for i in reduced_ids]
             reduced_x = [testset[i][1] for i in reduced_ids]
             reduced_y = [testset[i][2] for i in reduced_ids]
             reduced_ref = [testset[i][3] for i in reduced_ids]
 
-            x_result, y_result = recompute_sys_scores(pairwise_result)
+            x_result, y_result = recompute_sys_scores()
             wins = update_wins(x_result, y_result, wins)
             x_scores.append(x_result)
             y_scores.append(y_result)
@@ -149,7 +230,8 @@ class Metric(metaclass=abc.ABCMeta):
 
         """
         Bootstrap resampling for system-level metrics such as BLEU that have to recompute
-        the system-level score for each partition
+        the system-level score for each partition. For segment-level metrics the
+        precomputed segment scores are averaged over all partitions at once.
 
         :param testset: Testset
         :param num_samples: Number of testset splits.
@@ -160,74 +242,57 @@ class Metric(metaclass=abc.ABCMeta):
         :param ref_filename: Filename of reference.
         :return: BootstrapResult object.
         """
+        samples_ids = bootstrap_ids(len(testset), num_samples, sample_ratio)
+        return cls.multiple_systems_bootstrap_resampling(
+            testset, samples_ids, language, multiple_result, [system_x, system_y]
+        ).bootstrap_result(system_x, system_y)
 
-        def update_wins(x_score: int, y_score: int, wins: Tuple[int]):
-            if multiple_result.metric != "TER":
-                if y_score > x_score:
-                    wins[1] += 1
-                elif y_score < x_score:
-                    wins[0] += 1
-                else:
-                    wins[2] += 1
-            else:
-                if y_score > x_score:
-                    wins[0] += 1
-                elif y_score < x_score:
-                    wins[1] += 1
-                else:
-                    wins[2] += 1
-
-            return wins
+    @classmethod
+    def multiple_systems_bootstrap_resampling(
+        cls,
+        testset: MultipleTestset,
+        samples_ids: np.ndarray,
+        language: str,
+        multiple_result: MultipleMetricResults = None,
+        systems: List[str] = None,
+    ) -> MultipleBootstrapResult:
 
-        def recompute_sys_scores(multiple_result: MultipleMetricResults) -> (float, float):
-            if cls.segment_level and multiple_result is not None:
-                reduces_x_scr = [
-                    multiple_result.systems_metric_results[system_x].seg_scores[i] 
-                    for i in reduced_ids
-                ]
-                reduces_y_scr = [
-                    multiple_result.systems_metric_results[system_y].seg_scores[i] 
-                    for i in reduced_ids
-                ]
-                return (
-                    sum(reduces_x_scr) / len(reduces_x_scr),
-                    sum(reduces_y_scr) / len(reduces_y_scr),
-                )
-            else:
-                result = cls(language, [" "]).multiple_comparison(
-                    MultipleTestset(
-                        reduced_src,
-                        reduced_ref,
-                        testset.ref_id,
-                        reducted_n_systems_output,
-                        task=testset.task,
-                        filenames=testset.filenames,
-                    )
-                )
-                return (result.systems_metric_results[system_x].sys_score, 
-                        result.systems_metric_results[system_y].sys_score)
+        """
+        Bootstrap resampling of every system at once. The same partitions (samples_ids)
+        can be shared across metrics so that all results are paired.
 
+        :param testset: Testset
+        :param samples_ids: Matrix of segment indices with shape (num_samples, sample_size).
+        :param language: Language of the evaluated text.
+        :param multiple_result: Precomputed scores of multiple systems.
+        :param systems: Ids of the systems to resample (all systems by default).
+        :return: MultipleBootstrapResult object.
+        """
+        if systems is None:
+            systems = list(testset.systems_output.keys())
         n = len(testset)
-        ids = list(range(n))
-        sample_size = max(int(n * sample_ratio), 1)
-
-        x_scores, y_scores = [], []
-        wins = [0, 0, 0]
-
-        for _ in range(num_samples):
-            # Subsample the gold and system outputs (with replacement)
-            reduced_ids = np.random.choice(ids, size=sample_size, replace=True)
-
-            # Calculate accuracy on the reduced sample and save stats
-            reduced_src = [testset.src[i] for i in reduced_ids]
-            reduced_ref = [testset.ref[i] for i in reduced_ids]
-            reducted_n_systems_output = { system: [output[i] for i in reduced_ids]
-                for system, output in testset.systems_output.items()}
 
+        if cls.segment_level and multiple_result is not None:
+            seg_scores = np.array(
+                [multiple_result.systems_metric_results[system].seg_scores for system in systems],
+                dtype=np.float64,
+            )
+            means = bootstrap_means(seg_scores, sample_counts(samples_ids, n))
+            systems_scores = dict(zip(systems, means))
+
+        elif cls.sufficient_statistics:
+            metric = cls(language, [" "])
+            counts = sample_counts(samples_ids, n)
+            systems_scores = {
+                system: metric.resampled_sys_scores(testset.systems_output[system], testset.ref, counts)
+                for system in systems
+            }
 
-            x_result, y_result = recompute_sys_scores(multiple_result)
-            wins = update_wins(x_result, y_result, wins)
-            x_scores.append(x_result)
-            y_scores.append(y_result)
+        else:
+            systems_scores = {system: [] for system in systems}
+            for reduced_ids in samples_ids:
+                result = cls(language, [" "]).multiple_comparison(testset.subset(reduced_ids, systems))
+                for system in systems:
+                    systems_scores[system].append(result.systems_metric_results[system].sys_score)
 
-        return BootstrapResult(x_scores, y_scores, wins, cls.name)
+        return MultipleBootstrapResult(systems_scores, cls.name, lower_is_better=cls.name == "TER")
@@ -0,0 +1,55 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+if "TELESCOPE_MAX_MODELS" in os.environ:
+    MAX_MODELS = int(os.environ["TELESCOPE_MAX_MODELS"])
+else:
+    MAX_MODELS = 3
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models (COMET checkpoints, BERTScore scorers, ...)
+    so that every Metric instance created for the same model reuses the weights
+    already in memory. When more than max_size models are loaded, the least
+    recently used one is evicted.
+    """
+
+    def __init__(self, max_size: int = MAX_MODELS) -> None:
+        self.max_size = max_size
+        self.models = OrderedDict()
+        self.lock = threading.RLock()
+
+    def load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the model stored under key, calling loader() only if it is not loaded yet.
+        """
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key]
+
+            model = loader()
+            self.models[key] = model
+            while len(self.models) > self.max_size:
+                self.models.popitem(last=False)
+            return model
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.models
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.models.clear()
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
+def load_model(key: Hashable, loader: Callable[[], Any]) -> Any:
+    return MODEL_REGISTRY.load(key, loader)
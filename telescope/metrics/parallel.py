@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Type
+
+from telescope.metrics.metric import Metric
+from telescope.metrics.result import MultipleMetricResults
+from telescope.metrics.rouge_scores import ROUGEMetric, shared_rouge_scores
+from telescope.testset import MultipleTestset
+
+# testsets of the worker process, sent once when the worker starts
+_testsets = {}
+
+
+def _init_worker(testsets: Dict[str, MultipleTestset]) -> None:
+    global _testsets
+    _testsets = testsets
+
+
+def _score_unit(unit: Tuple[str, List[Tuple[str, Type[Metric], dict]]]) -> Dict[str, MultipleMetricResults]:
+    ref_name, metrics = unit
+    testset = _testsets[ref_name]
+    with shared_rouge_scores():
+        return {
+            name: metric_cls(**metric_kwargs).multiple_comparison(testset)
+            for name, metric_cls, metric_kwargs in metrics
+        }
+
+
+def parallel_multiple_comparison(
+    testsets: Dict[str, MultipleTestset],
+    metrics: Dict[str, Tuple[Type[Metric], dict]],
+    workers: int,
+) -> Dict[str, Dict[str, MultipleMetricResults]]:
+    """
+    Scores every (reference, metric) unit in a pool of worker processes. Each unit goes through
+    multiple_comparison, so the metric shares its work between systems, and the ROUGE metrics
+    of a reference form a single unit that scores each segment once.
+
+    :param testsets: Testset of each reference.
+    :param metrics: Metric class and constructor arguments of each metric name.
+    :param workers: Number of worker processes.
+    :return: Results of each metric for each reference, in the order of testsets and metrics.
+    """
+    groups = {}
+    for name, (metric_cls, metric_kwargs) in metrics.items():
+        group = "ROUGE" if issubclass(metric_cls, ROUGEMetric) else name
+        groups.setdefault(group, []).append((name, metric_cls, metric_kwargs))
+    units = [(ref_name, group) for ref_name in testsets for group in groups.values()]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(testsets,)
+    ) as executor:
+        scores = list(executor.map(_score_unit, units))
+
+    results = {ref_name: {} for ref_name in testsets}
+    for (ref_name, _), unit_results in zip(units, scores):
+        results[ref_name].update(unit_results)
+    return {ref_name: {name: results[ref_name][name] for name in metrics} for ref_name in testsets}
@@ -28,6 +28,7 @@ import torch
 from fairseq import checkpoint_utils, utils
 from fairseq.data import LanguagePairDataset
 from telescope.metrics.metric import Metric
+from telescope.metrics.models import load_model
 from telescope.metrics.prism.result import PrismResult
 from telescope.utils import telescope_cache_folder
 from torchnlp.download import download_file_maybe_extract
@@ -272,34 +273,34 @@ class Prism(Metric):
         self.lang = language
         self.temperature = temperature
 
-        # this prints things and I can't figure out how to disable it
-        with open(os.devnull, "w") as sys.stdout:
-            (
-                self.models,
-                self.args,
-                self.task,
-            ) = checkpoint_utils.load_model_ensemble_and_task(
-                [
-                    model_dir + "/checkpoint.pt",
-                ],
-                arg_overrides=dict(data=model_dir + "/"),
-            )
-            sys.stdout = sys.__stdout__
-
         self.use_cuda = torch.cuda.is_available()
 
+        def load_ensemble():
+            # this prints things and I can't figure out how to disable it
+            with open(os.devnull, "w") as sys.stdout:
+                models, args, task = checkpoint_utils.load_model_ensemble_and_task(
+                    [
+                        model_dir + "/checkpoint.pt",
+                    ],
+                    arg_overrides=dict(data=model_dir + "/"),
+                )
+                sys.stdout = sys.__stdout__
+
+            for model in models:
+                if self.use_cuda:
+                    model.cuda()
+                model.make_generation_fast_(
+                    beamable_mm_beam_size=None,
+                    need_attn=False,
+                )
+            return models, args, task
+
+        self.models, self.args, self.task = load_model((self.name, model_dir), load_ensemble)
+
         self.generator = SequenceScorer(
             self.task.target_dictionary, temperature=temperature
         )
 
-        for model in self.models:
-            if self.use_cuda:
-                model.cuda()
-            model.make_generation_fast_(
-                beamable_mm_beam_size=None,
-                need_attn=False,
-            )
-
         # hash model
         self.model_hash = hash_model(model_dir)
         if not self.language_support(language):
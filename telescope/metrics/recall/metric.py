@@ -1,22 +1,16 @@
-from typing import List
+from typing import List, Optional, Tuple
 
-from telescope.metrics.metric import Metric
-from telescope.metrics.result import MetricResult
+from telescope.metrics.confusion import ConfusionMatrix, ConfusionMetric, ratio
 
-from sklearn.metrics import recall_score
 
-
-class Recall(Metric):
+class Recall(ConfusionMetric):
 
     name = "Recall"
     segment_level = True
+    parallel = True
 
-    def score(self, src: List[str], cand: List[str], ref: List[str]) -> MetricResult:
-        if ref == []:
-            score = 0
-            label_scores = [0 for _ in self.labels]
-        else:
-            score = recall_score(ref, cand, average='macro', zero_division=0)
-            label_scores = recall_score(ref, cand, labels=self.labels, average=None, zero_division=0)
-
-        return MetricResult(score, label_scores, src, cand, ref, self.name)
+    def confusion_scores(self, confusion: ConfusionMatrix) -> Tuple[Optional[float], List[float]]:
+        tn, fp, fn, tp = confusion.counts(self.labels)
+        score = confusion.macro(ratio(confusion.tp, confusion.true_sum))
+        label_scores = ratio(tp, tp + fn)
+        return score, label_scores.tolist()
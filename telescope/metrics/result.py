@@ -115,6 +115,91 @@ class BootstrapResult:
         }
 
 
+class MultipleBootstrapResult:
+    def __init__(
+        self,
+        systems_scores: Dict[str, List[float]],  # {sys_id: resampled system-level scores}
+        metric: str,
+        lower_is_better: bool = False,
+        confidence: float = 0.95,
+    ) -> None:
+
+        ids = sys_ids_sort(list(systems_scores.keys()))
+        self.systems_scores = {id: np.asarray(systems_scores[id], dtype=np.float64) for id in ids}
+        self.metric = metric
+        self.lower_is_better = lower_is_better
+        self.confidence = confidence
+
+        scores = np.stack(list(self.systems_scores.values()))
+        self.num_samples = scores.shape[1]
+        if lower_is_better:
+            scores = -scores
+        # wins[i][j]: number of partitions in which system i outperforms system j
+        self.wins = (scores[:, None, :] > scores[None, :, :]).sum(axis=2)
+        self.ties = (scores[:, None, :] == scores[None, :, :]).sum(axis=2)
+
+    def win_count(self, system_x: str, system_y: str) -> List[int]:
+        ids = list(self.systems_scores.keys())
+        i, j = ids.index(system_x), ids.index(system_y)
+        return [int(self.wins[i][j]), int(self.wins[j][i]), int(self.ties[i][j])]
+
+    def p_value(self, system_x: str, system_y: str) -> float:
+        """ Paired bootstrap p-value: fraction of partitions in which the system with 
+        more wins does not outperform the other one. """
+        x_wins, y_wins, _ = self.win_count(system_x, system_y)
+        return 1 - max(x_wins, y_wins) / self.num_samples
+
+    def confidence_interval(self, system_id: str) -> Tuple[float]:
+        alpha = (1 - self.confidence) / 2 * 100
+        lower, upper = np.percentile(self.systems_scores[system_id], [alpha, 100 - alpha])
+        return float(lower), float(upper)
+
+    def bootstrap_result(self, system_x: str, system_y: str) -> BootstrapResult:
+        return BootstrapResult(
+            self.systems_scores[system_x].tolist(),
+            self.systems_scores[system_y].tolist(),
+            self.win_count(system_x, system_y),
+            self.metric,
+        )
+
+    def intervals_to_dataframe(self, systems_names: Dict[str, str]) -> pd.DataFrame:
+        summary = {"mean": [], "lower bound": [], "upper bound": []}
+        for sys_id, scores in self.systems_scores.items():
+            lower, upper = self.confidence_interval(sys_id)
+            summary["mean"].append(np.mean(scores))
+            summary["lower bound"].append(lower)
+            summary["upper bound"].append(upper)
+        df = pd.DataFrame.from_dict(summary)
+        df.index = [systems_names[sys_id] for sys_id in self.systems_scores]
+        return df
+
+    def pairwise_to_dataframe(self, systems_names: Dict[str, str]) -> pd.DataFrame:
+        ids = list(self.systems_scores.keys())
+        rows = []
+        for i, x_id in enumerate(ids):
+            for y_id in ids[i + 1 :]:
+                x_wins, y_wins, ties = self.win_count(x_id, y_id)
+                rows.append(
+                    {
+                        "system x": systems_names[x_id],
+                        "system y": systems_names[y_id],
+                        "x_wins (%)": (x_wins / self.num_samples) * 100,
+                        "y_wins (%)": (y_wins / self.num_samples) * 100,
+                        "ties (%)": (ties / self.num_samples) * 100,
+                        "p-value": self.p_value(x_id, y_id),
+                    }
+                )
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def results_to_dataframe(multiple_bootstrap_results: list, systems_names: Dict[str, str], pairwise: bool = True) -> pd.DataFrame:
+        dfs = [
+            m_res.pairwise_to_dataframe(systems_names) if pairwise else m_res.intervals_to_dataframe(systems_names)
+            for m_res in multiple_bootstrap_results
+        ]
+        return pd.concat(dfs, keys=[m_res.metric for m_res in multiple_bootstrap_results])
+
+
 class MultipleMetricResults:
     def __init__(
         self,
@@ -1,22 +1,18 @@
 from typing import List
 
-from telescope.metrics.metric import Metric
 from telescope.metrics.rouge_l.result import ROUGELResult
+from telescope.metrics.rouge_scores import ROUGEMetric, rouge_scores
 
-from rouge import Rouge
 
-
-class ROUGEL(Metric):
+class ROUGEL(ROUGEMetric):
 
     name = "ROUGE-L"
     segment_level = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> ROUGELResult:
-        rouge = Rouge()
-        scores = rouge.get_scores(cand, ref, avg=True)
-        segs = rouge.get_scores(cand, ref)
-        scores_segs = [score["rouge-l"]["f"] for score in segs]
-        
+        scores = rouge_scores(cand, ref)["rouge-l"]
+        sys_f, seg_f = scores["f"]
         return ROUGELResult(
-            scores["rouge-l"]["f"], scores_segs, src, cand, ref, self.name, 
-            scores["rouge-l"]["p"], scores["rouge-l"]["r"])
+            sys_f, list(seg_f), src, cand, ref, self.name, 
+            scores["p"][0], scores["r"][0])
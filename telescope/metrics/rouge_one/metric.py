@@ -1,22 +1,18 @@
 from typing import List
 
-from telescope.metrics.metric import Metric
 from telescope.metrics.rouge_one.result import ROUGEOneResult
+from telescope.metrics.rouge_scores import ROUGEMetric, rouge_scores
 
-from rouge import Rouge
 
-
-class ROUGEOne(Metric):
+class ROUGEOne(ROUGEMetric):
 
     name = "ROUGE-1"
     segment_level = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> ROUGEOneResult:
-        rouge = Rouge()
-        scores = rouge.get_scores(cand, ref, avg=True)
-        segs = rouge.get_scores(cand, ref)
-        scores_segs = [score["rouge-1"]["f"] for score in segs]
-        
+        scores = rouge_scores(cand, ref)["rouge-1"]
+        sys_f, seg_f = scores["f"]
         return ROUGEOneResult(
-            scores["rouge-1"]["f"], scores_segs, src, cand, ref, self.name, 
-            scores["rouge-1"]["p"], scores["rouge-1"]["r"])
+            sys_f, list(seg_f), src, cand, ref, self.name, 
+            scores["p"][0], scores["r"][0])
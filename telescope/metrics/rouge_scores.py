@@ -0,0 +1,132 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from rouge.rouge_score import _get_ngrams, _split_into_words, f_r_p_rouge_n
+from telescope.metrics.metric import Metric
+from telescope.metrics.result import MultipleMetricResults
+from telescope.testset import MultipleTestset
+
+ROUGE_METRICS = ["rouge-1", "rouge-2", "rouge-l"]
+
+# scores of each (hypothesis, reference) segment, only kept inside shared_rouge_scores.
+# Thread-local, so that concurrent app sessions never share or reset each other's memo.
+_local = threading.local()
+
+
+def _sentences(text: str) -> List[str]:
+    """ Sentence splitting and whitespace normalisation of the rouge package. """
+    return [" ".join(_.split()) for _ in text.split(".") if len(_) > 0]
+
+
+def _lcs_words(x: List[str], y: List[str]) -> List[str]:
+    """
+    Words of the longest common subsequence of x and y, reconstructed with the same
+    tie-breaking as the rouge package but with a list-based table and no recursion.
+    """
+    n, m = len(x), len(y)
+    table = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        row, prev, xi = table[i], table[i - 1], x[i - 1]
+        for j in range(1, m + 1):
+            if xi == y[j - 1]:
+                row[j] = prev[j - 1] + 1
+            else:
+                row[j] = prev[j] if prev[j] > row[j - 1] else row[j - 1]
+
+    words, i, j = [], n, m
+    while i > 0 and j > 0:
+        if x[i - 1] == y[j - 1]:
+            words.append(x[i - 1])
+            i, j = i - 1, j - 1
+        elif table[i - 1][j] > table[i][j - 1]:
+            i -= 1
+        else:
+            j -= 1
+    return words
+
+
+def _rouge_l(hyp: List[str], ref: List[str]) -> Dict[str, float]:
+    """ Summary-level ROUGE-L: union of the LCS of each reference sentence with each candidate sentence. """
+    m = len(set(_split_into_words(ref)))
+    n = len(set(_split_into_words(hyp)))
+    hyp_words = [_split_into_words([s]) for s in hyp]
+    union = set()
+    for ref_s in ref:
+        ref_words = _split_into_words([ref_s])
+        ref_set = set(ref_words)
+        for eval_words in hyp_words:
+            if not ref_set.isdisjoint(eval_words):
+                union.update(_lcs_words(ref_words, eval_words))
+    llcs = len(union)
+    r_lcs = llcs / m
+    p_lcs = llcs / n
+    f_lcs = 2.0 * ((p_lcs * r_lcs) / (p_lcs + r_lcs + 1e-8))
+    return {"f": f_lcs, "p": p_lcs, "r": r_lcs}
+
+
+def segment_rouge(hyp: str, ref: str) -> Dict[str, Dict[str, float]]:
+    """ ROUGE-1, ROUGE-2 and ROUGE-L of a segment, tokenizing the pair once. """
+    hyp, ref = _sentences(hyp), _sentences(ref)
+    if len(hyp) <= 0:
+        raise ValueError("Hypothesis is empty.")
+    if len(ref) <= 0:
+        raise ValueError("Reference is empty.")
+
+    hyp_words, ref_words = _split_into_words(hyp), _split_into_words(ref)
+    scores = {}
+    for n in [1, 2]:
+        hyp_ngrams = _get_ngrams(n, hyp_words)
+        ref_ngrams = _get_ngrams(n, ref_words)
+        overlap = hyp_ngrams.intersection(ref_ngrams)
+        scores["rouge-%d" % n] = f_r_p_rouge_n(len(hyp_ngrams), len(ref_ngrams), len(overlap))
+    scores["rouge-l"] = _rouge_l(hyp, ref)
+    return scores
+
+
+@contextmanager
+def shared_rouge_scores() -> Iterator[None]:
+    """
+    Keeps the segment scores computed inside the block, so that ROUGE-1, ROUGE-2 and
+    ROUGE-L score each segment only once. The scores are dropped when the outermost block ends.
+    """
+    if getattr(_local, "memo", None) is not None:
+        yield
+        return
+    _local.memo = {}
+    try:
+        yield
+    finally:
+        _local.memo = None
+
+
+def rouge_scores(cand: Sequence[str], ref: Sequence[str]) -> Dict[str, Dict[str, Tuple[float, List[float]]]]:
+    """
+    Segment and corpus ROUGE-1, ROUGE-2 and ROUGE-L of a corpus in a single pass.
+    Inside shared_rouge_scores, segments scored before are not scored again.
+
+    :return: {metric: {stat: (corpus score, segment scores)}} for the stats f, p and r.
+    """
+    memo = getattr(_local, "memo", None)
+    if memo is None:
+        memo = {}
+    segments = []
+    for pair in zip(cand, ref):
+        if pair not in memo:
+            memo[pair] = segment_rouge(*pair)
+        segments.append(memo[pair])
+    scores = {}
+    for metric in ROUGE_METRICS:
+        scores[metric] = {}
+        for stat in ["f", "p", "r"]:
+            seg_scores = [segment[metric][stat] for segment in segments]
+            scores[metric][stat] = (sum(seg_scores) / len(seg_scores), seg_scores)
+    return scores
+
+
+class ROUGEMetric(Metric):
+    """ ROUGE metric whose systems share the segment scores of one multiple comparison. """
+
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True) -> MultipleMetricResults:
+        with shared_rouge_scores():
+            return super().multiple_comparison(testset, cache)
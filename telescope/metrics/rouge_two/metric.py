@@ -1,22 +1,18 @@
 from typing import List
 
-from telescope.metrics.metric import Metric
 from telescope.metrics.rouge_two.result import ROUGETwoResult
+from telescope.metrics.rouge_scores import ROUGEMetric, rouge_scores
 
-from rouge import Rouge
 
-
-class ROUGETwo(Metric):
+class ROUGETwo(ROUGEMetric):
 
     name = "ROUGE-2"
     segment_level = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> ROUGETwoResult:
-        rouge = Rouge()
-        scores = rouge.get_scores(cand, ref, avg=True)
-        segs = rouge.get_scores(cand, ref)
-        scores_segs = [score["rouge-2"]["f"] for score in segs]
-
+        scores = rouge_scores(cand, ref)["rouge-2"]
+        sys_f, seg_f = scores["f"]
         return ROUGETwoResult(
-            scores["rouge-2"]["f"], scores_segs, src, cand, ref, self.name, 
-            scores["rouge-2"]["p"], scores["rouge-2"]["r"])
+            sys_f, list(seg_f), src, cand, ref, self.name, 
+            scores["p"][0], scores["r"][0])
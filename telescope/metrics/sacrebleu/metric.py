@@ -14,19 +14,33 @@
 # limitations under the License.
 from typing import List
 
+import numpy as np
 from telescope.metrics.metric import Metric
 from telescope.metrics.sacrebleu.result import BLEUResult
 
 import sacrebleu
+from sacrebleu.metrics import BLEU
 
 
 class sacreBLEU(Metric):
 
     name = "BLEU"
     segment_level = False
+    sufficient_statistics = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> BLEUResult:
         bleu = sacrebleu.corpus_bleu(cand, [ref])
         return BLEUResult(
             bleu.score / 100, [], src, cand, ref, self.name, bleu.precisions, bleu.bp
         )
+
+    def segment_statistics(self, cand: List[str], ref: List[str]) -> np.ndarray:
+        # [hyp_len, ref_len, correct n-grams (1-4), total n-grams (1-4)] per segment
+        return np.array(BLEU()._extract_corpus_statistics(cand, [ref]), dtype=np.int64)
+
+    def score_from_statistics(self, stats: np.ndarray) -> np.ndarray:
+        bleu = BLEU()
+        return np.array(
+            [bleu._compute_score_from_stats(s.tolist()).score / 100 for s in stats]
+        )
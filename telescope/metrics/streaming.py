@@ -0,0 +1,47 @@
+from typing import Dict
+
+from telescope.metrics.metric import Metric
+from telescope.metrics.result import MetricResult, MultipleMetricResults
+from telescope.testset import StreamingTestset
+
+
+def streaming_multiple_comparison(
+    testset: StreamingTestset, metrics: Dict[str, Metric]
+) -> Dict[str, Dict[str, MultipleMetricResults]]:
+    """
+    Scores every system against every reference in a single pass over the files.
+    Only metrics with sufficient statistics can be scored this way: the statistics of each
+    chunk are summed and the system-level score is computed from the totals at the end.
+
+    :param testset: Streaming testset, consumed by this function.
+    :param metrics: Metric of each metric name, all with sufficient_statistics.
+    :return: System-level results of each metric for each reference. The results keep
+        no segments (src, cand and ref are empty).
+    """
+    for name, metric in metrics.items():
+        if not metric.sufficient_statistics:
+            raise Exception(f"{name} can not be scored chunk by chunk.")
+
+    totals, num_lines = {}, 0
+    for src, refs, outputs in testset.chunks():
+        num_lines += len(src)
+        for ref_name, ref in refs.items():
+            for name, metric in metrics.items():
+                for sys_id, output in outputs.items():
+                    key = (ref_name, name, sys_id)
+                    stats = metric.segment_statistics(output, ref).sum(axis=0)
+                    totals[key] = totals[key] + stats if key in totals else stats
+
+    assert num_lines > 0, "the files are empty"
+
+    results = {}
+    for ref_name in testset.references:
+        results[ref_name] = {}
+        for name, metric in metrics.items():
+            systems_metric_results = {}
+            for sys_id in testset.systems_output:
+                stats = totals[(ref_name, name, sys_id)][None, :]
+                sys_score = float(metric.score_from_statistics(stats)[0])
+                systems_metric_results[sys_id] = MetricResult(sys_score, [], [], [], [], metric.name)
+            results[ref_name][name] = MultipleMetricResults(systems_metric_results)
+    return results
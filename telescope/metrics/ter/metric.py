@@ -14,7 +14,9 @@
 # limitations under the License.
 from typing import List
 
+import numpy as np
 import sacrebleu
+from sacrebleu.metrics import TER as SacreTER
 from telescope.metrics.metric import Metric
 from telescope.metrics.ter.result import TERResult
 
@@ -23,7 +25,19 @@ class TER(Metric):
 
     name = "TER"
     segment_level = False
+    sufficient_statistics = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> TERResult:
         ter = sacrebleu.corpus_ter(cand, [ref])
         return TERResult(ter.score/100, [], src, cand, ref, self.name, ter.num_edits)
+
+    def segment_statistics(self, cand: List[str], ref: List[str]) -> np.ndarray:
+        # [num_edits, ref_length] per segment
+        return np.array(SacreTER()._extract_corpus_statistics(cand, [ref]), dtype=np.float64)
+
+    def score_from_statistics(self, stats: np.ndarray) -> np.ndarray:
+        ter = SacreTER()
+        return np.array(
+            [ter._compute_score_from_stats(s.tolist()).score / 100 for s in stats]
+        )
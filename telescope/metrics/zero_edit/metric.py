@@ -14,20 +14,39 @@
 # limitations under the License.
 from typing import List
 
+import numpy as np
 from telescope.metrics.metric import Metric
+from telescope.metrics.result import MultipleMetricResults
 from telescope.metrics.zero_edit.result import ZeroEditResult
+from telescope.testset import MultipleTestset
+from telescope.utils import intern_strings
 
 
 class ZeroEdit(Metric):
 
     name = "ZeroEdit"
     segment_level = True
+    parallel = True
 
     def score(self, src: List[str], cand: List[str], ref: List[str]) -> ZeroEditResult:
-        scores = []
-        for h, r in zip(cand, ref):
-            scores.append(1 if h == r else 0)
+        ids, _ = intern_strings([ref, cand])
+        return self.result_from_matches(src, cand, ref, ids[1] == ids[0])
 
+    def multiple_comparison(self, testset: MultipleTestset, cache: bool = True):
+        """ Compares the outputs of all systems with the reference at once. """
+        ref_ids, systems_ids = testset.interned()
+        matches = systems_ids == ref_ids
+        systems_metric_results = {
+            sys_id: self.result_from_matches(testset.src, output, testset.ref, matches[i])
+            for i, (sys_id, output) in enumerate(testset.systems_output.items())
+        }
+        return MultipleMetricResults(systems_metric_results)
+
+    def result_from_matches(
+        self, src: List[str], cand: List[str], ref: List[str], matches: np.ndarray
+    ) -> ZeroEditResult:
+        scores = matches.astype(int).tolist()
+        exact_matches = int(matches.sum())
         return ZeroEditResult(
-            sum(scores) / len(scores), scores, src, cand, ref, self.name, sum(scores)
+            exact_matches / len(scores), scores, src, cand, ref, self.name, exact_matches
         )
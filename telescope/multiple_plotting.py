@@ -23,7 +23,6 @@ import plotly.figure_factory as ff
 import plotly
 import streamlit as st
 import random
-import spacy
 import io
 import zipfile
 from PIL import Image
@@ -31,6 +30,7 @@ from PIL import Image
 from streamlit import runtime
 from sklearn.metrics import confusion_matrix, multilabel_confusion_matrix, ConfusionMatrixDisplay
 from telescope.testset import MultipleTestset
+from telescope.parse_cache import load_model, parse_texts
 from telescope.metrics import (
     Precision, 
     Recall, 
@@ -50,8 +50,11 @@ from telescope.utils import (
     FILENAME_DISTRIBUTION_SEGMENT,
     FILENAME_SEGMENT_COMPARISON,
     FILENAME_BOOTSTRAP,
+    FILENAME_BOOTSTRAP_SIGNIFICANCE,
+    FILENAME_BOOTSTRAP_INTERVALS,
     FILENAME_RATES,
-    FILENAME_ANALYSIS_LABELS
+    FILENAME_ANALYSIS_LABELS,
+    intern_strings,
 )
 
 T1_COLOR = "#9ACD32"
@@ -264,46 +267,81 @@ def save_bootstrap_table(result:pd.DataFrame,sys_x_name:str, sys_y_name:str, sav
     elif saving_dir is not None:
         save_table(saving_dir, filename,result)
 
+def save_multiple_bootstrap_tables(significance:pd.DataFrame, intervals:pd.DataFrame, saving_dir: str = None, saving_zip:zipfile.ZipFile = None):
+    if runtime.exists():
+        if saving_zip is not None and saving_dir is not None:
+            saving_zip.writestr(saving_dir + FILENAME_BOOTSTRAP_SIGNIFICANCE, significance.to_csv())
+            saving_zip.writestr(saving_dir + FILENAME_BOOTSTRAP_INTERVALS, intervals.to_csv())
+
+    elif saving_dir is not None:
+        save_table(saving_dir, FILENAME_BOOTSTRAP_SIGNIFICANCE, significance)
+        save_table(saving_dir, FILENAME_BOOTSTRAP_INTERVALS, intervals)
+
+# number of similarity scores computed at once by sentences_similarity (source segments x outputs)
+SIMILARITY_BLOCK_SIZE = 2 ** 22
+
+
+def content_vectors(nlp, docs: list) -> tuple:
+    """
+    Vector of the tokens that are not stop words or punctuation of each Doc, normalized to
+    unit length (zero vectors are kept as they are), and the text of those tokens.
+    """
+    contents = [[token for token in doc if not token.is_stop and not token.is_punct] for doc in docs]
+    vectors = np.zeros((len(docs), nlp.vocab.vectors_length), dtype=np.float32)
+    for i, tokens in enumerate(contents):
+        if tokens:
+            vectors[i] = np.mean([token.vector for token in tokens], axis=0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    return vectors, [tuple(token.text for token in tokens) for tokens in contents]
+
+
+def similar_rows(src_vectors: np.ndarray, src_texts: List[tuple], output_vectors: np.ndarray, output_texts: List[tuple],
+                 min_value: float, max_value: float, num: int) -> List[int]:
+    """
+    First num source segments (with content) that have an output with a similarity between min_value and max_value.
+    The similarities are the cosine of the content vectors, computed in blocks of source segments, and
+    segments with the same content tokens have similarity 1 (as in spaCy's Doc.similarity).
+    """
+    outputs_with_text = {}
+    for j, text in enumerate(output_texts):
+        outputs_with_text.setdefault(text, []).append(j)
+
+    rows = []
+    block = max(1, SIMILARITY_BLOCK_SIZE // max(1, len(output_texts)))
+    for start in range(0, len(src_texts), block):
+        scores = src_vectors[start:start + block] @ output_vectors.T
+        for i in range(scores.shape[0]):
+            if not src_texts[start + i]:
+                continue
+            scores[i, outputs_with_text.get(src_texts[start + i], [])] = 1.0
+            if np.any((scores[i] >= min_value) & (scores[i] <= max_value)):
+                rows.append(start + i)
+                if len(rows) == num:
+                    return rows
+    return rows
+
+
 def sentences_similarity(src:List[str], output:str, language:str, saving_dir:str=None, saving_zip:zipfile.ZipFile=None, 
                          min_value:float=0.0,max_value:float=1.0):
     
-    def remove_stop_words_and_punct(text:str,nlp):
-        final_text = ""
-        doc = nlp(text.lower())
-        for token in doc:
-            if not token.is_stop and not token.is_punct:
-                final_text += " " + token.text
-        return nlp(final_text)
-
     if language == "en":
-        nlp = spacy.load("en_core_web_lg")
+        nlp = load_model("en_core_web_lg")
     elif language == "pt":
-        nlp = spacy.load("pt_core_news_lg")
+        nlp = load_model("pt_core_news_lg")
     else:
         return None
 
-    docs_src = [remove_stop_words_and_punct(seg,nlp) for seg in src]
-    docs_output = [remove_stop_words_and_punct(seg,nlp) for seg in output]
-    num_seg_src = len(docs_src)
-
-    table = []
+    docs = parse_texts(nlp, [seg.lower() for seg in src + output])
+    src_vectors, src_texts = content_vectors(nlp, [docs[seg.lower()] for seg in src])
+    output_vectors, output_texts = content_vectors(nlp, [docs[seg.lower()] for seg in output])
 
     if runtime.exists():
         min_value,max_value = st.slider(
                     "Minimum and maximum similarity value", 0.0, 1.0, value=(0.0, 1.0), step=0.05, key="similarity")
 
-    for seg_i in range(num_seg_src):
-        if len(table) == 10:
-            break
-        doc_src = docs_src[seg_i]
-        if not doc_src:
-            continue 
-        score = 0
-        for doc_out in docs_output:
-            score = doc_src.similarity(doc_out)
-            if score >= min_value and score <= max_value:
-                table.append([seg_i+1,src[seg_i]])
-                break
+    rows = similar_rows(src_vectors, src_texts, output_vectors, output_texts, min_value, max_value, 10)
+    table = [[seg_i+1,src[seg_i]] for seg_i in rows]
     
     if len(table) != 0:
         filename = str(min_value) + "-" + str(max_value) + FILENAME_SIMILAR_SOURCE_SENTENCES
@@ -898,18 +936,27 @@ def analysis_labels(result: MultipleMetricResults, sys_names_dict: Dict[str,str]
 ######################################################################################################################
 
 
+def labels_counts_of_each_system(true: List[str], systems_pred: List[List[str]], labels: List[str], correct: bool = True) -> Dict[str, np.ndarray]:
+    """ Number of segments of each reference label that each system predicted correctly (or incorrectly). """
+    ids, uniques = intern_strings([true] + list(systems_pred))
+    true_ids, preds_ids = ids[0], ids[1:]
+    hits = (preds_ids == true_ids) if correct else (preds_ids != true_ids)
+    num_systems, num_labels = hits.shape[0], len(uniques)
+    # counts[sys_i, label_id]
+    keys = np.arange(num_systems)[:, None] * num_labels + true_ids
+    counts = np.bincount(keys[hits], minlength=num_systems * num_labels).reshape(num_systems, num_labels)
+    label_ids = {label: i for i, label in enumerate(uniques)}
+    return {
+        label: counts[:, label_ids[label]] if label in label_ids else np.zeros(len(systems_pred), dtype=int)
+        for label in labels
+    }
+
+
 def number_of_correct_labels_of_each_system(sys_names: List[str], true: List[str], systems_pred: List[List[str]], labels: List[str], 
                                             saving_dir: str = None, saving_zip: zipfile.ZipFile = None):
     
-    num_of_systems = len(sys_names)
-    number_of_correct_labels = { label: np.array([0 for _ in range(num_of_systems)]) for label in labels }
+    number_of_correct_labels = labels_counts_of_each_system(true, systems_pred, labels, correct=True)
     filename = "number-of-correct-labels-of-each-system.png"
-
-    for sys_i in range(num_of_systems):
-        pred = systems_pred[sys_i]
-        for t, p in zip(true,pred):
-            if t == p:
-                number_of_correct_labels[t][sys_i] += 1
     
     plt = analysis_bucket(number_of_correct_labels, sys_names, labels, "Number of times each label was identified correctly", "Number of times")
     if runtime.exists():
@@ -927,16 +974,9 @@ def number_of_correct_labels_of_each_system(sys_names: List[str], true: List[str
 def number_of_incorrect_labels_of_each_system(sys_names: List[str], true: List[str], systems_pred: List[List[str]], labels: List[str], 
                                               saving_dir: str = None, saving_zip: zipfile.ZipFile = None):
     
-    num_of_systems = len(sys_names)
-    number_of_incorrect_labels = { label: np.array([0 for _ in range(num_of_systems)]) for label in labels }
+    number_of_incorrect_labels = labels_counts_of_each_system(true, systems_pred, labels, correct=False)
     filename = "number-of-incorrect-labels-of-each-system.png"
 
-    for sys_i in range(num_of_systems):
-        pred = systems_pred[sys_i]
-        for t, p in zip(true,pred):
-            if t != p:
-                number_of_incorrect_labels[t][sys_i] += 1
-
     plt = analysis_bucket(number_of_incorrect_labels, sys_names, labels, "Number of times each label was identified incorrectly", "Number of times")
     if runtime.exists():
         st.pyplot(plt)
@@ -0,0 +1,68 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc, DocBin
+from telescope.cache import SQLiteStore
+
+# number of texts given to spaCy at once by nlp.pipe
+PIPE_BATCH_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def load_model(model: str) -> Language:
+    """ spaCy model, loaded once per process. """
+    return spacy.load(model)
+
+
+def model_id(nlp: Language) -> str:
+    """ Name and version of a spaCy model, e.g. en_core_web_lg-3.7.1. """
+    return "{}_{}-{}".format(nlp.meta.get("lang", ""), nlp.meta.get("name", ""), nlp.meta.get("version", ""))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """
+    Persistent store of spaCy Docs keyed by (model, text hash). Each entry is a DocBin
+    with the Doc of the text, read back with the vocabulary of the same model.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.store = SQLiteStore("docs", path)
+
+    def get(self, nlp: Language, keys: Iterable[str]) -> Dict[str, Doc]:
+        found = self.store.get(model_id(nlp), keys)
+        return {key: next(DocBin().from_bytes(value).get_docs(nlp.vocab)) for key, value in found.items()}
+
+    def put(self, nlp: Language, docs: Dict[str, Doc]) -> None:
+        values = {}
+        for key, doc in docs.items():
+            doc_bin = DocBin(store_user_data=False)
+            doc_bin.add(doc)
+            values[key] = doc_bin.to_bytes()
+        self.store.put(model_id(nlp), values)
+
+
+def parse_texts(nlp: Language, texts: List[str], cache: bool = True) -> Dict[str, Doc]:
+    """
+    Doc of each distinct text, parsed in batches with nlp.pipe. With cache, the Docs are
+    read from and written to the persistent ParseCache, so only new texts are parsed.
+    """
+    texts = list(dict.fromkeys(texts))
+    if not cache:
+        return dict(zip(texts, nlp.pipe(texts, batch_size=PIPE_BATCH_SIZE)))
+
+    parse_cache = ParseCache()
+    keys = {text: text_hash(text) for text in texts}
+    found = parse_cache.get(nlp, keys.values())
+    missing = [text for text in texts if keys[text] not in found]
+    if missing:
+        parsed = dict(zip(missing, nlp.pipe(missing, batch_size=PIPE_BATCH_SIZE)))
+        parse_cache.put(nlp, {keys[text]: doc for text, doc in parsed.items()})
+        found.update({keys[text]: doc for text, doc in parsed.items()})
+    return {text: found[keys[text]] for text in texts}
@@ -11,12 +11,15 @@ from telescope.universal_metrics import AVAILABLE_NLG_UNIVERSAL_METRICS
 from typing import List, Tuple
 
 from telescope.plotting import plot_bootstraping_result
+from telescope.metrics.bootstrap import bootstrap_ids
+from telescope.metrics.result import MultipleBootstrapResult
 from telescope.multiple_plotting import (
     plot_bucket_multiple_comparison,
     plot_multiple_distributions,
     plot_multiple_segment_comparison,
     sentences_similarity,
     save_bootstrap_table,
+    save_multiple_bootstrap_tables,
 )
 
 class NLG(Task):
@@ -108,17 +111,29 @@ class NLG(Task):
                         )
                         st.subheader("Bootstrap resampling results:")
                         list_df = list()
+                        multiple_bootstrap_results = list()
+                        testset = collection_testsets.testsets[ref_filename]
+                        samples_ids = bootstrap_ids(len(testset), int(num_samples), sample_ratio)
                         with st.spinner("Running bootstrap resampling..."):
                             for metric in metrics:
-                                bootstrap_result = available_metrics[metric].multiple_bootstrap_resampling(
-                                    collection_testsets.testsets[ref_filename], int(num_samples), 
-                                    sample_ratio, system_x_id, system_y_id, collection_testsets.target_language, results[metric])
-                                df = plot_bootstraping_result(bootstrap_result)
+                                multiple_bootstrap_result = available_metrics[metric].multiple_systems_bootstrap_resampling(
+                                    testset, samples_ids, collection_testsets.target_language, results[metric])
+                                df = plot_bootstraping_result(multiple_bootstrap_result.bootstrap_result(system_x_id, system_y_id))
                                 list_df.append(df)
+                                multiple_bootstrap_results.append(multiple_bootstrap_result)
                             _, middle, _ = st.columns(3)
                             data_boostrap = pd.concat(list_df)
                             save_bootstrap_table(data_boostrap,system_x_name,system_y_name,path,saving_zip)
 
+                            st.subheader("Bootstrap resampling results (all pairs):")
+                            significance = MultipleBootstrapResult.results_to_dataframe(
+                                multiple_bootstrap_results, collection_testsets.systems_names)
+                            intervals = MultipleBootstrapResult.results_to_dataframe(
+                                multiple_bootstrap_results, collection_testsets.systems_names, pairwise=False)
+                            st.dataframe(significance)
+                            st.dataframe(intervals)
+                            save_multiple_bootstrap_tables(significance,intervals,path,saving_zip)
+
                             
     
     
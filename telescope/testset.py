@@ -12,10 +12,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List, Tuple, Dict
+from itertools import islice, zip_longest
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
 import streamlit as st
 
-from telescope.utils import read_lines, sys_ids_sort
+from telescope.utils import intern_strings, read_lines, sys_ids_sort
 
 class Testset:
     def __init__(
@@ -166,6 +168,29 @@ class MultipleTestset(Testset):
         self.systems_output = {id: systems_output[id] for id in ids}
         self.task = task
         self.filenames = filenames
+        self._interned = None
+
+    def interned(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Integer representation of the testset where each distinct string has one id.
+        Returns the reference ids with shape (n,) and the systems ids with shape (n_systems, n). """
+        ids = self._interned_columns()[1]
+        return ids[0], ids[1:]
+
+    def distinct_strings(self) -> np.ndarray:
+        """ Distinct strings of the reference and systems outputs, indexed by their interned id. """
+        return self._interned_columns()[2]
+
+    def _interned_columns(self) -> Tuple[List[List[str]], np.ndarray, np.ndarray]:
+        columns = [self.ref] + list(self.systems_output.values())
+        cached = getattr(self, "_interned", None)
+        if (
+            cached is None
+            or len(cached[0]) != len(columns)
+            or any(a is not b for a, b in zip(cached[0], columns))
+        ):
+            ids, uniques = intern_strings(columns)
+            cached = self._interned = (columns, ids, uniques)
+        return cached
 
     def __getitem__(self, i) -> Tuple[str]:
         return tuple([self.src[i]] + [self.ref[i]]+ [output[i] 
@@ -180,4 +205,101 @@ class MultipleTestset(Testset):
         if len(self.src) == len(self.ref):
             self.src = [self.src[idx] for idx in to_keep]
         self.ref = [self.ref[idx] for idx in to_keep]
-        self.systems_output = {name: [output[idx] for idx in to_keep] for name,output in self.systems_output.items()}
\ No newline at end of file
+        self.systems_output = {name: [output[idx] for idx in to_keep] for name,output in self.systems_output.items()}
+
+    def subset(self, ids, systems: List[str] = None) -> "MultipleTestset":
+        """ Testset with the segments at the given positions, e.g. a bootstrap sample,
+        and only the given systems (all by default). """
+        if systems is None:
+            systems = list(self.systems_output.keys())
+        return MultipleTestset(
+            [self.src[i] for i in ids] if len(self.src) == len(self.ref) else self.src,
+            [self.ref[i] for i in ids],
+            self.ref_id,
+            {system: [self.systems_output[system][i] for i in ids] for system in systems},
+            task=self.task,
+            filenames=self.filenames,
+        )
+
+
+class MappedMultipleTestset(MultipleTestset):
+    """ MultipleTestset whose columns are memory-mapped from a folder written by `telescope pack`.
+    Each column holds an index array instead of a copy of the segments, so filtering and
+    resampling only compose integer indices. """
+
+    def apply_filter(self, filter):
+        to_keep = filter.apply_filter()
+        self.src = self.src.take(to_keep)
+        self.ref = self.ref.take(to_keep)
+        self.systems_output = {name: output.take(to_keep) for name, output in self.systems_output.items()}
+
+    def subset(self, ids, systems: List[str] = None) -> "MappedMultipleTestset":
+        if systems is None:
+            systems = list(self.systems_output.keys())
+        return MappedMultipleTestset(
+            self.src.take(ids),
+            self.ref.take(ids),
+            self.ref_id,
+            {system: self.systems_output[system].take(ids) for system in systems},
+            task=self.task,
+            filenames=self.filenames,
+        )
+
+
+class StreamingTestset:
+    """ Source, references and systems outputs read lazily from their files, chunk_size aligned
+    lines at a time, so that corpora too large to fit in memory can be scored incrementally. """
+
+    def __init__(
+        self,
+        source: Iterable[str],
+        references: Dict[str, Iterable[str]], # {ref filename: reference lines}
+        systems_output: Dict[str, Iterable[str]], # {sys_id: system output lines}
+        chunk_size: int = 100000,
+    ) -> None:
+        self.source = source
+        self.references = references
+        self.systems_output = {id: systems_output[id] for id in sys_ids_sort(list(systems_output.keys()))}
+        self.chunk_size = chunk_size
+
+    def check_lengths(self) -> None:
+        """ Counts the lines of every file that can be rewound and checks that they have as many lines
+        as the source, before any chunk is read. Other files are checked while the chunks are read. """
+        files = {"source": self.source, **self.references, **self.systems_output}
+        lengths = {}
+        for name, file in files.items():
+            seekable = getattr(file, "seekable", None)
+            if seekable is None or not seekable():
+                continue
+            position = file.tell()
+            lengths[getattr(file, "name", name)] = sum(1 for _ in file)
+            file.seek(position)
+        num_lines = lengths.get(getattr(self.source, "name", "source"))
+        if num_lines is None:
+            return
+        mismatched = [name for name, length in lengths.items() if length != num_lines]
+        if mismatched:
+            raise ValueError("mismatch between the number of lines of {} and the source ({})".format(
+                ", ".join(mismatched), num_lines))
+
+    def chunks(self) -> Iterator[Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]]:
+        """ Yields (src, {ref filename: ref}, {sys_id: output}) chunks of aligned lines.
+        The files can only be consumed once. """
+        names = ["source"] + list(self.references.keys()) + list(self.systems_output.keys())
+        files = [self.source] + list(self.references.values()) + list(self.systems_output.values())
+        rows = zip_longest(*files)
+        num_lines = 0
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            # once a file ends every following row is padded with None
+            ended = [name for name, line in zip(names, chunk[-1]) if line is None]
+            if ended:
+                raise ValueError("mismatch between the number of lines of the files ({} ended before line {})".format(
+                    ", ".join(ended), num_lines + len(chunk)))
+            num_lines += len(chunk)
+            columns = [[line.strip() for line in column] for column in zip(*chunk)]
+            refs = dict(zip(self.references.keys(), columns[1 : len(self.references) + 1]))
+            outputs = dict(zip(self.systems_output.keys(), columns[len(self.references) + 1 :]))
+            yield columns[0], refs, outputs
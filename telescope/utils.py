@@ -15,7 +15,10 @@
 
 import os
 import yaml
+import numpy as np
+import pandas as pd
 from io import StringIO
+from typing import List, Tuple
 
 PATH_USER = "user/" 
 
@@ -26,6 +29,8 @@ FILENAME_ERROR_TYPE_ANALYSIS = "-multiple-bucket-analysis.png"
 FILENAME_DISTRIBUTION_SEGMENT  = "multiple-scores-distribution.html"
 FILENAME_SEGMENT_COMPARISON = "_multiple-segment-comparison.html"
 FILENAME_BOOTSTRAP = "_bootstrap_results.csv"
+FILENAME_BOOTSTRAP_SIGNIFICANCE = "bootstrap-pairwise-significance.csv"
+FILENAME_BOOTSTRAP_INTERVALS = "bootstrap-confidence-intervals.csv"
 FILENAME_RATES = "rates.csv"
 FILENAME_ANALYSIS_LABELS = "_results-by-label-plot.png"
 
@@ -63,4 +68,15 @@ def ref_ids_sort(ids):
     ids_number = [ int(id.replace("Ref ", "")) for id in ids]
     ids_number.sort()
     ids_sort = [ "Ref " + str(num) for num in ids_number]
-    return ids_sort
\ No newline at end of file
+    return ids_sort
+
+
+def intern_strings(columns: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """ Maps each distinct string of equally long columns to one integer id.
+    Returns the id matrix with shape (len(columns), n) and the distinct strings. """
+    n = len(columns[0]) if columns else 0
+    strings = np.empty(n * len(columns), dtype=object)
+    for i, column in enumerate(columns):
+        strings[i * n : (i + 1) * n] = list(column)
+    ids, uniques = pd.factorize(strings)
+    return ids.reshape(len(columns), n), uniques
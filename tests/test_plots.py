@@ -16,6 +16,9 @@
 import os
 import unittest
 
+import numpy as np
+import spacy
+
 from telescope.testset import MultipleTestset
 from telescope.metrics.result import MetricResult, PairwiseResult, MultipleMetricResults
 from telescope.plotting import (
@@ -34,7 +37,9 @@ from telescope.multiple_plotting import (
                                 analysis_labels,
                                 incorrect_examples,
                                 number_of_correct_labels_of_each_system,
-                                number_of_incorrect_labels_of_each_system
+                                number_of_incorrect_labels_of_each_system,
+                                content_vectors,
+                                similar_rows
                                 )
 
 from telescope.utils import (
@@ -346,4 +351,26 @@ class TestPlots(unittest.TestCase):
                                                     list(self.testset_class.systems_output.values()),
                                                     self.labels,
                                                     DATA_PATH)
-            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, "number-of-incorrect-labels-of-each-system.png")))
\ No newline at end of file
+            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, "number-of-incorrect-labels-of-each-system.png")))
+
+
+class TestSentencesSimilarity(unittest.TestCase):
+
+    nlp = spacy.blank("en")
+    nlp.vocab.set_vector("cat", np.array([1.0, 0.0], dtype=np.float32))
+    nlp.vocab.set_vector("dog", np.array([0.0, 1.0], dtype=np.float32))
+
+    def test_content_vectors(self):
+        docs = [self.nlp(text) for text in ["the cat .", "cat dog", "the .", "unknown"]]
+        vectors, texts = content_vectors(self.nlp, docs)
+        self.assertEqual(texts, [("cat",), ("cat", "dog"), (), ("unknown",)])
+        np.testing.assert_allclose(vectors, [[1.0, 0.0], [0.5 ** 0.5, 0.5 ** 0.5], [0.0, 0.0], [0.0, 0.0]], rtol=1e-6)
+
+    def test_similar_rows(self):
+        src_vectors, src_texts = content_vectors(self.nlp, [self.nlp(text) for text in ["the", "cat", "dog", "unknown", "cat dog"]])
+        out_vectors, out_texts = content_vectors(self.nlp, [self.nlp(text) for text in ["dog", "unknown"]])
+        # segments without content are skipped and equal segments have similarity 1
+        self.assertEqual(similar_rows(src_vectors, src_texts, out_vectors, out_texts, 0.9, 1.0, 10), [2, 3])
+        self.assertEqual(similar_rows(src_vectors, src_texts, out_vectors, out_texts, 0.0, 0.1, 10), [1, 2, 3, 4])
+        self.assertEqual(similar_rows(src_vectors, src_texts, out_vectors, out_texts, 0.0, 1.0, 2), [1, 2])
+        self.assertEqual(similar_rows(src_vectors, src_texts, out_vectors[:0], [], 0.0, 1.0, 10), [])
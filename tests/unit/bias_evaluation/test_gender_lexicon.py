@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.bias_evaluation.gender_lexicon import GenderLexicon, SuffixTrie
+
+
+class TestGenderLexicon(unittest.TestCase):
+
+    terms = [
+        {"doctor": "neutral"},
+        {"police officer": "neutral", "policewoman": "female", "policeman": "male"},
+        {"médico": "male", "médica": "female"},
+        {"police": "neutral"},
+    ]
+    prons = [{"they": "neutral", "she": "female", "he": "male"}]
+    suffixes = [{"woman": "female", "man": "male"}, {"an": "neutral"}]
+    dets_prep = [{"o": "male", "a": "female"}]
+
+    lexicon = GenderLexicon(terms, prons, suffixes, dets_prep)
+
+    def test_suffix_trie(self):
+        trie = SuffixTrie(self.suffixes)
+        self.assertDictEqual(trie.longest_suffixes("chairwoman"), {0: 5, 1: 2})
+        self.assertDictEqual(trie.longest_suffixes("chairman"), {0: 3, 1: 2})
+        self.assertDictEqual(trie.longest_suffixes("chair"), {})
+
+    def test_terms(self):
+        self.assertEqual(self.lexicon.find_gender(["the", "doctor"], 1), ("doctor", "neutral", self.terms[0]))
+        # the bigram is in a set before the one of the word
+        self.assertEqual(self.lexicon.find_gender(["police", "officer"], 0), ("police officer", "neutral", self.terms[1]))
+        # terms of sets with less than three genders take the gender of the determiner
+        self.assertEqual(self.lexicon.find_gender(["a", "médico"], 1), ("médico", "female", self.terms[2]))
+
+    def test_pronouns_suffixes_and_determiners(self):
+        self.assertEqual(self.lexicon.find_gender(["she", "is"], 0), ("she", "female", self.prons[0]))
+        self.assertEqual(self.lexicon.find_gender(["chairwoman"], 0), ("chairwoman", "female", self.suffixes[0]))
+        self.assertEqual(self.lexicon.find_gender(["o", "gato"], 1), ("gato", "male", self.dets_prep[0]))
+        self.assertEqual(self.lexicon.find_gender(["the", "cat"], 1), ("cat", "", {}))
@@ -66,4 +66,9 @@ class TestWithLibrary(unittest.TestCase):
         self.assertEqual(len(result.systems_bias_results), 1)
         self.assertEqual(result.systems_bias_results["Sys 1"].groups_system, ["female"])
         self.assertEqual(result.systems_bias_results["Sys 1"].groups_sys_per_seg, {0:["female"]})
-        self.assertDictEqual(result.systems_bias_results["Sys 1"].text_groups_sys_per_seg,{0:[{'gender': 'female', 'term': 'ela'}]})
\ No newline at end of file
+        self.assertDictEqual(result.systems_bias_results["Sys 1"].text_groups_sys_per_seg,{0:[{'gender': 'female', 'term': 'ela'}]})
+
+    def test_parse(self):
+        docs = self.gender_bias_evaluation_en.parse(["He is a doctor.", "he is a doctor.", "She is a doctor."])
+        self.assertListEqual(list(docs.keys()), ["he is a doctor.", "she is a doctor."])
+        self.assertListEqual([token.text for token in docs["she is a doctor."]], ["she", "is", "a", "doctor", "."])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.bias_evaluation.parallel import merge_shards, parallel_bias_evaluation
+from telescope.bias_evaluation.gender_bias_evaluation import GenderBiasEvaluation
+from telescope.testset import MultipleTestset
+
+
+class TestParallelBiasEvaluation(unittest.TestCase):
+
+    def test_merge_shards(self):
+        first = ({0: ["a"], 1: []}, {"Sys 1": {0: ["b"], 1: []}}, {0: ["c"], 1: []}, {"Sys 1": {0: ["d"], 1: []}})
+        second = ({0: ["e"]}, {"Sys 1": {0: ["f"]}}, {0: ["g"]}, {"Sys 1": {0: ["h"]}})
+        merged = merge_shards([(0, first), (2, second)], ["Sys 1"])
+        self.assertEqual(merged[0], {0: ["a"], 1: [], 2: ["e"]})
+        self.assertEqual(merged[1], {"Sys 1": {0: ["b"], 1: [], 2: ["f"]}})
+        self.assertEqual(merged[2], {0: ["c"], 1: [], 2: ["g"]})
+        self.assertEqual(merged[3], {"Sys 1": {0: ["d"], 1: [], 2: ["h"]}})
+
+    def test_same_results_as_sequential(self):
+        testsets = {
+            "Ref 1": MultipleTestset(
+                ["", "", ""], ["He is a doctor.", "She is a nurse.", "The teacher is here."], "Ref 1",
+                {"Sys 1": ["She is a doctor.", "He is a nurse.", "The teacher is here."]},
+                "machine-translation", ["src.txt", "ref.txt", "sysA.txt"]
+            ),
+        }
+        evaluation = GenderBiasEvaluation("en")
+        for option in GenderBiasEvaluation.options_bias_evaluation:
+            sequential = parallel_bias_evaluation(evaluation, testsets, option, 1)["Ref 1"]
+            parallel = parallel_bias_evaluation(evaluation, testsets, option, 2)["Ref 1"]
+            self.assertDictEqual(parallel.text_groups_ref_per_seg, sequential.text_groups_ref_per_seg)
+            self.assertDictEqual(
+                parallel.systems_bias_results["Sys 1"].text_groups_sys_per_seg,
+                sequential.systems_bias_results["Sys 1"].text_groups_sys_per_seg,
+            )
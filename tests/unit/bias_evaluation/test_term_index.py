@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.bias_evaluation.term_index import TermIndex
+
+
+class TestTermIndex(unittest.TestCase):
+
+    terms = [
+        {"term": "she", "keys": ["she", "pron"]},
+        {"term": "doctor", "keys": ["doctor"]},
+        {"term": "he", "keys": ["he", "pron"]},
+        {"term": "doctor", "keys": ["doctor"]},
+    ]
+
+    def test_first_unmatched_term(self):
+        index = TermIndex(self.terms, lambda term: term["keys"])
+        self.assertEqual(index.first(["doctor"]), 1)
+        self.assertEqual(index.take(1)["term"], "doctor")
+        self.assertEqual(index.first(["doctor"]), 3)
+        # the first position among the keys
+        self.assertEqual(index.first(["he", "pron"]), 0)
+        index.take(0)
+        self.assertEqual(index.first(["he", "pron"]), 2)
+        self.assertIsNone(index.first(["nurse"]))
+        index.take(2)
+        self.assertIsNone(index.first(["pron"]))
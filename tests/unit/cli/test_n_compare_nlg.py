@@ -13,10 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+import tempfile
 import unittest
 
 from click.testing import CliRunner
-from telescope.cli import n_compare_nlg
+from telescope.cli import n_compare_nlg, pack
 from telescope.utils import (
     FILENAME_SYSTEM_LEVEL_SCORES,
     FILENAME_ANALYSIS_METRICS_STACKED,
@@ -24,6 +25,8 @@ from telescope.utils import (
     FILENAME_DISTRIBUTION_SEGMENT,
     FILENAME_SEGMENT_COMPARISON,
     FILENAME_BOOTSTRAP,
+    FILENAME_BOOTSTRAP_SIGNIFICANCE,
+    FILENAME_BOOTSTRAP_INTERVALS,
     FILENAME_RATES,
     FILENAME_ANALYSIS_LABELS,
 )
@@ -72,6 +75,119 @@ class TestCompareCli(unittest.TestCase):
         result = self.runner.invoke(n_compare_nlg, args, catch_exceptions=False)
         self.assertEqual(result.exit_code, 0)
 
+    def test_with_workers(self):
+        args = [
+            "-t",
+            self.task,
+            "-s",
+            self.src,
+            "-c",
+            self.system_a,
+            "-c",
+            self.system_b,
+            "-c",
+            self.system_g,
+            "-r",
+            self.ref_b,
+            "-r",
+            self.ref_c,
+            "-l",
+            "en",
+            "-m",
+            "chrF",
+            "-m",
+            "BLEU",
+            "--seg_metric",
+            "GLEU",
+            "--workers",
+            "2"
+        ]
+        result = self.runner.invoke(n_compare_nlg, args, catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+
+    def test_with_chunk_size(self):
+        args = [
+            "-t",
+            self.task,
+            "-s",
+            self.src,
+            "-c",
+            self.system_a,
+            "-c",
+            self.system_b,
+            "-r",
+            self.ref_b,
+            "-r",
+            self.ref_c,
+            "-l",
+            "en",
+            "-m",
+            "chrF",
+            "-m",
+            "BLEU",
+            "-m",
+            "TER",
+            "--seg_metric",
+            "GLEU"
+        ]
+        in_memory = self.runner.invoke(n_compare_nlg, args, catch_exceptions=False)
+        # GLEU is the segment-level metric of the in-memory run, --seg_metric is not available with --chunk_size
+        streaming = self.runner.invoke(n_compare_nlg, args[:-2] + ["--chunk_size", "7"], catch_exceptions=False)
+        self.assertEqual(streaming.exit_code, 0)
+        self.assertNotIn("metric: GLEU", streaming.stdout)
+        for metric in ["chrF", "BLEU", "TER"]:
+            self.assertIn("metric: " + metric, streaming.stdout)
+        self.assertListEqual(self.printed_scores(in_memory.stdout, skip="GLEU"), self.printed_scores(streaming.stdout))
+
+    def test_chunk_size_with_unsupported_options(self):
+        args = ["-t", self.task, "-s", self.src, "-c", self.system_a, "-c", self.system_b, "-r", self.ref_b,
+                "-l", "en", "-m", "chrF", "--chunk_size", "7"]
+        options = {
+            "--filter": ["-f", "remove-duplicates"],
+            "--bootstrap": ["--bootstrap"],
+            "--seg_metric": ["--seg_metric", "GLEU"],
+            "--universal_metric": ["--universal_metric", "average"],
+        }
+        for name, option in options.items():
+            result = self.runner.invoke(n_compare_nlg, args + option)
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn(name + " can not be used with --chunk_size", result.output)
+
+    def test_chunk_size_with_mismatched_files(self):
+        with tempfile.TemporaryDirectory() as folder:
+            short = os.path.join(folder, "short.txt")
+            with open(self.system_b) as f, open(short, "w") as out:
+                out.writelines(f.readlines()[:5])
+            args = ["-t", self.task, "-s", self.src, "-c", self.system_a, "-c", short, "-r", self.ref_b,
+                    "-l", "en", "-m", "chrF", "--chunk_size", "7"]
+            result = self.runner.invoke(n_compare_nlg, args)
+        self.assertEqual(result.exit_code, 1)
+        # a usage error, not a traceback
+        self.assertIsInstance(result.exception, SystemExit)
+        self.assertIn("mismatch between the number of lines of " + short, result.output)
+
+    def test_with_packed(self):
+        files = ["-s", self.src, "-c", self.system_a, "-c", self.system_b, "-r", self.ref_b, "-r", self.ref_c]
+        args = ["-t", self.task, "-l", "en", "-m", "chrF", "-m", "ZeroEdit", "--seg_metric", "GLEU",
+                "-f", "length", "--length_min_val", "0.2", "--length_max_val", "0.8"]
+        with tempfile.TemporaryDirectory() as folder:
+            result = self.runner.invoke(pack, files + ["-o", folder], catch_exceptions=False)
+            self.assertEqual(result.exit_code, 0)
+            packed = self.runner.invoke(n_compare_nlg, args + ["--packed", folder], catch_exceptions=False)
+        self.assertEqual(packed.exit_code, 0)
+        in_memory = self.runner.invoke(n_compare_nlg, args + files, catch_exceptions=False)
+        self.assertEqual(packed.stdout, in_memory.stdout)
+
+    @staticmethod
+    def printed_scores(output, skip=None):
+        scores, metric = [], None
+        for line in output.splitlines():
+            if line.startswith("metric: "):
+                metric = line[len("metric: "):]
+            elif line.startswith("\tSys") and metric != skip:
+                scores.append((metric, line))
+        return scores
+
     def test_with_systems_names_file(self):
         args = [
             "-t",
@@ -316,6 +432,8 @@ class TestCompareCli(unittest.TestCase):
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/metrics_results/" + FILENAME_SYSTEM_LEVEL_SCORES)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/metrics_results/" + FILENAME_ANALYSIS_METRICS_STACKED)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/Sys B-Sys C" + FILENAME_BOOTSTRAP)))
+            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/" + FILENAME_BOOTSTRAP_SIGNIFICANCE)))
+            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/" + FILENAME_BOOTSTRAP_INTERVALS)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/bias_evaluations_information.csv")))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/Accuracy" + FILENAME_ANALYSIS_LABELS)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/Accuracy_results-by-label-table.csv")))
@@ -366,6 +484,8 @@ class TestCompareCli(unittest.TestCase):
             os.remove(DATA_PATH + "/" + ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/number-of-incorrect-labels-of-each-system.png")
             os.remove(DATA_PATH + "/" + ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/bias_results.csv")
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/Sys B-Sys C" + FILENAME_BOOTSTRAP)
+            os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/" + FILENAME_BOOTSTRAP_SIGNIFICANCE)
+            os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/" + FILENAME_BOOTSTRAP_INTERVALS)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") + "/social-choice-theory_ranks_systems.csv")
             for sys_name in ["Sys A", "Sys B", "Sys C"]:
                 dir = ref.replace("/","_")  + "/bias_results/gender/dictionary-based approach/" + sys_name
@@ -433,12 +553,16 @@ class TestCompareCli(unittest.TestCase):
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/metrics_results/" + FILENAME_SYSTEM_LEVEL_SCORES)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/metrics_results/" + FILENAME_ANALYSIS_METRICS_STACKED)))
             self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/Sys 2-Sys 3" + FILENAME_BOOTSTRAP)))
+            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/" + FILENAME_BOOTSTRAP_SIGNIFICANCE)))
+            self.assertTrue(os.path.isfile(os.path.join(DATA_PATH, ref.replace("/","_")  + "/" + FILENAME_BOOTSTRAP_INTERVALS)))
             os.remove(DATA_PATH + "/" + ref.replace("/","_") + "/metrics_results/Sys 2-Sys 3" + FILENAME_SEGMENT_COMPARISON)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/metrics_results/" + FILENAME_DISTRIBUTION_SEGMENT)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/metrics_results/BERTScore" + FILENAME_ERROR_TYPE_ANALYSIS)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/metrics_results/" + FILENAME_SYSTEM_LEVEL_SCORES)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/metrics_results/" + FILENAME_ANALYSIS_METRICS_STACKED)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/Sys 2-Sys 3" + FILENAME_BOOTSTRAP)
+            os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/" + FILENAME_BOOTSTRAP_SIGNIFICANCE)
+            os.remove(DATA_PATH + "/" + ref.replace("/","_") +  "/" + FILENAME_BOOTSTRAP_INTERVALS)
             os.remove(DATA_PATH + "/" + ref.replace("/","_") + "/social-choice-theory_ranks_systems.csv")
             os.rmdir(DATA_PATH + "/" + ref.replace("/","_") + "/metrics_results/")
             os.rmdir(DATA_PATH + "/" + ref.replace("/","_"))
\ No newline at end of file
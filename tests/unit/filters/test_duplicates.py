@@ -15,6 +15,7 @@
 import unittest
 
 from telescope.filters import DuplicatesFilter
+from telescope.filters.duplicates import first_occurrences, minhash, segment_hashes
 from telescope.testset import PairwiseTestset, MultipleTestset
 
 
@@ -68,4 +69,23 @@ class TestDuplicatesFilter(unittest.TestCase):
         self.assertEqual(ref, "cd")
         self.assertEqual(x, "cd")
         self.assertEqual(y, "cD")
-       
+
+    def test_first_occurrences(self):
+        hashes = segment_hashes(iter(["b", "a", "b", "c", "a"]))
+        self.assertEqual(hashes.dtype.name, "uint64")
+        self.assertEqual(first_occurrences(hashes).tolist(), [0, 1, 3])
+
+    def test_near_duplicates(self):
+        src = [
+            "the quick brown fox jumps over the lazy dog",
+            "a completely different sentence about cats",
+            "The quick brown fox jumps over the lazy dog!",
+            "the quick brown fox jumps over the lazy dog",
+        ]
+        testset = MultipleTestset(
+            src, src, "Ref 1", {"Sys 1": src}, "machine-translation", ["src.de", "ref.en", "sys.en"]
+        )
+        self.assertGreater((minhash(src[0]) == minhash(src[2])).mean(), 0.8)
+        self.assertLess((minhash(src[0]) == minhash(src[1])).mean(), 0.2)
+        self.assertEqual(DuplicatesFilter(testset).apply_filter(), [0, 1, 2])
+        self.assertEqual(DuplicatesFilter(testset, 0.8).apply_filter(), [0, 1])
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.filters import LengthFilter
+from telescope.filters.length import length_buckets, segment_lengths
+from telescope.testset import MultipleTestset
+
+
+class TestLengthFilter(unittest.TestCase):
+
+    src = ["s"] * 5
+    ref = ["a b c d", "a", "abc", "a b", "abcdefgh"]
+
+    def testset(self):
+        return MultipleTestset(
+            self.src, self.ref, "ref.en", {"Sys 1": self.ref}, "machine-translation",
+            ["src.de", "ref.en", "sys.en"]
+        )
+
+    def test_segment_lengths(self):
+        self.assertEqual(segment_lengths(self.ref).tolist(), [7, 1, 3, 3, 8])
+        self.assertEqual(segment_lengths(self.ref, "tokens").tolist(), [4, 1, 1, 2, 1])
+
+    def test_length_buckets(self):
+        # ties are ranked in order of appearance
+        self.assertEqual(length_buckets(segment_lengths(self.ref)).tolist(), [70, 0, 20, 45, 95])
+        self.assertEqual(length_buckets(segment_lengths(["abc"])).tolist(), [95])
+        self.assertEqual(length_buckets(segment_lengths([])).tolist(), [])
+
+    def test_filter(self):
+        self.assertEqual(LengthFilter(self.testset(), 0, 50).apply_filter(), [1, 2, 3])
+        self.assertEqual(LengthFilter(self.testset(), 50, 100).apply_filter(), [0, 4])
+        self.assertEqual(LengthFilter(self.testset(), 50, 100, "tokens").apply_filter(), [0, 3])
+
+    def test_min_bigger_than_max(self):
+        with self.assertRaises(AssertionError):
+            LengthFilter(self.testset(), 50, 0)
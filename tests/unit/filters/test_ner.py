@@ -13,9 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+import tempfile
 import unittest
+from unittest import mock
 
-from telescope.filters.ner import NERFilter
+from telescope.filters.ner import EntityCache, NERFilter
+from telescope.metrics.cache import segment_hash
 from telescope.testset import PairwiseTestset
 from tests.data import DATA_PATH
 
@@ -46,3 +49,68 @@ class TestNERFilter(unittest.TestCase):
             NERFilter(self.testset, self.testset.source_language, self.testset.target_language)
         the_exception = cm.exception
         self.assertEqual(str(the_exception), "pt-ja is not supperted by Stanza NER.")
+
+
+class FakeEngine:
+    """ Finds an entity in every segment with a capitalized word after the first one. """
+
+    calls = []
+
+    def bulk_process(self, segments):
+        FakeEngine.calls.append(list(segments))
+        return [
+            mock.Mock(ents=[w for w in segment.split()[1:] if w[:1].isupper()])
+            for segment in segments
+        ]
+
+
+class TestNERFilterAnnotations(unittest.TestCase):
+
+    src = ["Ich wohne in Lissabon", "Hallo", "Ich wohne in Lissabon", "Das ist gut"]
+    ref = ["I live in Lisbon", "Hello", "I live in Lisbon", "This is good"]
+
+    def setUp(self):
+        self.home = os.environ.get("HOME")
+        self.tmp = tempfile.TemporaryDirectory()
+        os.environ["HOME"] = self.tmp.name
+        FakeEngine.calls = []
+
+    def tearDown(self):
+        os.environ["HOME"] = self.home
+        self.tmp.cleanup()
+
+    def testset(self):
+        return PairwiseTestset(
+            self.src, self.ref, self.ref, self.ref, "pt-en", ["src.pt", "x.en", "y.en", "ref.en"]
+        )
+
+    @mock.patch("telescope.filters.ner.load_engine", return_value=FakeEngine())
+    def test_annotations_are_persisted(self, load_engine):
+        testset = self.testset()
+        kept = NERFilter(testset, testset.source_language, testset.target_language).apply_filter()
+        self.assertEqual(kept, [0, 2])
+        # repeated segments are annotated once
+        self.assertEqual(FakeEngine.calls, [["I live in Lisbon", "Hello", "This is good"]])
+
+        kept = NERFilter(testset, testset.source_language, testset.target_language).apply_filter()
+        self.assertEqual(kept, [0, 2])
+        self.assertEqual(len(FakeEngine.calls), 1)
+        self.assertEqual(load_engine.call_count, 1)
+
+    @mock.patch("telescope.filters.ner.load_engine", return_value=FakeEngine())
+    def test_annotations_keyed_by_stanza_version(self, load_engine):
+        testset = self.testset()
+        NERFilter(testset, testset.source_language, testset.target_language).apply_filter()
+        with mock.patch("stanza.__version__", "0.0.0"):
+            kept = NERFilter(testset, testset.source_language, testset.target_language).apply_filter()
+        self.assertEqual(kept, [0, 2])
+        self.assertEqual(len(FakeEngine.calls), 2)
+
+    @mock.patch("telescope.filters.ner.load_engine", return_value=FakeEngine())
+    def test_without_cache(self, load_engine):
+        testset = self.testset()
+        for _ in range(2):
+            kept = NERFilter(testset, testset.source_language, testset.target_language, 1, False).apply_filter()
+            self.assertEqual(kept, [0, 2])
+        self.assertEqual(len(FakeEngine.calls), 2)
+        self.assertDictEqual(EntityCache().get("en", [segment_hash("Hello", "", "")]), {})
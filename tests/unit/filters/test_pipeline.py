@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.filters import DuplicatesFilter, LengthFilter
+from telescope.filters.filter import Filter
+from telescope.filters.pipeline import FilterPipeline
+from telescope.testset import MultipleTestset
+
+
+class CountingFilter(Filter):
+    name = "counting"
+    built = 0
+
+    def __init__(self, testset, keep, *args):
+        super().__init__(testset)
+        self.keep = keep
+        CountingFilter.built += 1
+
+    def apply_filter(self):
+        return [i for i in range(len(self.testset)) if i % self.keep == 0]
+
+
+class TestFilterPipeline(unittest.TestCase):
+
+    src = ["a", "bb", "a", "cccc", "ddddd", "e", "ffffff", "gg"]
+    ref = ["A", "BB", "A", "CCCC", "DDDDD", "E", "FFFFFF", "GG"]
+
+    def testset(self, filenames=["src.txt", "ref.txt", "sys.txt"]):
+        return MultipleTestset(
+            list(self.src), list(self.ref), "Ref 1", {"Sys 1": list(self.src)}, "machine-translation", filenames
+        )
+
+    def test_intersection_over_original_indices(self):
+        testset = self.testset()
+        length = LengthFilter(testset, 0, 50).apply_filter()
+        duplicates = DuplicatesFilter(testset).apply_filter()
+
+        testset.apply_filter(FilterPipeline(testset, [(LengthFilter, (0, 50)), (DuplicatesFilter, ())]))
+        kept = sorted(set(length) & set(duplicates))
+        self.assertListEqual(testset.ref, [self.ref[i] for i in kept])
+        self.assertListEqual(testset.systems_output["Sys 1"], [self.src[i] for i in kept])
+
+    def test_masks_cache(self):
+        filenames = ["cache-src.txt", "cache-ref.txt", "cache-sys.txt"]
+        CountingFilter.built = 0
+        FilterPipeline(self.testset(filenames), [(CountingFilter, (2,)), (CountingFilter, (3,))]).apply_filter()
+        self.assertEqual(CountingFilter.built, 2)
+
+        # only the new filter is evaluated
+        kept = FilterPipeline(self.testset(filenames), [(CountingFilter, (2,)), (CountingFilter, (5,))]).apply_filter()
+        self.assertEqual(CountingFilter.built, 3)
+        self.assertListEqual(kept, [0])
+
+        # a different testset has its own masks
+        FilterPipeline(self.testset(["other.txt"]), [(CountingFilter, (2,))]).apply_filter()
+        self.assertEqual(CountingFilter.built, 4)
+
+        # same filenames and number of lines but a different content
+        changed = self.testset(filenames)
+        changed.ref[0] = "Z"
+        FilterPipeline(changed, [(CountingFilter, (2,))]).apply_filter()
+        self.assertEqual(CountingFilter.built, 5)
+
+    def test_no_filters(self):
+        testset = self.testset()
+        testset.apply_filter(FilterPipeline(testset, []))
+        self.assertEqual(len(testset), len(self.ref))
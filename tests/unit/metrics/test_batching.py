@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.metrics.batching import restore_order, token_budget_batches
+
+
+class TestBatching(unittest.TestCase):
+
+    lengths = [5, 1, 30, 2, 5, 12, 1]
+
+    def test_token_budget(self):
+        batches = token_budget_batches(self.lengths, max_tokens=12, max_batch_size=8)
+        for batch in batches:
+            longest = max(self.lengths[i] for i in batch)
+            self.assertTrue(len(batch) == 1 or len(batch) * longest <= 12)
+        self.assertListEqual(
+            sorted(i for batch in batches for i in batch), list(range(len(self.lengths)))
+        )
+        # segments are sorted by length
+        self.assertListEqual([list(batch) for batch in batches], [[1, 6, 3], [0, 4], [5], [2]])
+
+    def test_max_batch_size(self):
+        batches = token_budget_batches([1] * 10, max_tokens=100, max_batch_size=4)
+        self.assertListEqual([len(batch) for batch in batches], [4, 4, 2])
+
+    def test_restore_order(self):
+        batches = token_budget_batches(self.lengths, max_tokens=12)
+        values = [self.lengths[i] for batch in batches for i in batch]
+        self.assertListEqual(restore_order(batches, values), self.lengths)
+        self.assertListEqual(restore_order([], []), [])
@@ -14,7 +14,9 @@
 # limitations under the License.
 import unittest
 
+import bert_score
 from telescope.metrics.bertscore.metric import BERTScore
+from telescope.testset import MultipleTestset
 
 cands = [
     "28-year-old chef found dead in San Francisco mall",
@@ -56,5 +58,25 @@ class TestBertScore(unittest.TestCase):
         self.assertListEqual(result.cand, cands)
         self.assertTrue(self.bertscore.segment_level)
 
+    def test_multiple_comparison(self):
+        systems_output = {"Sys 1": cands, "Sys 2": [cands[1], cands[0], refs[2]]}
+        testset = MultipleTestset(refs, refs, "ref", systems_output, "nlg", ["1", "2"])
+        results = self.bertscore.multiple_comparison(testset, cache=False)
+
+        for sys_id, output in systems_output.items():
+            # reference implementation, independent of the shared reference embeddings
+            precision, recall, f1 = bert_score.score(
+                cands=output, refs=refs, idf=False, batch_size=3, lang="en", rescale_with_baseline=False,
+            )
+            result = results.systems_metric_results[sys_id]
+            self.assertListEqual(result.cand, output)
+            for i in range(3):
+                self.assertAlmostEqual(result.f1[i], f1[i].item(), places=4)
+                self.assertAlmostEqual(result.precision[i], precision[i].item(), places=4)
+                self.assertAlmostEqual(result.recall[i], recall[i].item(), places=4)
+        # same values as test_score for the first system
+        self.assertAlmostEqual(results.systems_metric_results["Sys 1"].sys_score, 0.9592669010162354, places=4)
+        self.assertAlmostEqual(results.systems_metric_results["Sys 2"].f1[2], 1.0, places=4)
+
     def test_name_property(self):
         self.assertEqual(self.bertscore.name, "BERTScore")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+import numpy as np
+
+from telescope.metrics.bootstrap import (
+    bootstrap_ids,
+    sample_counts,
+    bootstrap_means,
+    win_counts,
+)
+from telescope.metrics.result import MultipleBootstrapResult
+from telescope.metrics.chrf.metric import chrF
+from telescope.metrics.zero_edit.metric import ZeroEdit
+from telescope.testset import MultipleTestset
+
+
+class TestBootstrap(unittest.TestCase):
+
+    seg_scores = np.array([[0.1, 0.5, 0.9, 0.3], [0.2, 0.4, 0.9, 0.6]])
+
+    def test_bootstrap_ids(self):
+        ids = bootstrap_ids(4, 10, 0.5)
+        self.assertEqual(ids.shape, (10, 2))
+        self.assertTrue(((ids >= 0) & (ids < 4)).all())
+        self.assertEqual(bootstrap_ids(4, 3, 0.1).shape, (3, 1))
+
+    def test_sample_counts(self):
+        ids = np.array([[0, 0, 3], [1, 2, 2]])
+        counts = sample_counts(ids, 4)
+        self.assertListEqual(counts.tolist(), [[2, 0, 0, 1], [0, 1, 2, 0]])
+
+    def test_bootstrap_means(self):
+        ids = bootstrap_ids(4, 20, 0.75)
+        means = bootstrap_means(self.seg_scores, sample_counts(ids, 4))
+        self.assertEqual(means.shape, (2, 20))
+        for i, reduced_ids in enumerate(ids):
+            for s in range(2):
+                expected = sum(self.seg_scores[s][j] for j in reduced_ids) / len(reduced_ids)
+                self.assertAlmostEqual(means[s][i], expected)
+
+    def test_win_counts(self):
+        x = [0.1, 0.5, 0.3, 0.3]
+        y = [0.2, 0.4, 0.3, 0.6]
+        self.assertListEqual(win_counts(x, y), [1, 2, 1])
+        self.assertListEqual(win_counts(x, y, lower_is_better=True), [2, 1, 1])
+
+
+class TestMultipleBootstrapResult(unittest.TestCase):
+
+    systems_names = {"Sys 1": "Sys A", "Sys 2": "Sys B", "Sys 3": "Sys C"}
+    testset = MultipleTestset(
+        src=["a", "b", "c", "d"],
+        ref=["a b", "c d", "e f", "g h"],
+        ref_id="Ref 1",
+        systems_output={
+            "Sys 1": ["a b", "c d", "e x", "y z"],
+            "Sys 2": ["a b", "c x", "e f", "g h"],
+            "Sys 3": ["x y", "c d", "e f", "g h"],
+        },
+        task="machine-translation",
+        filenames=["src.txt", "ref.txt", "sys1.txt", "sys2.txt", "sys3.txt"],
+    )
+
+    def test_win_matrix(self):
+        result = MultipleBootstrapResult(
+            {"Sys 2": [0.2, 0.4, 0.3], "Sys 1": [0.1, 0.5, 0.3], "Sys 3": [0.9, 0.9, 0.9]},
+            "TER",
+            lower_is_better=True,
+        )
+        self.assertListEqual(list(result.systems_scores.keys()), ["Sys 1", "Sys 2", "Sys 3"])
+        self.assertListEqual(result.win_count("Sys 1", "Sys 2"), [1, 1, 1])
+        self.assertListEqual(result.win_count("Sys 1", "Sys 3"), [3, 0, 0])
+        self.assertAlmostEqual(result.p_value("Sys 1", "Sys 3"), 0.0)
+        self.assertAlmostEqual(result.p_value("Sys 1", "Sys 2"), 2 / 3)
+
+        bootstrap = result.bootstrap_result("Sys 3", "Sys 1")
+        self.assertListEqual(bootstrap.win_count, [0, 3, 0])
+        self.assertEqual(bootstrap.stats["y_wins (%)"], 100)
+
+        pairwise = result.pairwise_to_dataframe(self.systems_names)
+        self.assertEqual(len(pairwise), 3)
+        self.assertListEqual(list(pairwise["system x"]), ["Sys A", "Sys A", "Sys B"])
+        intervals = result.intervals_to_dataframe(self.systems_names)
+        self.assertAlmostEqual(intervals.loc["Sys C", "lower bound"], 0.9)
+
+    def test_shared_partitions(self):
+        samples_ids = bootstrap_ids(len(self.testset), 50, 0.5)
+        zero_edit = ZeroEdit(language="en")
+        multiple_result = zero_edit.multiple_comparison(self.testset)
+        seg_result = ZeroEdit.multiple_systems_bootstrap_resampling(
+            self.testset, samples_ids, "en", multiple_result
+        )
+        chrf_result = chrF.multiple_systems_bootstrap_resampling(
+            self.testset, samples_ids, "en"
+        )
+        for i, reduced_ids in enumerate(samples_ids):
+            reduced = [self.testset.systems_output["Sys 2"][j] for j in reduced_ids]
+            reduced_ref = [self.testset.ref[j] for j in reduced_ids]
+            self.assertAlmostEqual(
+                seg_result.systems_scores["Sys 2"][i],
+                zero_edit.score([], reduced, reduced_ref).sys_score,
+            )
+            self.assertAlmostEqual(
+                chrf_result.systems_scores["Sys 2"][i],
+                chrF(language="en").score([], reduced, reduced_ref).sys_score,
+            )
+        self.assertEqual(seg_result.num_samples, 50)
+        self.assertEqual(len(chrf_result.systems_scores), 3)
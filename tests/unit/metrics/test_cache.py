@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import tempfile
+import unittest
+
+from telescope.metrics.cache import SegmentScoreCache, segment_hash
+from telescope.metrics.metric import Metric
+from telescope.metrics.result import MetricResult
+from telescope.metrics.zero_edit.metric import ZeroEdit
+from telescope.testset import MultipleTestset
+
+
+class CachedZeroEdit(ZeroEdit):
+
+    cacheable = True
+    # the cached path of Metric, instead of the interned comparison of ZeroEdit
+    multiple_comparison = Metric.multiple_comparison
+
+    def __init__(self, language):
+        super().__init__(language)
+        self.scored_segments = 0
+
+    def score(self, src, cand, ref):
+        self.scored_segments += len(cand)
+        return super().score(src, cand, ref)
+
+    def result_from_cache(self, src, cand, ref, values):
+        scores = [value[0] for value in values]
+        return MetricResult(sum(scores) / len(scores), scores, src, cand, ref, self.name)
+
+
+class TestSegmentScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.home = os.environ.get("HOME")
+        self.tmp = tempfile.TemporaryDirectory()
+        os.environ["HOME"] = self.tmp.name
+
+    def tearDown(self):
+        os.environ["HOME"] = self.home
+        self.tmp.cleanup()
+
+    def test_segment_hash(self):
+        self.assertEqual(segment_hash("a", "b", "c"), segment_hash("a", "b", "c"))
+        self.assertNotEqual(segment_hash("a", "b", "c"), segment_hash("a", "c", "b"))
+        self.assertNotEqual(segment_hash("a b", "c", ""), segment_hash("a", "b c", ""))
+        self.assertNotEqual(segment_hash("a\nb", "c", "d"), segment_hash("a", "b\nc", "d"))
+
+    def test_get_put(self):
+        cache = SegmentScoreCache()
+        cache.put("COMET", "wmt20-comet-da", {"k1": [0.5], "k2": [0.1]})
+        cache.put("BERTScore", "roberta-large", {"k1": [0.9, 0.8, 0.85]})
+        found = SegmentScoreCache().get("COMET", "wmt20-comet-da", ["k1", "k3"])
+        self.assertDictEqual(found, {"k1": [0.5]})
+        found = cache.get("BERTScore", "roberta-large", ["k1", "k2"])
+        self.assertDictEqual(found, {"k1": [0.9, 0.8, 0.85]})
+        self.assertDictEqual(cache.get("COMET", "other-model", ["k1"]), {})
+
+    def test_multiple_comparison(self):
+        testset = MultipleTestset(
+            src=["a", "b", "c"],
+            ref=["a", "b", "c"],
+            ref_id="Ref 1",
+            systems_output={"Sys 1": ["a", "b", "x"], "Sys 2": ["a", "y", "c"]},
+            task="machine-translation",
+            filenames=["src.txt", "ref.txt", "sys1.txt", "sys2.txt"],
+        )
+        metric = CachedZeroEdit(language="en")
+        result = metric.multiple_comparison(testset)
+        # (a, a, a) is shared by both systems and only scored once
+        self.assertEqual(metric.scored_segments, 5)
+        self.assertListEqual(result.systems_metric_results["Sys 1"].seg_scores, [1, 1, 0])
+        self.assertListEqual(result.systems_metric_results["Sys 2"].seg_scores, [1, 0, 1])
+
+        testset.systems_output["Sys 3"] = ["a", "b", "z"]
+        metric = CachedZeroEdit(language="en")
+        result = metric.multiple_comparison(testset)
+        self.assertEqual(metric.scored_segments, 1)
+        self.assertAlmostEqual(result.systems_metric_results["Sys 3"].sys_score, 2 / 3)
+        self.assertAlmostEqual(result.systems_metric_results["Sys 1"].sys_score, 2 / 3)
+
+        metric.multiple_comparison(testset, cache=False)
+        self.assertEqual(metric.scored_segments, 1 + 9)
@@ -13,9 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import unittest
+from unittest import mock
 
 import torch
 from telescope.metrics import COMET
+from telescope.testset import MultipleTestset
 
 torch.cuda.is_available = lambda: False
 
@@ -46,5 +48,75 @@ class TestCOMET(unittest.TestCase):
         self.assertListEqual(result.src, src)
         self.assertListEqual(result.cand, cand)
 
+    def test_multiple_comparison(self):
+        src = [
+            "Dem Feuer konnte Einhalt geboten werden",
+            "Schulen und Kindergärten wurden eröffnet.",
+        ]
+        ref = [
+            "They were able to control the fire.",
+            "Schools and kindergartens opened",
+        ]
+        systems_output = {
+            "Sys 1": ["The fire could be stopped", "Schools and kindergartens were open"],
+            "Sys 2": ["They were able to control the fire.", "Schools opened"],
+        }
+        testset = MultipleTestset(src, ref, "ref", systems_output, "nlg", ["1", "2"])
+        results = self.comet.multiple_comparison(testset, cache=False)
+
+        for sys_id, output in systems_output.items():
+            expected = self.comet.predict(src, output, ref)
+            result = results.systems_metric_results[sys_id]
+            self.assertListEqual(result.cand, output)
+            for i in range(2):
+                self.assertAlmostEqual(result.seg_scores[i], expected[i], places=4)
+
     def test_name_property(self):
         self.assertEqual(self.comet.name, "COMET")
+
+
+class FakeCOMETModel:
+    """ Model whose score is a tenth of the number of characters of the translation. """
+
+    def __init__(self, mc_dropout=False):
+        self.mc_dropout = mc_dropout
+        self.batches = []
+
+    def to(self, device):
+        return self
+
+    def on_predict_start(self):
+        pass
+
+    def prepare_sample(self, sample, inference=False):
+        return {"mt_length": torch.tensor([float(len(s["mt"])) for s in sample])}
+
+    def predict_step(self, batch, batch_idx=None, dataloader_idx=None):
+        self.batches.append(len(batch["mt_length"]))
+        scores = batch["mt_length"] / 10
+        return (scores, torch.zeros_like(scores)) if self.mc_dropout else scores
+
+
+class TestCOMETPredict(unittest.TestCase):
+
+    src = ["a", "b", "c", "d", "e"]
+    cand = ["xxxxxxxx", "x", "xxxx", "xx", "xxxxxxxxxx"]
+    ref = ["r", "r", "r", "r", "r"]
+
+    def predict(self, model):
+        comet = COMET(modelname="fake", max_batch_size=2)
+        with mock.patch.object(COMET, "model", new_callable=mock.PropertyMock, return_value=model), \
+                mock.patch.object(COMET, "token_lengths", side_effect=lambda model, segs: [len(seg) for seg in segs]):
+            return comet.predict(self.src, self.cand, self.ref)
+
+    def test_predict(self):
+        model = FakeCOMETModel()
+        scores = self.predict(model)
+        for score, seg in zip(scores, self.cand):
+            self.assertAlmostEqual(score, len(seg) / 10)
+        self.assertListEqual(model.batches, [2, 2, 1])
+
+    def test_predict_with_mc_dropout(self):
+        scores = self.predict(FakeCOMETModel(mc_dropout=True))
+        for score, seg in zip(scores, self.cand):
+            self.assertAlmostEqual(score, len(seg) / 10)
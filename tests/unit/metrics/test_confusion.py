@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.metrics.accuracy.metric import Accuracy
+from telescope.metrics.confusion import ConfusionMatrix, systems_confusion
+from telescope.metrics.f1_score.metric import F1Score
+from telescope.metrics.fd_rate.metric import FDRate
+from telescope.metrics.precision.metric import Precision
+from telescope.testset import MultipleTestset
+
+
+class TestConfusionMatrix(unittest.TestCase):
+
+    labels = ["a", "b", "c"]
+    true = ["a", "b", "c", "a", "b", "c"]
+    pred_1 = ["a", "b", "c", "b", "a", "c"]
+    pred_2 = ["a", "a", "a", "d", "b", "c"]
+
+    def test_counts(self):
+        confusion = ConfusionMatrix.from_outputs(self.pred_2, self.true)
+        tn, fp, fn, tp = confusion.counts(["a", "b", "c", "d", "e"])
+
+        self.assertListEqual(tp.tolist(), [1, 1, 1, 0, 0])
+        self.assertListEqual(fp.tolist(), [2, 0, 0, 1, 0])
+        self.assertListEqual(fn.tolist(), [1, 1, 1, 0, 0])
+        self.assertListEqual(tn.tolist(), [2, 4, 4, 5, 6])
+        self.assertListEqual(confusion.present.tolist(), [True, True, True, True])
+
+    def test_empty(self):
+        confusion = ConfusionMatrix.from_outputs([], [])
+        self.assertEqual(confusion.macro(confusion.tp), 0.0)
+        self.assertListEqual(Precision(labels=self.labels).score([], [], []).seg_scores, [0, 0, 0])
+
+    def test_systems_confusion(self):
+        systems_output = {"Sys 1": self.pred_1, "Sys 2": self.pred_2}
+        testset = MultipleTestset([], self.true, "ref", systems_output, "classification", ["1", "2"])
+        matrices = systems_confusion(testset)
+        self.assertIs(systems_confusion(testset), matrices)
+
+        for sys_id, pred in systems_output.items():
+            self.assertListEqual(list(matrices[sys_id].names), ["a", "b", "c", "d"])
+            expected = ConfusionMatrix.from_outputs(pred, self.true).counts(["a", "b", "c", "d"])
+            for counts, expected_counts in zip(matrices[sys_id].counts(["a", "b", "c", "d"]), expected):
+                self.assertListEqual(counts.tolist(), expected_counts.tolist())
+
+    def test_multiple_comparison(self):
+        systems_output = {"Sys 1": self.pred_1, "Sys 2": self.pred_2}
+        testset = MultipleTestset([], self.true, "ref", systems_output, "classification", ["1", "2"])
+        for metric in [Accuracy, Precision, F1Score, FDRate]:
+            results = metric(labels=self.labels).multiple_comparison(testset)
+            for sys_id, pred in systems_output.items():
+                expected = metric(labels=self.labels).score([], pred, self.true)
+                result = results.systems_metric_results[sys_id]
+                self.assertEqual(result.sys_score, expected.sys_score)
+                self.assertListEqual(result.seg_scores, expected.seg_scores)
+                self.assertListEqual(result.cand, pred)
@@ -1,6 +1,7 @@
 import unittest
 
 from telescope.metrics.demographic_parity.metric import DemographicParity
+from telescope.testset import MultipleTestset
 
 class TestDemographicParity(unittest.TestCase):
     labels = ["male", "neutral", "female"]
@@ -41,4 +42,13 @@ class TestDemographicParity(unittest.TestCase):
         self.assertEqual(result.sys_score, expected_sys)
         self.assertListEqual(result.ref, self.true)
         self.assertListEqual(result.src, [])
-        self.assertListEqual(result.cand, pred)
\ No newline at end of file
+        self.assertListEqual(result.cand, pred)
+
+    def test_multiple_comparison(self):
+        systems_output = {"Sys 1": self.pred_1, "Sys 2": self.pred_0, "Sys 3": self.pred_075}
+        testset = MultipleTestset([], self.true, "ref", systems_output, "classification", ["1", "2", "3"])
+        results = self.demographic_parity.multiple_comparison(testset)
+
+        self.assertEqual(results.systems_metric_results["Sys 1"].sys_score, 1.0)
+        self.assertEqual(results.systems_metric_results["Sys 2"].sys_score, 0.0)
+        self.assertEqual(results.systems_metric_results["Sys 3"].sys_score, 0.75)
@@ -16,6 +16,7 @@ import os
 import unittest
 
 from telescope.metrics.gleu.metric import GLEU
+from telescope.testset import MultipleTestset
 from tests.data import DATA_PATH
 
 
@@ -40,3 +41,27 @@ class TestGLEU(unittest.TestCase):
         gleu = GLEU(language="en", lowercase=False, tokenize=False)
         result = gleu.score([], ref, hyp1)
         self.assertAlmostEqual(expected_result, result.sys_score, places=3)
+
+    def test_same_as_nltk_algorithm(self):
+        for tokenize in [True, False]:
+            gleu = GLEU(language="en", tokenize=tokenize)
+            cand = [""] + self.cand[1:]
+            result = gleu.score([], cand, self.ref)
+            for c, r, score in zip(
+                gleu.tokenize_segments(cand), gleu.tokenize_segments(self.ref), result.seg_scores
+            ):
+                self.assertAlmostEqual(score, gleu.sentence_gleu(r, c), places=10)
+
+    def test_multiple_comparison(self):
+        gleu = GLEU(language="en", tokenize=False)
+        systems_output = {"Sys 1": self.cand, "Sys 2": self.ref}
+        testset = MultipleTestset(
+            self.cand, self.ref, "ref", systems_output, "nlg", ["1", "2"]
+        )
+        results = gleu.multiple_comparison(testset)
+        for sys_id, output in systems_output.items():
+            expected = gleu.score(self.cand, output, self.ref)
+            result = results.systems_metric_results[sys_id]
+            self.assertListEqual(result.seg_scores, expected.seg_scores)
+            self.assertListEqual(result.cand, output)
+        self.assertEqual(results.systems_metric_results["Sys 2"].sys_score, 1.0)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.metrics.models import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.loads = []
+
+    def loader(self, name):
+        def load():
+            self.loads.append(name)
+            return {"name": name}
+        return load
+
+    def test_load_once(self):
+        registry = ModelRegistry(max_size=2)
+        model = registry.load(("COMET", "wmt20-comet-da"), self.loader("comet"))
+        same = registry.load(("COMET", "wmt20-comet-da"), self.loader("comet"))
+        self.assertIs(model, same)
+        self.assertListEqual(self.loads, ["comet"])
+        self.assertIn(("COMET", "wmt20-comet-da"), registry)
+
+    def test_eviction(self):
+        registry = ModelRegistry(max_size=2)
+        registry.load("a", self.loader("a"))
+        registry.load("b", self.loader("b"))
+        # "a" becomes the most recently used model
+        registry.load("a", self.loader("a"))
+        registry.load("c", self.loader("c"))
+        self.assertEqual(len(registry), 2)
+        self.assertIn("a", registry)
+        self.assertNotIn("b", registry)
+        registry.load("b", self.loader("b"))
+        self.assertListEqual(self.loads, ["a", "b", "c", "b"])
+
+        registry.clear()
+        self.assertEqual(len(registry), 0)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from telescope.metrics import GLEU, ROUGEL, ROUGEOne, ZeroEdit, sacreBLEU
+from telescope.metrics.parallel import parallel_multiple_comparison
+from telescope.testset import MultipleTestset
+
+
+class TestParallelMultipleComparison(unittest.TestCase):
+
+    src = ["a b c", "d e f", "g h i"]
+    systems_output = {
+        "Sys 1": ["the cat sat on the mat", "a dog", "hello there"],
+        "Sys 2": ["the cat on the mat", "a big dog", "hello"],
+        "Sys 3": ["cat sat", "dog", "hello there world"],
+    }
+    testsets = {
+        "ref_1": MultipleTestset(
+            src, ["the cat sat on the mat", "a big dog", "hello there"], "ref_1", systems_output, "nlg", ["1", "2", "3"]
+        ),
+        "ref_2": MultipleTestset(
+            src, ["a cat is on the mat", "the dog", "hi there"], "ref_2", systems_output, "nlg", ["1", "2", "3"]
+        ),
+    }
+
+    def test_same_results_as_serial(self):
+        metrics = {m.name: (m, {"language": "en"}) for m in [sacreBLEU, ROUGEOne, GLEU, ROUGEL, ZeroEdit]}
+        results = parallel_multiple_comparison(self.testsets, metrics, workers=2)
+
+        self.assertListEqual(list(results), ["ref_1", "ref_2"])
+        for ref_name, testset in self.testsets.items():
+            self.assertListEqual(list(results[ref_name]), ["BLEU", "ROUGE-1", "GLEU", "ROUGE-L", "ZeroEdit"])
+            for name, (metric, kwargs) in metrics.items():
+                expected = metric(**kwargs).multiple_comparison(testset, cache=False)
+                result = results[ref_name][name]
+                self.assertListEqual(list(result.systems_metric_results), list(expected.systems_metric_results))
+                for sys_id, sys_result in result.systems_metric_results.items():
+                    self.assertEqual(sys_result.sys_score, expected.systems_metric_results[sys_id].sys_score)
+                    self.assertListEqual(sys_result.cand, self.systems_output[sys_id])
+                    self.assertListEqual(sys_result.ref, testset.ref)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import threading
+import unittest
+from unittest import mock
+
+from rouge import Rouge
+from telescope.metrics.rouge_scores import rouge_scores, segment_rouge, shared_rouge_scores
+from tests.data import DATA_PATH
+
+
+class TestROUGEScores(unittest.TestCase):
+
+    cand = [l.strip() for l in open(os.path.join(DATA_PATH, "cs_en/Online-A.txt")).readlines()[:200]]
+    ref = [l.strip() for l in open(os.path.join(DATA_PATH, "cs_en/cs-en.refB.txt")).readlines()[:200]]
+
+    def test_same_as_rouge(self):
+        rouge = Rouge()
+        expected_sys = rouge.get_scores(self.cand, self.ref, avg=True)
+        expected_segs = rouge.get_scores(self.cand, self.ref)
+        scores = rouge_scores(tuple(self.cand), tuple(self.ref))
+
+        for metric in ["rouge-1", "rouge-2", "rouge-l"]:
+            for stat in ["f", "p", "r"]:
+                sys_score, seg_scores = scores[metric][stat]
+                self.assertEqual(sys_score, expected_sys[metric][stat])
+                self.assertListEqual(seg_scores, [seg[metric][stat] for seg in expected_segs])
+
+    def test_shared(self):
+        with mock.patch("telescope.metrics.rouge_scores.segment_rouge", wraps=segment_rouge) as scored:
+            with shared_rouge_scores():
+                scores = rouge_scores(self.cand, self.ref)
+                with shared_rouge_scores():
+                    self.assertEqual(rouge_scores(self.cand[:10], self.ref[:10])["rouge-l"]["f"][1], scores["rouge-l"]["f"][1][:10])
+            self.assertEqual(scored.call_count, len(set(zip(self.cand, self.ref))))
+            # the scores are dropped at the end of the outermost block
+            rouge_scores(self.cand[:10], self.ref[:10])
+            self.assertEqual(scored.call_count, len(set(zip(self.cand, self.ref))) + 10)
+
+    def test_shared_per_thread(self):
+        with mock.patch("telescope.metrics.rouge_scores.segment_rouge", wraps=segment_rouge) as scored:
+            with shared_rouge_scores():
+                rouge_scores(self.cand[:10], self.ref[:10])
+                # another thread (e.g. another app session) has no memo and does not reset this one
+                thread = threading.Thread(target=lambda: rouge_scores(self.cand[:10], self.ref[:10]))
+                thread.start()
+                thread.join()
+                rouge_scores(self.cand[:10], self.ref[:10])
+            self.assertEqual(scored.call_count, 20)
+
+    def test_empty_hypothesis(self):
+        with self.assertRaises(ValueError):
+            rouge_scores(("",), ("a reference",))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import unittest
+
+from telescope.metrics import TER, GLEU, chrF, sacreBLEU
+from telescope.metrics.streaming import streaming_multiple_comparison
+from telescope.testset import MultipleTestset, StreamingTestset
+
+
+class TestStreamingMultipleComparison(unittest.TestCase):
+
+    src = ["a b c", "d e f", "g h i", "j k l", "m n o"]
+    refs = {
+        "ref_1": ["the cat sat on the mat", "a big dog", "hello there", "good morning", "see you soon"],
+        "ref_2": ["a cat is on the mat", "the dog", "hi there", "morning", "see you later"],
+    }
+    systems_output = {
+        "Sys 1": ["the cat sat on the mat", "a dog", "hello there", "good evening", "see you"],
+        "Sys 2": ["the cat on the mat", "a big dog", "hello", "morning all", "bye"],
+    }
+
+    def streaming_testset(self, chunk_size):
+        return StreamingTestset(
+            io.StringIO("\n".join(self.src) + "\n"),
+            {name: io.StringIO("\n".join(ref) + "\n") for name, ref in self.refs.items()},
+            {sys_id: io.StringIO("\n".join(output) + "\n") for sys_id, output in self.systems_output.items()},
+            chunk_size=chunk_size,
+        )
+
+    def test_same_results_as_in_memory(self):
+        metrics = {m.name: m(language="en") for m in [sacreBLEU, chrF, TER]}
+        results = streaming_multiple_comparison(self.streaming_testset(2), metrics)
+
+        self.assertListEqual(list(results.keys()), ["ref_1", "ref_2"])
+        for ref_name, ref in self.refs.items():
+            testset = MultipleTestset(self.src, ref, ref_name, self.systems_output, "nlg", ["1", "2"])
+            for name, metric in metrics.items():
+                expected = metric.multiple_comparison(testset)
+                for sys_id in self.systems_output:
+                    self.assertAlmostEqual(
+                        results[ref_name][name].systems_metric_results[sys_id].sys_score,
+                        expected.systems_metric_results[sys_id].sys_score,
+                    )
+
+    def test_not_chunk_capable(self):
+        with self.assertRaises(Exception):
+            streaming_multiple_comparison(self.streaming_testset(2), {"GLEU": GLEU(language="en")})
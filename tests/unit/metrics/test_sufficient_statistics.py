@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+import numpy as np
+import sacrebleu
+from sacrebleu.metrics import BLEU, CHRF, TER as SacreTER
+from telescope.metrics.chrf.metric import chrF
+from telescope.metrics.sacrebleu.metric import sacreBLEU
+from telescope.metrics.ter.metric import TER
+
+
+class TestSufficientStatistics(unittest.TestCase):
+
+    metrics = [sacreBLEU, chrF, TER]
+    cand = ["aaaa bbbb cccc dddd", "Hi world.", "This is a Test.", "d e f g h a b c"]
+    ref = ["aaaa bbbb cccc dddd", "Hello world.", "This is a test.", "a b c d e f g h"]
+
+    def test_sacrebleu_private_api(self):
+        # segment_statistics and score_from_statistics rely on private sacrebleu methods
+        for sacre_metric in [BLEU, CHRF, SacreTER]:
+            for method in ["_extract_corpus_statistics", "_compute_score_from_stats"]:
+                self.assertTrue(
+                    callable(getattr(sacre_metric, method, None)),
+                    "sacrebleu {} no longer has {}.{}".format(sacrebleu.__version__, sacre_metric.__name__, method),
+                )
+
+    def test_score_from_statistics(self):
+        for metric_cls in self.metrics:
+            with self.subTest(metric=metric_cls.name):
+                metric = metric_cls(language="en")
+                stats = metric.segment_statistics(self.cand, self.ref)
+                self.assertEqual(stats.shape[0], len(self.cand))
+                self.assertAlmostEqual(
+                    metric.score_from_statistics(stats.sum(axis=0, keepdims=True))[0],
+                    metric.score([], self.cand, self.ref).sys_score,
+                )
+
+    def test_resampled_sys_scores(self):
+        # the whole corpus, then segment 1 twice and segment 0 once
+        counts = np.array([[1, 1, 1, 1], [1, 2, 0, 0]])
+        reduced = [0, 1, 1]
+        for metric_cls in self.metrics:
+            with self.subTest(metric=metric_cls.name):
+                metric = metric_cls(language="en")
+                scores = metric.resampled_sys_scores(self.cand, self.ref, counts)
+                self.assertAlmostEqual(scores[0], metric.score([], self.cand, self.ref).sys_score)
+                expected = metric.score([], [self.cand[i] for i in reduced], [self.ref[i] for i in reduced]).sys_score
+                self.assertAlmostEqual(scores[1], expected)
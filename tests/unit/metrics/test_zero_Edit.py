@@ -15,6 +15,7 @@
 import unittest
 
 from telescope.metrics.zero_edit.metric import ZeroEdit
+from telescope.testset import MultipleTestset
 
 
 class TestSacreBLEU(unittest.TestCase):
@@ -34,6 +35,20 @@ class TestSacreBLEU(unittest.TestCase):
         self.assertListEqual(result.ref, ref)
         self.assertListEqual(result.cand, cand)
 
+    def test_multiple_comparison(self):
+        ref = ["Hello world.", "This is a Test.", "Bye."]
+        systems_output = {
+            "Sys 1": ["Hi world.", "This is a Test.", "Bye."],
+            "Sys 2": ["Hello world.", "This is a test.", "Bye!"],
+        }
+        testset = MultipleTestset(ref, ref, "ref", systems_output, "machine-translation", ["1", "2"])
+        results = self.zero_edit.multiple_comparison(testset)
+
+        self.assertListEqual(results.systems_metric_results["Sys 1"].seg_scores, [0, 1, 1])
+        self.assertListEqual(results.systems_metric_results["Sys 2"].seg_scores, [1, 0, 0])
+        self.assertEqual(results.systems_metric_results["Sys 1"].exact_matches, 2)
+        self.assertAlmostEqual(results.systems_metric_results["Sys 2"].sys_score, 1 / 3)
+
     # def test_name_property(self):
     #    self.assertEqual(self.zero_edit.name, "ZeroEdit")
 
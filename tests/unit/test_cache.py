@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+from telescope.cache import SQLiteStore, cache_path, clear_cache
+from telescope.cli import telescope
+from telescope.metrics.cache import SegmentScoreCache
+
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.home = os.environ.get("HOME")
+        self.tmp = tempfile.TemporaryDirectory()
+        os.environ["HOME"] = self.tmp.name
+
+    def tearDown(self):
+        os.environ["HOME"] = self.home
+        self.tmp.cleanup()
+
+    def test_get_put(self):
+        store = SQLiteStore("entries")
+        store.put("a", {"k1": "text", "k2": 1})
+        store.put("b", {"k1": b"bytes"})
+        self.assertDictEqual(store.get("a", ["k1", "k2", "k3"]), {"k1": "text", "k2": 1})
+        self.assertDictEqual(store.get("b", ["k1", "k2"]), {"k1": b"bytes"})
+        self.assertDictEqual(SQLiteStore("other").get("a", ["k1"]), {})
+
+    def test_many_keys(self):
+        store = SQLiteStore("entries")
+        store.put("a", {str(i): i for i in range(1200)})
+        self.assertEqual(len(store.get("a", [str(i) for i in range(1500)])), 1200)
+
+    def test_clear_cache(self):
+        self.assertFalse(clear_cache())
+        SegmentScoreCache().put("COMET", "wmt20-comet-da", {"k1": [0.5]})
+        self.assertTrue(os.path.isfile(cache_path()))
+        self.assertTrue(clear_cache())
+        self.assertDictEqual(SegmentScoreCache().get("COMET", "wmt20-comet-da", ["k1"]), {})
+
+    def test_clear_cache_command(self):
+        SegmentScoreCache().put("COMET", "wmt20-comet-da", {"k1": [0.5]})
+        result = CliRunner().invoke(telescope, ["clear-cache"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Removed", result.output)
+        self.assertFalse(os.path.isfile(cache_path()))
+        result = CliRunner().invoke(telescope, ["clear-cache"])
+        self.assertIn("There is no cache", result.output)
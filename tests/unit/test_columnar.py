@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from telescope.collection_testsets import MTTestsets
+from telescope.columnar import MappedColumn, pack_column, pack_testset
+from telescope.metrics import COMET
+from telescope.testset import MappedMultipleTestset
+
+
+class KeepIds:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def apply_filter(self):
+        return self.ids
+
+
+class TestColumnar(unittest.TestCase):
+
+    src = ["Bonjour le monde.", "C'est un test.", "", "Ça marche?"]
+    ref = ["Hello world.", "This is a test.", "", "Does it work?"]
+    systems_output = {
+        "Sys 1": ["Hi world.", "This is a Test.", "", "It works?"],
+        "Sys 2": ["Greetings world", "This is an experiment.", "", "Does it work?"],
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def pack(self):
+        pack_testset(
+            self.folder,
+            ("src.txt", io.StringIO("\n".join(self.src) + "\n")),
+            {"ref.txt": io.StringIO("\n".join(self.ref) + "\n")},
+            {sys_id: (sys_id + ".txt", io.StringIO("\n".join(output) + "\n"))
+                for sys_id, output in self.systems_output.items()},
+            {"Sys 1": "A", "Sys 2": "B"},
+        )
+        return MTTestsets.read_packed_cli(self.folder, "fr-en")
+
+    def test_mapped_column(self):
+        path = os.path.join(self.folder, "column")
+        self.assertEqual(pack_column([line + "\n" for line in self.src], path), 4)
+        column = MappedColumn.load(path)
+        self.assertEqual(len(column), 4)
+        self.assertListEqual(list(column), self.src)
+        self.assertEqual(column[-1], "Ça marche?")
+        self.assertEqual(column, self.src)
+
+        view = column.take([3, 0])
+        self.assertListEqual(list(view), ["Ça marche?", "Bonjour le monde."])
+        self.assertListEqual(list(view.take([1])), ["Bonjour le monde."])
+        self.assertListEqual(list(column[1:3]), self.src[1:3])
+        self.assertIs(view.blob, column.blob)
+        self.assertListEqual(column * 2, self.src * 2)
+        self.assertListEqual(2 * view, ["Ça marche?", "Bonjour le monde."] * 2)
+
+    def test_pickle(self):
+        path = os.path.join(self.folder, "column")
+        pack_column([line + "\n" for line in self.src * 1000], path)
+        view = MappedColumn.load(path)[2:5]
+        data = pickle.dumps(view)
+        # only the path and the index are pickled, not the mapped column
+        self.assertLess(len(data), 1000)
+        self.assertListEqual(list(pickle.loads(data)), (self.src * 1000)[2:5])
+        self.assertListEqual(list(pickle.loads(pickle.dumps(MappedColumn.load(path)))), self.src * 1000)
+
+    def test_empty_column(self):
+        path = os.path.join(self.folder, "column")
+        pack_column(["\n", "\n"], path)
+        self.assertListEqual(list(MappedColumn.load(path)), ["", ""])
+
+    def test_read_packed(self):
+        collection = self.pack()
+        self.assertDictEqual(collection.systems_ids, {"Sys 1.txt": "Sys 1", "Sys 2.txt": "Sys 2"})
+        self.assertDictEqual(collection.systems_names, {"Sys 1": "A", "Sys 2": "B"})
+        testset = collection.testsets["ref.txt"]
+        self.assertIsInstance(testset, MappedMultipleTestset)
+        self.assertEqual(len(testset), 4)
+        self.assertEqual(testset.ref, self.ref)
+        self.assertEqual(testset[1], (self.src[1], self.ref[1], "This is a Test.", "This is an experiment."))
+
+    def test_filter_and_subset(self):
+        testset = self.pack().testsets["ref.txt"]
+        testset.apply_filter(KeepIds([0, 1, 3]))
+        testset.apply_filter(KeepIds([2, 0]))
+        self.assertListEqual(list(testset.src), [self.src[3], self.src[0]])
+        self.assertListEqual(list(testset.systems_output["Sys 2"]), ["Does it work?", "Greetings world"])
+
+        sample = testset.subset([1, 1, 0], ["Sys 1"])
+        self.assertListEqual(list(sample.ref), [self.ref[0], self.ref[0], self.ref[3]])
+        self.assertListEqual(list(sample.systems_output.keys()), ["Sys 1"])
+
+    def test_neural_metric_without_cache(self):
+        testset = self.pack().testsets["ref.txt"]
+        segment_scores = mock.Mock(side_effect=lambda src, cand, ref: [float(len(seg)) for seg in cand])
+        with mock.patch.object(COMET, "segment_scores", segment_scores):
+            results = COMET().multiple_comparison(testset, cache=False)
+
+        src, cand, ref = segment_scores.call_args[0]
+        self.assertListEqual(src, self.src * 2)
+        self.assertListEqual(ref, self.ref * 2)
+        for sys_id, output in self.systems_output.items():
+            result = results.systems_metric_results[sys_id]
+            self.assertListEqual(result.seg_scores, [float(len(seg)) for seg in output])
+            self.assertListEqual(list(result.cand), output)
+
+    def test_mismatch(self):
+        with self.assertRaises(ValueError):
+            pack_testset(
+                self.folder,
+                ("src.txt", io.StringIO("a\nb\n")),
+                {"ref.txt": io.StringIO("a\n")},
+                {"Sys 1": ("sys.txt", io.StringIO("a\nb\n"))},
+                {"Sys 1": "Sys 1"},
+            )
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2020 Unbabel
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import tempfile
+import unittest
+
+import spacy
+from spacy.language import Language
+from telescope.parse_cache import ParseCache, model_id, parse_texts, text_hash
+
+
+@Language.component("count_parses")
+def count_parses(doc):
+    TestParseCache.parsed.append(doc.text)
+    for token in doc:
+        token.pos_ = "PRON" if token.text in ["he", "she"] else "NOUN"
+    return doc
+
+
+class TestParseCache(unittest.TestCase):
+
+    parsed = []
+
+    def setUp(self):
+        self.home = os.environ.get("HOME")
+        self.tmp = tempfile.TemporaryDirectory()
+        os.environ["HOME"] = self.tmp.name
+        TestParseCache.parsed = []
+        self.nlp = spacy.blank("en")
+        self.nlp.add_pipe("count_parses")
+
+    def tearDown(self):
+        os.environ["HOME"] = self.home
+        self.tmp.cleanup()
+
+    def test_model_id(self):
+        self.assertEqual(model_id(self.nlp), "en_pipeline-" + self.nlp.meta["version"])
+
+    def test_put_and_get(self):
+        cache = ParseCache()
+        cache.put(self.nlp, {text_hash("she is a doctor"): self.nlp("she is a doctor")})
+        found = cache.get(self.nlp, [text_hash("she is a doctor"), text_hash("he is a nurse")])
+        self.assertListEqual(list(found), [text_hash("she is a doctor")])
+        doc = found[text_hash("she is a doctor")]
+        self.assertListEqual([token.text for token in doc], ["she", "is", "a", "doctor"])
+        self.assertListEqual([token.pos_ for token in doc], ["PRON", "NOUN", "NOUN", "NOUN"])
+
+    def test_only_new_texts_are_parsed(self):
+        docs = parse_texts(self.nlp, ["she is a doctor", "he is a nurse", "she is a doctor"])
+        self.assertListEqual(list(docs), ["she is a doctor", "he is a nurse"])
+        self.assertListEqual(TestParseCache.parsed, ["she is a doctor", "he is a nurse"])
+
+        docs = parse_texts(self.nlp, ["he is a nurse", "he is a teacher"])
+        self.assertListEqual(list(docs), ["he is a nurse", "he is a teacher"])
+        self.assertListEqual(TestParseCache.parsed, ["she is a doctor", "he is a nurse", "he is a teacher"])
+        self.assertEqual(docs["he is a nurse"][0].pos_, "PRON")
+
+        parse_texts(self.nlp, ["he is a nurse"], cache=False)
+        self.assertEqual(TestParseCache.parsed[-1], "he is a nurse")
@@ -14,7 +14,9 @@
 # limitations under the License.
 import unittest
 
-from telescope.testset import PairwiseTestset, MultipleTestset
+import io
+
+from telescope.testset import PairwiseTestset, MultipleTestset, StreamingTestset
 from telescope.collection_testsets import MTTestsets
 
 
@@ -130,4 +132,40 @@ class TestTestset(unittest.TestCase):
         self.assertEqual('fr', self.collection.source_language)
     
     def test_target_language(self):
-        self.assertEqual('en', self.collection.target_language)
\ No newline at end of file
+        self.assertEqual('en', self.collection.target_language)
+
+    def test_multiple_interned(self):
+        ref_ids, systems_ids = self.multiple_testset_2.interned()
+        self.assertEqual(systems_ids.shape, (3, 2))
+        self.assertListEqual((systems_ids == ref_ids).tolist(), [[True, True], [False, False], [False, False]])
+        self.assertNotEqual(systems_ids[1, 1], systems_ids[2, 1])
+        # cached until the testset changes
+        self.assertIs(self.multiple_testset_2.interned()[1].base, systems_ids.base)
+
+    def test_streaming_chunks(self):
+        testset = StreamingTestset(
+            io.StringIO("s1\ns2\ns3\n"),
+            {"ref.txt": io.StringIO("r1\nr2\nr3\n")},
+            {"Sys 2": io.StringIO("b1\nb2\nb3\n"), "Sys 1": io.StringIO("a1\na2\na3\n")},
+            chunk_size=2,
+        )
+        chunks = list(testset.chunks())
+        self.assertEqual(len(chunks), 2)
+        src, refs, outputs = chunks[0]
+        self.assertListEqual(src, ["s1", "s2"])
+        self.assertDictEqual(refs, {"ref.txt": ["r1", "r2"]})
+        self.assertListEqual(list(outputs.keys()), ["Sys 1", "Sys 2"])
+        self.assertListEqual(outputs["Sys 1"], ["a1", "a2"])
+        self.assertListEqual(chunks[1][2]["Sys 2"], ["b3"])
+
+    def test_streaming_mismatch(self):
+        testset = StreamingTestset(
+            io.StringIO("s1\ns2\ns3\n"),
+            {"ref.txt": io.StringIO("r1\nr2\nr3\n")},
+            {"Sys 1": io.StringIO("a1\na2\n")},
+            chunk_size=2,
+        )
+        with self.assertRaises(ValueError):
+            testset.check_lengths()
+        with self.assertRaises(ValueError):
+            list(testset.chunks())